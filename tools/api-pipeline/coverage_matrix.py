@@ -1,14 +1,15 @@
-import ast, glob, json, os, re
+import ast, glob, os, re
 from collections import defaultdict
+from pathlib import Path
+
+import spec_model
+from spec_model import blank
 
 WT = os.environ['WT']; DOCS = os.environ['DOCS']
 
 def norm_flask(p):
     return re.sub(r'<(?:[a-z_]+:)?([a-zA-Z_]+)>', r'{\1}', p)
 
-def blank(p):
-    return re.sub(r'\{[^}]+\}', '{}', p)
-
 # --- code inventory ---
 code_ops = {}  # (blank_path, method) -> {'path': normalized, 'file': f, 'class': cls}
 for f in glob.glob(f'{WT}/api/controllers/service_api/**/*.py', recursive=True):
@@ -31,15 +32,14 @@ for f in glob.glob(f'{WT}/api/controllers/service_api/**/*.py', recursive=True):
 
 # --- spec inventory ---
 spec_ops = defaultdict(lambda: {'specs': [], 'paths': set()})
-for f in [f'{DOCS}/en/api-reference/openapi_service.json']:
-    with open(f, encoding='utf-8') as _fh:
-        spec = json.load(_fh)
-    name = f.split('/')[-1].replace('openapi_','').replace('.json','')
-    for p, ms in spec['paths'].items():
-        for m in ms:
-            if m not in ('get','post','put','patch','delete'): continue
-            e = spec_ops[(blank(p), m)]
-            e['specs'].append(name); e['paths'].add(p)
+for f in [spec_model.spec_path('en', Path(DOCS))]:
+    spec = spec_model.load_spec(f)
+    name = f.stem.replace('openapi_','')
+    for (bp, m), ops in spec.by_blank.items():
+        if m not in ('get','post','put','patch','delete'): continue
+        e = spec_ops[(bp, m)]
+        for o in ops:
+            e['specs'].append(name); e['paths'].add(o.path)
 
 print(f'code operations: {len(code_ops)}   spec unique operations: {len(spec_ops)}')
 
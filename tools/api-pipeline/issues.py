@@ -0,0 +1,39 @@
+"""Structured issue records for lint_specs.py, parity_check.py and run_checks.py.
+
+Each check yields Issue records. run_checks.py merges them across languages
+by id: the id hashes what the issue is (check, rule, operation and message),
+not which language's spec it was found in, so one problem shared by
+en/zh/ja is one record. The same ids key the --baseline file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import NamedTuple
+
+
+class Issue(NamedTuple):
+    check: str  # lint | parity
+    rule: str  # e.g. example, ref-cycle, broken-link, missing-op, shape
+    lang: str
+    file: str  # repo-relative spec file
+    where: str  # `POST /chat-messages`, plus the example for example issues; "" if spec-wide
+    message: str
+    detail: str = ""  # extra lines (parity's en/zh values); not part of the id
+    level: str = "error"
+
+    @property
+    def id(self) -> str:
+        """Stable across runs and languages: 12 hex digits of SHA-1 over check, rule, where, message.
+
+        The language's own route prefix (`/zh/`) is hashed as `/{lang}/`, so
+        a link issue found in each translation still shares one id.
+        """
+        message = self.message.replace(f"/{self.lang}/", "/{lang}/")
+        key = "\x1f".join((self.check, self.rule, self.where, message))
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def text(self) -> str:
+        """`where: message`, as the scripts print it."""
+        return f"{self.where}: {self.message}" if self.where else self.message
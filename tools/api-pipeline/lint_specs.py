@@ -1,13 +1,29 @@
-"""Mechanical lint for Dify OpenAPI specs: examples vs schemas, enum coverage, links, x-codeSamples guard."""
+"""Mechanical lint for Dify OpenAPI specs: examples vs schemas, enum coverage, links, $ref integrity, x-codeSamples guard."""
 
-import json
+import functools
 import os
 import re
 import sys
 from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from docs_index import DocsIndex  # noqa: E402
+
+import schema_validator
+import spec_model
+from issues import Issue
 
 DOCS = os.environ["DOCS"]
-issues = defaultdict(list)  # file -> [msg]
+
+
+@functools.lru_cache(maxsize=None)
+def page_routes():
+    """Doc page routes ("/en/foo/bar"), for link targets in descriptions."""
+    return frozenset(
+        "/" + os.path.splitext(os.path.relpath(p, DOCS))[0].replace(os.sep, "/")
+        for p in DocsIndex(None, Path(DOCS)).pages()
+    )
 
 
 def slug(s):
@@ -16,57 +32,12 @@ def slug(s):
     return out
 
 
-def resolve(schema, spec, depth=0):
-    if depth > 12 or not isinstance(schema, dict):
-        return schema
-    if "$ref" in schema:
-        node = spec
-        for part in schema["$ref"].lstrip("#/").split("/"):
-            node = node.get(part, {})
-        return resolve(node, spec, depth + 1)
-    return schema
+CHECKS = {"examples": 0, "links": 0}  # totals over this process's lint_spec() calls
 
-
-CHECKS = {"examples": 0, "links": 0}
-
-def check_example(example, schema, spec, where, f, path=""):
-    if not path:
-        CHECKS["examples"] += 1
-    schema = resolve(schema, spec)
-    if not isinstance(schema, dict):
-        return
-    for comb in ("oneOf", "anyOf", "allOf"):
-        if comb in schema:
-            return  # combinators: skip deep validation, too noisy to arbitrate mechanically
-    stype = schema.get("type")
-    if isinstance(example, dict) and (stype in (None, "object")) and "properties" in schema:
-        props = schema["properties"]
-        addl = schema.get("additionalProperties", True)
-        for k, v in example.items():
-            if k not in props:
-                if addl is False or isinstance(addl, dict) is False and addl is not True:
-                    issues[f].append(f"{where}: example key `{k}{path}` not in schema properties")
-                elif addl is True and not isinstance(schema.get("additionalProperties"), dict):
-                    issues[f].append(f"{where}: example key `{k}{path}` undeclared in schema")
-            else:
-                check_example(v, props[k], spec, where, f, path=f".{k}")
-        for r in schema.get("required", []):
-            if r not in example:
-                issues[f].append(f"{where}: required key `{r}` missing from example{path or ''}")
-    elif isinstance(example, list) and "items" in schema:
-        for i, item in enumerate(example[:5]):
-            check_example(item, schema["items"], spec, where, f, path=f"[{i}]")
-    elif "enum" in schema and example is not None:
-        if example not in schema["enum"]:
-            issues[f].append(f"{where}: example value {example!r}{path} not in enum {schema['enum']}")
-
-
-def iter_examples(media):
-    if "example" in media:
-        yield "(example)", media["example"]
-    for name, ex in media.get("examples", {}).items():
-        if isinstance(ex, dict) and "value" in ex:
-            yield name, ex["value"]
+def check_example(example, spec):
+    """Messages for one request/response example vs its schema (see schema_validator)."""
+    CHECKS["examples"] += 1
+    return schema_validator.for_spec(spec).check_example(example)
 
 
 def collect_enum_usage(node, used, spec, depth=0):
@@ -83,114 +54,108 @@ def collect_enum_usage(node, used, spec, depth=0):
         used.add(node)
 
 
-SPEC_FILES = [f"{DOCS}/{lang}/api-reference/openapi_service.json" for lang in ("en", "zh", "ja")]
-missing = [f for f in SPEC_FILES if not os.path.exists(f)]
-if missing:
-    for f in missing:
-        print(f"MISSING FILE: {f.replace(DOCS + '/', '')}")
-    sys.exit(1)
+def lint_spec(lang):
+    """Lint one language's spec; returns its Issue records in report order."""
+    f = spec_model.spec_path(lang, Path(DOCS))
+    rel = f.relative_to(DOCS).as_posix()
+    spec = spec_model.load_spec(f)
+    found = []
 
-for f in SPEC_FILES:
-    rel = f.replace(DOCS + "/", "")
-    with open(f, encoding="utf-8") as _fh:
-        spec = json.load(_fh)
-    lang = rel.split("/")[0]
+    def add(rule, where, message, level="error"):
+        found.append(Issue("lint", rule, lang, rel, where, message, level=level))
 
     # Build valid page slugs for this language from the already-loaded spec
     valid_pages = set()
-    for s2 in [spec]:
-        for p, ms in s2["paths"].items():
-            for m, op in ms.items():
-                if not isinstance(op, dict) or "summary" not in op:
-                    continue
-                for t in op.get("tags", ["default"]):
-                    valid_pages.add(f"/api-reference/{slug(t)}/{slug(op['summary'])}")
-                href = (op.get("x-mint") or {}).get("href")
-                if href:
-                    valid_pages.add(href.split("#")[0])
+    for o in spec.ops:
+        if "summary" not in o.op:
+            continue
+        for t in o.op.get("tags", ["default"]):
+            valid_pages.add(f"/api-reference/{slug(t)}/{slug(o.op['summary'])}")
+        if o.href:
+            valid_pages.add(o.href.split("#")[0])
+
+    # $ref integrity: every chain must end at a node, without looping
+    for cycle in spec.ref_cycles:
+        add("ref-cycle", "", f"$ref cycle: {' -> '.join(cycle)}")
+    for ref, target in spec.refs.items():
+        if target is None:
+            add("ref-unresolvable", "", f"unresolvable $ref {ref}")
 
     all_example_values = set()
-    all_enums = []  # (where, enum values)
 
-    for p, ms in spec["paths"].items():
-        for m, op in ms.items():
-            if not isinstance(op, dict):
-                continue
-            where = f"{m.upper()} {p}"
-
-            # request body examples vs schema
-            for ctype, media in (op.get("requestBody", {}).get("content", {}) or {}).items():
-                schema = media.get("schema", {})
-                for name, ex in iter_examples(media):
-                    check_example(ex, schema, spec, f"{where} req[{name}]", rel)
-                    collect_enum_usage(ex, all_example_values, spec)
-
-            # response examples vs schema
-            for code, resp in (op.get("responses", {}) or {}).items():
-                for ctype, media in (resp.get("content", {}) or {}).items():
-                    schema = media.get("schema", {})
-                    for name, ex in iter_examples(media):
-                        check_example(ex, schema, spec, f"{where} resp{code}[{name}]", rel)
-                        collect_enum_usage(ex, all_example_values, spec)
-
-            # param examples + collect enums; x-codeSamples guard
-            req_query = []
-            for prm in op.get("parameters", []) or []:
-                sch = resolve(prm.get("schema", {}), spec)
-                if isinstance(sch, dict) and "enum" in sch:
-                    all_enums.append((f"{where} param `{prm['name']}`", sch["enum"]))
-                if prm.get("in") == "query" and prm.get("required"):
-                    req_query.append(prm["name"])
-            if req_query and m.lower() == "get" and not op.get("x-codeSamples"):
-                issues[rel].append(f"{where}: required query {req_query} but no x-codeSamples override")
-
-            # link targets in descriptions
-            desc = op.get("description", "") or ""
-            for link in re.findall(r"\]\((/[^)\s]+)\)", desc):
-                CHECKS["links"] += 1
-                if link.startswith("/api-reference/") or re.match(r"^/(en|zh|ja)/api-reference/", link):
-                    base = link.split("#")[0]
-                    if base not in valid_pages:
-                        # MDX guide pages live under api-reference/ too
-                        target = f"{DOCS}{base}"
-                        if not (os.path.exists(target + ".mdx") or os.path.exists(target + ".md")):
-                            issues[rel].append(f"{where}: broken link target {link}")
+    for o in spec.ops:
+        op, m = o.op, o.method
+        where = o.key
+
+        # request/response examples vs schema
+        for ex in spec.examples_by_key[o.path, m]:
+            for msg in check_example(ex, spec):
+                add("example", f"{where} {ex.where}", msg)
+            collect_enum_usage(ex.value, all_example_values, spec)
+
+        # x-codeSamples guard
+        req_query = []
+        for prm in op.get("parameters", []) or []:
+            if prm.get("in") == "query" and prm.get("required"):
+                req_query.append(prm["name"])
+        if req_query and m.lower() == "get" and not op.get("x-codeSamples"):
+            add("code-samples", where, f"required query {req_query} but no x-codeSamples override")
+
+        # link targets in descriptions
+        desc = op.get("description", "") or ""
+        for link in re.findall(r"\]\((/[^)\s]+)\)", desc):
+            CHECKS["links"] += 1
+            if link.startswith("/api-reference/") or re.match(r"^/(en|zh|ja)/api-reference/", link):
+                base = link.split("#")[0]
+                if base not in valid_pages:
+                    # MDX guide pages live under api-reference/ too
+                    if base not in page_routes():
+                        add("broken-link", where, f"broken link target {link}")
+            else:
+                if not re.match(r"^/(en|zh|ja)/", link):
+                    add("link-prefix", where, f"non-API link without language prefix: {link}")
                 else:
-                    if not re.match(r"^/(en|zh|ja)/", link):
-                        issues[rel].append(f"{where}: non-API link without language prefix: {link}")
-                    else:
-                        target = f"{DOCS}{link.split('#')[0]}"
-                        if not (os.path.exists(target + ".mdx") or os.path.exists(target + ".md")):
-                            issues[rel].append(f"{where}: broken doc link {link}")
-
-    # enum coverage: every enum value in schemas seen in at least one example (warning-level)
-    def walk_schemas(node, ctx, depth=0):
-        if depth > 15 or not isinstance(node, dict):
-            return
-        if "enum" in node and isinstance(node["enum"], list):
-            missing = [v for v in node["enum"] if v not in all_example_values]
-            if missing and len(missing) < len(node["enum"]):  # fully-unused enums too noisy; report partial
-                issues[rel].append(f"enum partially unexercised in examples ({ctx}): missing {missing}")
-        for k, v in node.items():
-            if isinstance(v, dict):
-                walk_schemas(v, ctx if len(ctx) > 60 else f"{ctx}.{k}", depth + 1)
-            elif isinstance(v, list):
-                for it in v:
-                    walk_schemas(it, ctx, depth + 1) if isinstance(it, dict) else None
-
-    # keep enum sweep opt-in via env (noisy)
+                    if link.split("#")[0] not in page_routes():
+                        add("broken-doc-link", where, f"broken doc link {link}")
+
+    # enum coverage: every enum value in component schemas seen in at least
+    # one example (warning-level); opt-in via env (noisy)
     if os.environ.get("ENUM_SWEEP"):
-        walk_schemas(spec.get("components", {}).get("schemas", {}), "components", 0)
-
-total = sum(len(v) for v in issues.values())
-print(f"checked: {CHECKS}")
-print(f"TOTAL ISSUES: {total}\n")
-for f in sorted(issues):
-    print(f"### {f} ({len(issues[f])})")
-    seen = set()
-    for msg in issues[f]:
-        if msg in seen:
-            continue
-        seen.add(msg)
-        print("  -", msg)
-    print()
+        for pointer, values in spec.enums:
+            if not pointer.startswith("/components/schemas/"):
+                continue
+            missing = [v for v in values if v not in all_example_values]
+            if missing and len(missing) < len(values):  # fully-unused enums too noisy; report partial
+                add("enum-coverage", "", f"enum partially unexercised in examples ({pointer}): missing {missing}", "warning")
+    return found
+
+
+def main():
+    spec_files = [spec_model.spec_path(lang, Path(DOCS)) for lang in spec_model.LANGS]
+    missing = [f for f in spec_files if not f.exists()]
+    if missing:
+        for f in missing:
+            print(f"MISSING FILE: {f.relative_to(DOCS).as_posix()}")
+        sys.exit(1)
+
+    issues = defaultdict(list)  # file -> [msg]
+    for lang in spec_model.LANGS:
+        for issue in lint_spec(lang):
+            issues[issue.file].append(issue.text)
+
+    total = sum(len(v) for v in issues.values())
+    print(f"checked: {CHECKS}")
+    print(f"TOTAL ISSUES: {total}\n")
+    for f in sorted(issues):
+        print(f"### {f} ({len(issues[f])})")
+        seen = set()
+        for msg in issues[f]:
+            if msg in seen:
+                continue
+            seen.add(msg)
+            print("  -", msg)
+        print()
+
+
+if __name__ == "__main__":
+    main()
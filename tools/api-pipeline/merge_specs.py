@@ -32,16 +32,13 @@ import re
 import sys
 from pathlib import Path
 
-REPO = Path(os.environ.get("DOCS", Path(__file__).resolve().parents[2]))
-HTTP_METHODS = {"get", "post", "put", "patch", "delete", "head", "options", "trace"}
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import docs_index  # noqa: E402
 
+import spec_model
 
-def iter_ops(spec: dict):
-    """Yield (path, method, op) for every operation in a spec."""
-    for path, item in spec.get("paths", {}).items():
-        for method, op in item.items():
-            if method in HTTP_METHODS:
-                yield path, method, op
+REPO = Path(os.environ.get("DOCS", Path(__file__).resolve().parents[2]))
+API_PAGE_RE = re.compile(r"^/[a-z]{2}/api-reference/[^#\s]+")
 
 
 def load_memberships() -> dict:
@@ -68,24 +65,22 @@ def nav_groups_for(lang: str, labels: dict) -> list:
     overrides from op_order.
     """
     memberships = load_memberships()
-    with open(REPO / lang / "api-reference" / "openapi_service.json", encoding="utf-8") as _fh:
-        merged = json.load(_fh)
-    with open(REPO / "en" / "api-reference" / "openapi_service.json", encoding="utf-8") as _fh:
-        en_merged = json.load(_fh)
-    if len(merged["tags"]) != len(en_merged["tags"]):
+    merged = spec_model.load(lang, REPO)
+    en_merged = spec_model.load("en", REPO)
+    if len(merged.data["tags"]) != len(en_merged.data["tags"]):
         raise ValueError(
             f"nav_groups_for({lang}): tag count mismatch: "
-            f"{len(merged['tags'])} vs en {len(en_merged['tags'])}"
+            f"{len(merged.data['tags'])} vs en {len(en_merged.data['tags'])}"
         )
     # en tag -> this language's tag label, via index alignment of the tags arrays
-    tag_map = {e["name"]: l["name"] for e, l in zip(en_merged["tags"], merged["tags"])}
+    tag_map = {e["name"]: l["name"] for e, l in zip(en_merged.data["tags"], merged.data["tags"])}
     ops_by_en_tag = {}
     mismatches = []
-    for (path, method, op), (en_path, en_method, en_op) in zip(iter_ops(merged), iter_ops(en_merged)):
-        if (path, method) != (en_path, en_method):
-            mismatches.append(((path, method), (en_path, en_method)))
+    for o, en_o in zip(merged.ops, en_merged.ops):
+        if (o.path, o.method) != (en_o.path, en_o.method):
+            mismatches.append(((o.path, o.method), (en_o.path, en_o.method)))
             continue
-        ops_by_en_tag.setdefault(en_op["tags"][0], []).append(f"{method.upper()} {path}")
+        ops_by_en_tag.setdefault(en_o.op["tags"][0], []).append(o.key)
     if mismatches:
         raise ValueError(
             f"nav_groups_for({lang}): merged spec operation order diverges from en: {mismatches}"
@@ -161,19 +156,19 @@ def wire(langs):
 
 def check_coverage(langs):
     memberships = load_memberships()
+    index = docs_index.DocsIndex.default(REPO)
     failures = []
     for lang in langs:
-        with open(REPO / lang / "api-reference" / "openapi_service.json", encoding="utf-8") as _fh:
-            merged = json.load(_fh)
-        hrefs = {f"{m.upper()} {p}": op["x-mint"]["href"]
-                 for p, ms in merged["paths"].items() for m, op in ms.items()
-                 if isinstance(op, dict) and "x-mint" in op}
+        merged = spec_model.load(lang, REPO)
+        hrefs = {o.key: o.op["x-mint"]["href"] for o in merged.ops if "x-mint" in o.op}
         for key, cfg in memberships["pages"].items():
             page = REPO / lang / f"{cfg['page']}.mdx"
             if not page.exists():
                 failures.append(f"{lang}/{key}: page missing"); continue
-            text = page.read_text(encoding="utf-8")
-            links = set(re.findall(r"\]\((/[a-z]{2}/api-reference/[^)#\s]+)", text))
+            links = {
+                m.group(0) for link in index.get(page).links
+                if link.kind in ("md", "image") and (m := API_PAGE_RE.match(link.url))
+            }
             for op_key in cfg["ops"]:
                 href = hrefs.get(op_key)
                 if href is None:
@@ -184,6 +179,7 @@ def check_coverage(langs):
             for link in links - set(hrefs.values()):
                 if not (link.endswith("/overview") or "/api-reference/guides/" in link):
                     failures.append(f"{lang}/{key}: link to unknown page {link}")
+    index.save()
     for f in failures: print("COVERAGE:", f)
     print(f"coverage failures: {len(failures)}")
     sys.exit(1 if failures else 0)
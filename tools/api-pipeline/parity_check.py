@@ -1,44 +1,82 @@
-import json, os, sys
+import os, sys
+from pathlib import Path
+
+import spec_hash
+import spec_model
+from issues import Issue
 DOCS = os.environ['DOCS']
 
-def op_shape(op):
-    params = sorted(
-        (p.get('name'), p.get('in'), bool(p.get('required')), (p.get('schema') or {}).get('type'))
-        for p in op.get('parameters', []) or []
-    )
-    responses = sorted((op.get('responses') or {}).keys())
-    body_types = sorted(((op.get('requestBody') or {}).get('content') or {}).keys())
-    n_samples = len(op.get('x-codeSamples', []))
-    return {'params': params, 'responses': responses, 'body': body_types, 'samples': n_samples}
-
-total = 0
-en_file = f'{DOCS}/en/api-reference/openapi_service.json'
-if not os.path.exists(en_file):
-    print('MISSING FILE: en/api-reference/openapi_service.json'); sys.exit(1)
-for en_file in [en_file]:
-    name = en_file.split('/')[-1]
-    with open(en_file, encoding='utf-8') as _fh:
-        en = json.load(_fh)
+_trees = {}  # spec file -> spec_hash.Node, so en is hashed once per process
+
+def tree(spec):
+    if spec.file not in _trees:
+        _trees[spec.file] = spec_hash.hash_tree(spec.data)
+    return _trees[spec.file]
+
+def unescape(part):
+    return part.replace('~1', '/').replace('~0', '~')
+
+def op_of(pointer):
+    """(path, method) for a pointer under /paths/{path}/{method}, else None."""
+    parts = pointer.split('/')
+    if len(parts) >= 4 and parts[1] == 'paths' and parts[3] in spec_model.HTTP_METHODS:
+        return unescape(parts[2]), parts[3]
+    return None
+
+def parity(lang):
+    """Issue records for `lang`'s spec vs en's. en must exist.
+
+    Ops missing from or extra in `lang` are reported as such; every other
+    divergence in non-translatable structure (see spec_hash) is reported
+    at its JSON pointer, under the operation it belongs to, if any.
+    """
+    en = spec_model.load('en', Path(DOCS))
+    other_file = spec_model.spec_path(lang, Path(DOCS))
+    rel = other_file.relative_to(DOCS).as_posix()
+    if not other_file.exists():
+        return [Issue('parity', 'missing-file', lang, rel, '', 'MISSING FILE')]
+    other = spec_model.load_spec(other_file)
+    found = []
+    en_ops = set(en.by_key)
+    ot_ops = set(other.by_key)
+    for p, m in sorted(en_ops - ot_ops):
+        found.append(Issue('parity', 'missing-op', lang, rel, f'{m.upper()} {p}', 'MISSING op'))
+    for p, m in sorted(ot_ops - en_ops):
+        found.append(Issue('parity', 'extra-op', lang, rel, f'{m.upper()} {p}', 'EXTRA op'))
+    for d in spec_hash.diff(tree(en), tree(other), en.data, other.data):
+        key = op_of(d.pointer)
+        if key is None and d.pointer.count('/') == 2 and d.pointer.startswith('/paths/'):
+            continue  # a whole path item: its ops are reported above
+        if key is not None and key not in (en_ops & ot_ops):
+            continue
+        where = f'{key[1].upper()} {key[0]}' if key else ''
+        if d.kind == 'missing':
+            found.append(Issue('parity', 'missing-node', lang, rel, where, f'{d.pointer} missing', detail=f'en: {d.en}'))
+        elif d.kind == 'extra':
+            found.append(Issue('parity', 'extra-node', lang, rel, where, f'{d.pointer} not in en', detail=f'{lang}: {d.other}'))
+        else:
+            found.append(Issue('parity', 'diverged', lang, rel, where, f'{d.pointer} differs ({d.kind})',
+                               detail=f'en: {d.en}\n{lang}: {d.other}'))
+    return found
+
+def main():
+    total = 0
+    if not spec_model.spec_path('en', Path(DOCS)).exists():
+        print('MISSING FILE: en/api-reference/openapi_service.json'); sys.exit(1)
     for lang in ('zh', 'ja'):
-        other_file = en_file.replace('/en/', f'/{lang}/')
-        if not os.path.exists(other_file):
-            print(f'MISSING FILE: {lang}/api-reference/{name}'); total += 1; continue
-        with open(other_file, encoding='utf-8') as _fh:
-            other = json.load(_fh)
-        en_ops = {(p, m) for p, ms in en['paths'].items() for m in ms if isinstance(ms[m], dict)}
-        ot_ops = {(p, m) for p, ms in other['paths'].items() for m in ms if isinstance(ms[m], dict)}
-        for p, m in sorted(en_ops - ot_ops):
-            print(f'{lang}/{name}: MISSING op {m.upper()} {p}'); total += 1
-        for p, m in sorted(ot_ops - en_ops):
-            print(f'{lang}/{name}: EXTRA op {m.upper()} {p}'); total += 1
-        for p, m in sorted(en_ops & ot_ops):
-            a = op_shape(en['paths'][p][m])
-            b = op_shape(other['paths'][p][m])
-            for key in a:
-                if a[key] != b[key]:
-                    print(f'{lang}/{name}: {m.upper()} {p} differs in {key}:')
-                    print(f'    en: {a[key]}')
-                    print(f'    {lang}: {b[key]}')
-                    total += 1
-print(f'\nTOTAL PARITY ISSUES: {total}')
-sys.exit(1 if total else 0)
+        for issue in parity(lang):
+            total += 1
+            if issue.rule == 'missing-file':
+                print(f'MISSING FILE: {issue.file}'); continue
+            name = f'{lang}/{Path(issue.file).name}'
+            if issue.detail:
+                print(f'{name}: {issue.text}:')
+                for line in issue.detail.splitlines():
+                    print(f'    {line}')
+            else:
+                print(f'{name}: {issue.message} {issue.where}')
+    print(f'\nTOTAL PARITY ISSUES: {total}')
+    sys.exit(1 if total else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""Run lint_specs and parity_check for all languages across a process pool, as one report.
+
+Each (check, language) task (lint en/zh/ja, parity zh/ja vs en) runs in
+its own worker. Their Issue records (issues.py) are merged into one
+report, in which an issue found in several languages is a single entry
+under a stable id. Known issues can be suppressed with a baseline, so
+that only new ones fail the run.
+
+Usage:
+  python3 run_checks.py                                 # text report; exit 1 on any issue
+  python3 run_checks.py --format json > report.json
+  python3 run_checks.py --baseline baseline.json        # exit 1 only on issues not in the baseline
+  python3 run_checks.py --baseline baseline.json --update-baseline
+  python3 run_checks.py --checks lint --lang en --jobs 1
+
+A baseline is a --format json report; --update-baseline writes one
+without the timings, so it only changes when the issues do. An issue is
+suppressed in the languages the baseline lists for its id; baseline ids
+that no longer occur are counted as fixed, as a prompt to refresh the
+file. The baseline of record is baseline.json next to this script; a
+--baseline file that doesn't exist is an error, not an empty baseline.
+
+Env:
+  DOCS  docs repo root
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import lint_specs
+import parity_check
+import spec_model
+from issues import Issue
+
+DOCS = os.environ["DOCS"]
+CHECKS = ("lint", "parity")
+REPORT_VERSION = 1
+
+
+def plan(checks, langs):
+    """(tasks, issues for spec files that are missing); tasks needing a missing file are dropped."""
+    needed = set(langs) | ({"en"} if "parity" in checks else set())
+    missing = {lang for lang in needed if not spec_model.spec_path(lang, Path(DOCS)).exists()}
+    problems = [
+        Issue("files", "missing-file", lang, spec_model.spec_path(lang, Path(DOCS)).relative_to(DOCS).as_posix(), "", "MISSING FILE")
+        for lang in spec_model.LANGS if lang in missing
+    ]
+    tasks = []
+    if "lint" in checks:
+        tasks += [("lint", lang) for lang in langs if lang not in missing]
+    if "parity" in checks and "en" not in missing:
+        tasks += [("parity", lang) for lang in langs if lang != "en" and lang not in missing]
+    return tasks, problems
+
+
+def run_task(task):
+    """Run one (check, lang) task; returns (issues, seconds). Runs in pool workers."""
+    check, lang = task
+    start = time.perf_counter()
+    found = lint_specs.lint_spec(lang) if check == "lint" else parity_check.parity(lang)
+    return found, time.perf_counter() - start
+
+
+def run_all(tasks, jobs):
+    """[(issues, seconds)] per task, in task order, serially or across a process pool (jobs <= 0: one per CPU)."""
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs == 1 or len(tasks) < 2:
+        return [run_task(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        return list(pool.map(run_task, tasks))
+
+
+def merge(found):
+    """One entry per issue id, in first-seen order, listing the languages it occurs in."""
+    merged = {}
+    for issue in found:
+        entry = merged.get(issue.id)
+        if entry is None:
+            entry = merged[issue.id] = {
+                "id": issue.id, "check": issue.check, "rule": issue.rule, "level": issue.level,
+                "where": issue.where, "message": issue.message, "langs": [], "files": [], "details": {},
+            }
+        if issue.lang not in entry["langs"]:
+            entry["langs"].append(issue.lang)
+            entry["files"].append(issue.file)
+        if issue.detail:
+            entry["details"][issue.lang] = issue.detail
+    return list(merged.values())
+
+
+def load_baseline(path):
+    """id -> languages the issue is known in, from a --format json report."""
+    with open(path, encoding="utf-8") as f:
+        doc = json.load(f)
+    return {e["id"]: set(e.get("langs") or spec_model.LANGS) for e in doc.get("issues", [])}
+
+
+def apply_baseline(entries, baseline):
+    """Set each entry's `new` languages (those the baseline doesn't list); returns the fixed baseline ids."""
+    for entry in entries:
+        known = baseline.get(entry["id"], set())
+        entry["new"] = [lang for lang in entry["langs"] if lang not in known]
+    present = {entry["id"] for entry in entries}
+    return sorted(set(baseline) - present)
+
+
+def report(entries, tasks, results, fixed, wall):
+    return {
+        "version": REPORT_VERSION,
+        "summary": {
+            "issues": len(entries),
+            "new": sum(bool(e["new"]) for e in entries),
+            "suppressed": sum(not e["new"] for e in entries),
+            "fixed": len(fixed),
+            "seconds": round(wall, 3),
+        },
+        "tasks": [
+            {"check": check, "lang": lang, "issues": len(found), "seconds": round(secs, 3)}
+            for (check, lang), (found, secs) in zip(tasks, results)
+        ],
+        "issues": entries,
+        "fixed": fixed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the spec lint and parity checks in parallel, as one report")
+    parser.add_argument("--checks", nargs="+", choices=CHECKS, default=list(CHECKS), help="Checks to run (default: both)")
+    parser.add_argument("--lang", nargs="+", choices=spec_model.LANGS, default=list(spec_model.LANGS), help="Languages (default: all)")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=0, metavar="N",
+        help="Run tasks in N worker processes (default: one per CPU; 1 runs them in this process)",
+    )
+    parser.add_argument("--format", choices=("text", "json"), default="text", help="Output format")
+    parser.add_argument("--baseline", type=Path, metavar="FILE", help="Suppress the issues listed in this JSON report")
+    parser.add_argument("--update-baseline", action="store_true", help="Write every current issue to --baseline and exit 0")
+    args = parser.parse_args()
+    if args.update_baseline and args.baseline is None:
+        parser.error("--update-baseline needs --baseline FILE")
+    if args.baseline is not None and not args.update_baseline and not args.baseline.is_file():
+        parser.error(f"baseline not found: {args.baseline}")
+
+    start = time.perf_counter()
+    tasks, problems = plan(args.checks, args.lang)
+    results = run_all(tasks, args.jobs)
+    entries = merge(problems + [issue for found, _ in results for issue in found])
+    wall = time.perf_counter() - start
+
+    if args.update_baseline:
+        apply_baseline(entries, {})
+        doc = {"version": REPORT_VERSION, "issues": entries}
+        args.baseline.write_text(json.dumps(doc, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written: {len(entries)} issues -> {args.baseline}")
+        return
+
+    baseline = load_baseline(args.baseline) if args.baseline is not None else {}
+    fixed = apply_baseline(entries, baseline)
+    doc = report(entries, tasks, results, fixed, wall)
+    new = [e for e in entries if e["new"]]
+
+    if args.format == "json":
+        json.dump(doc, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        sys.exit(1 if new else 0)
+
+    summary = doc["summary"]
+    print(f"\n=== API spec checks: {len(tasks)} tasks in {summary['seconds']:.2f}s ===")
+    for t in doc["tasks"]:
+        print(f"  {t['check']:<6} {t['lang']}  {t['issues']:>4} issues  {t['seconds']:.2f}s")
+    print(f"Issues: {summary['issues']} unique, {summary['new']} new, {summary['suppressed']} suppressed by baseline")
+    if args.baseline is not None:
+        print(f"Fixed since baseline: {summary['fixed']}")
+
+    if new:
+        print(f"\n--- {'New issues' if args.baseline is not None else 'Issues'} ---\n")
+        for e in new:
+            where = f"{e['where']}: " if e["where"] else ""
+            print(f"  [{e['id']}] {e['check']} {' '.join(e['new'])}: {where}{e['message']}")
+            for lang, detail in e["details"].items():
+                if lang in e["new"]:
+                    for line in detail.splitlines():
+                        print(f"      {line}")
+    sys.exit(1 if new else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,466 @@
+"""Compiled JSON Schema validation of spec examples, for lint_specs.py.
+
+Each schema node is compiled once, on first use, into a closure that checks
+a value against it; closures are cached by node for the life of the
+Validator, so the hundreds of examples that share component schemas pay
+for compiling them once. `$ref`s compile to a lazy lookup, so recursive
+schemas are fine.
+
+Covers the OpenAPI 3.0 subset the specs use:
+
+  type, nullable   `integer` excludes booleans; null only where nullable
+                   (or where the schema has no type)
+  enum, format     uuid, date-time, date, email, uri/url, int32/int64, byte
+  bounds           min/maxLength, pattern, minimum/maximum (3.0 boolean
+                   exclusiveMinimum/Maximum), min/maxItems
+  properties       required keys; keys not declared anywhere in the schema
+                   (allOf branches included) unless additionalProperties
+                   is a schema
+  items            every array item, not a sample
+  allOf            every branch, with declared keys merged across branches
+  oneOf, anyOf     dispatched on `discriminator` when there is one, else
+                   exactly one / at least one branch must match; failures
+                   report the closest branch's errors
+  discriminator    on a base schema (the allOf-inheritance form), dispatches
+                   to the mapped subschema
+  not
+
+text/event-stream examples are SSE text: every `data:` payload is checked
+against a discriminated event schema (e.g. ChunkChatEvent) whose mapping
+covers all events in the stream; the stream passes if it fits any of them,
+else the closest one's errors are reported.
+
+Usage:
+  validator = schema_validator.for_spec(spec)
+  for msg in validator.check_example(example): ...
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import datetime
+import json
+import re
+import urllib.parse
+from pathlib import Path
+from typing import Any, Callable
+
+import spec_model
+
+# check(value, location, out): append "`location` ..." messages to out
+Check = Callable[[Any, str, list], None]
+
+TYPE_TESTS = {
+    "null": lambda v: v is None,
+    "boolean": lambda v: isinstance(v, bool),
+    "integer": lambda v: (isinstance(v, int) and not isinstance(v, bool)) or (isinstance(v, float) and v.is_integer()),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "string": lambda v: isinstance(v, str),
+    "array": lambda v: isinstance(v, list),
+    "object": lambda v: isinstance(v, dict),
+}
+UUID_RE = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
+DATE_TIME_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[Tt ]\d{2}:\d{2}:\d{2}(\.\d+)?([Zz]|[+-]\d{2}:\d{2})?$")
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+SSE_DATA_RE = re.compile(r"(?:^|(?<=\s))data:[ \t]*")
+
+
+def _date_time(v: str) -> bool:
+    if not DATE_TIME_RE.match(v):
+        return False
+    try:
+        datetime.datetime.fromisoformat(v.upper().replace("Z", "+00:00"))
+    except ValueError:
+        return False
+    return True
+
+
+def _date(v: str) -> bool:
+    try:
+        return bool(DATE_RE.match(v)) and bool(datetime.date.fromisoformat(v))
+    except ValueError:
+        return False
+
+
+def _uri(v: str) -> bool:
+    parts = urllib.parse.urlsplit(v)
+    return bool(parts.scheme and (parts.netloc or parts.scheme in ("data", "mailto")))
+
+
+def _byte(v: str) -> bool:
+    try:
+        base64.b64decode(v, validate=True)
+    except (binascii.Error, ValueError):
+        return False
+    return True
+
+
+# format -> (JSON type it applies to, test)
+FORMATS = {
+    "uuid": ("string", lambda v: bool(UUID_RE.match(v))),
+    "date-time": ("string", _date_time),
+    "date": ("string", _date),
+    "email": ("string", lambda v: bool(EMAIL_RE.match(v))),
+    "uri": ("string", _uri),
+    "url": ("string", _uri),
+    "byte": ("string", _byte),
+    "int32": ("integer", lambda v: -(2**31) <= v < 2**31),
+    "int64": ("integer", lambda v: -(2**63) <= v < 2**63),
+}
+
+
+def json_type(value: Any) -> str:
+    for name in ("null", "boolean", "integer", "number", "string", "array", "object"):
+        if TYPE_TESTS[name](value):
+            return name
+    return type(value).__name__
+
+
+def _accept(value: Any, loc: str, out: list):
+    pass
+
+
+class Validator:
+    """Compiles one spec's schemas into cached checks and runs examples through them."""
+
+    def __init__(self, spec: spec_model.Spec):
+        self.spec = spec
+        self._compiled: dict[tuple[int, bool], tuple[Any, Check]] = {}
+        self._shapes: dict[int, tuple[frozenset, bool]] = {}
+        # (base schema, discriminator property, mapped event names), for SSE streams
+        self.event_schemas = [
+            (schema, schema["discriminator"]["propertyName"], set(schema["discriminator"].get("mapping", {})))
+            for schema in (spec.data.get("components", {}).get("schemas") or {}).values()
+            if isinstance(schema, dict) and isinstance(schema.get("discriminator"), dict)
+            and "propertyName" in schema["discriminator"]
+            and "oneOf" not in schema and "anyOf" not in schema
+        ]
+
+    def check_example(self, example: spec_model.Example) -> list[str]:
+        """Messages for everything in `example` its schema doesn't allow."""
+        if example.media == "text/event-stream" and isinstance(example.value, str):
+            return self.check_stream(example.value)
+        out: list[str] = []
+        self.compile(example.schema)(example.value, "$", out)
+        return out
+
+    def check_stream(self, text: str) -> list[str]:
+        """Check each `data:` payload of SSE text against its event schema."""
+        out: list[str] = []
+        events = list(sse_payloads(text))
+        if not events or not self.event_schemas:
+            return out
+        for i, payload in enumerate(events):
+            if payload is None:
+                out.append(f"`data[{i}]` is not valid JSON")
+        payloads = [(i, p) for i, p in enumerate(events) if isinstance(p, dict)]
+        candidates = [
+            schema for schema, prop, names in self.event_schemas
+            if all(p.get(prop) in names for _, p in payloads)
+        ]
+        if not candidates:
+            seen = sorted({str(p.get(prop)) for _, p in payloads for _, prop, _ in self.event_schemas})
+            out.append(f"no event schema's discriminator mapping covers all of the stream's events {seen}")
+            return out
+        # The stream may be any app type's whose events it uses: keep the best fit.
+        results = []
+        for schema in candidates:
+            check, errs = self.compile(schema), []
+            for i, payload in payloads:
+                check(payload, f"data[{i}]", errs)
+            if not errs:
+                return out
+            results.append(errs)
+        return out + min(results, key=len)
+
+    def compile(self, schema: Any, closed: bool = True) -> Check:
+        """The cached check for `schema`.
+
+        closed=False compiles it as an allOf branch: no undeclared-key check
+        (the allOf as a whole does that) and no discriminator dispatch (the
+        branch is the base the mapped subschema inherits from).
+        """
+        key = (id(schema), closed)
+        hit = self._compiled.get(key)
+        if hit is None:
+            # Keep the schema alive with its check, so its id is never reused.
+            hit = self._compiled[key] = (schema, self._build(schema, closed))
+        return hit[1]
+
+    def _build(self, schema: Any, closed: bool, dispatch: bool = True) -> Check:
+        if not isinstance(schema, dict):
+            return _accept
+        if "$ref" in schema:
+            target = self.spec.resolve(schema)
+            if not isinstance(target, dict):
+                return _accept  # dangling or cyclic: reported by the $ref integrity check
+            return lambda value, loc, out: self.compile(target, closed)(value, loc, out)
+
+        disc = schema.get("discriminator")
+        if dispatch and closed and isinstance(disc, dict) and "propertyName" in disc and not ("oneOf" in schema or "anyOf" in schema):
+            return self._dispatch(schema, disc, self._build(schema, closed, dispatch=False))
+
+        stype = schema.get("type") if schema.get("type") in TYPE_TESTS else None
+        nullable = schema.get("nullable") is True
+        type_test = TYPE_TESTS.get(stype)
+        checks = self._value_checks(schema, stype)
+        if stype in (None, "object"):
+            checks += self._object_checks(schema, closed)
+        if stype in (None, "array") and "items" in schema:
+            checks.append(self._items_check(schema))
+        for kind in ("oneOf", "anyOf"):
+            if isinstance(schema.get(kind), list):
+                checks.append(self._combinator(schema, kind))
+        for branch in schema.get("allOf") or []:
+            checks.append(self.compile(branch, closed=False))
+        if isinstance(schema.get("not"), dict):
+            negated = self.compile(schema["not"])
+
+            def check_not(value, loc, out):
+                errs: list[str] = []
+                negated(value, loc, errs)
+                if not errs:
+                    out.append(f"`{loc}` matches a schema it must not (`not`)")
+            checks.append(check_not)
+
+        def check(value, loc, out):
+            if value is None:
+                if nullable:
+                    return
+                if stype is not None:
+                    out.append(f"`{loc}` is null but the schema is not nullable")
+                    return
+            elif type_test is not None and not type_test(value):
+                out.append(f"`{loc}` is {json_type(value)}, schema type is {stype}")
+                return
+            for c in checks:
+                c(value, loc, out)
+        return check
+
+    def _value_checks(self, schema: dict, stype: str | None) -> list[Check]:
+        checks: list[Check] = []
+        if isinstance(schema.get("enum"), list):
+            values = schema["enum"]
+
+            def check_enum(value, loc, out):
+                if value is not None and value not in values:
+                    out.append(f"`{loc}` value {value!r} not in enum {values}")
+            checks.append(check_enum)
+
+        fmt = FORMATS.get(schema.get("format"))
+        if fmt is not None:
+            applies, test, name = TYPE_TESTS[fmt[0]], fmt[1], schema["format"]
+
+            def check_format(value, loc, out):
+                if applies(value) and not test(value):
+                    out.append(f"`{loc}` value {value!r} is not a valid {name}")
+            checks.append(check_format)
+
+        if stype in (None, "string"):
+            lo, hi = schema.get("minLength"), schema.get("maxLength")
+            pattern = re.compile(schema["pattern"]) if isinstance(schema.get("pattern"), str) else None
+            if lo is not None or hi is not None or pattern is not None:
+                def check_string(value, loc, out):
+                    if not isinstance(value, str):
+                        return
+                    if lo is not None and len(value) < lo:
+                        out.append(f"`{loc}` is shorter than minLength {lo}")
+                    if hi is not None and len(value) > hi:
+                        out.append(f"`{loc}` is longer than maxLength {hi}")
+                    if pattern is not None and not pattern.search(value):
+                        out.append(f"`{loc}` value {value!r} doesn't match pattern {pattern.pattern!r}")
+                checks.append(check_string)
+
+        if stype in (None, "integer", "number"):
+            lo, hi = schema.get("minimum"), schema.get("maximum")
+            lo_x, hi_x = schema.get("exclusiveMinimum") is True, schema.get("exclusiveMaximum") is True
+            if lo is not None or hi is not None:
+                def check_number(value, loc, out):
+                    if not TYPE_TESTS["number"](value):
+                        return
+                    if lo is not None and (value <= lo if lo_x else value < lo):
+                        out.append(f"`{loc}` value {value!r} is below the minimum {lo}")
+                    if hi is not None and (value >= hi if hi_x else value > hi):
+                        out.append(f"`{loc}` value {value!r} is above the maximum {hi}")
+                checks.append(check_number)
+        return checks
+
+    def _object_checks(self, schema: dict, closed: bool) -> list[Check]:
+        checks: list[Check] = []
+        props = {k: self.compile(v) for k, v in (schema.get("properties") or {}).items()}
+        required = [r for r in schema.get("required") or [] if isinstance(r, str)]
+        if props or required:
+            def check_props(value, loc, out):
+                if not isinstance(value, dict):
+                    return
+                for k, v in value.items():
+                    if k in props:
+                        props[k](v, f"{loc}.{k}", out)
+                for r in required:
+                    if r not in value:
+                        out.append(f"required key `{loc}.{r}` missing from example")
+            checks.append(check_props)
+
+        addl = schema.get("additionalProperties")
+        if isinstance(addl, dict):
+            extra = self.compile(addl)
+            declared = set(props)
+
+            def check_additional(value, loc, out):
+                if isinstance(value, dict):
+                    for k, v in value.items():
+                        if k not in declared:
+                            extra(v, f"{loc}.{k}", out)
+            checks.append(check_additional)
+
+        if closed:
+            keys, open_ = self._shape(schema)
+            if keys and not open_:
+                def check_undeclared(value, loc, out):
+                    if isinstance(value, dict):
+                        for k in value:
+                            if k not in keys:
+                                out.append(f"example key `{loc}.{k}` undeclared in schema")
+                checks.append(check_undeclared)
+        return checks
+
+    def _shape(self, schema: Any) -> tuple[frozenset, bool]:
+        """(keys declared by `schema` and its allOf branches, whether other keys are allowed).
+
+        Keys are open when additionalProperties is a schema, or when the
+        schema is a bare oneOf/anyOf (which branch applies decides the
+        keys). Combinator branches beside `properties` add their keys.
+        """
+        schema = self.spec.resolve(schema)
+        if not isinstance(schema, dict):
+            return frozenset(), True
+        if id(schema) in self._shapes:
+            return self._shapes[id(schema)]
+        self._shapes[id(schema)] = (frozenset(), True)  # an allOf loop declares nothing more
+        keys = set(schema.get("properties") or {})
+        open_ = isinstance(schema.get("additionalProperties"), dict)
+        branches = list(schema.get("allOf") or [])
+        for kind in ("oneOf", "anyOf"):
+            if kind in schema:
+                if "properties" in schema:
+                    branches += schema[kind]
+                else:
+                    open_ = True
+        for branch in branches:
+            branch_keys, branch_open = self._shape(branch)
+            keys |= branch_keys
+            open_ = open_ or branch_open
+        shape = self._shapes[id(schema)] = (frozenset(keys), open_)
+        return shape
+
+    def _items_check(self, schema: dict) -> Check:
+        item = self.compile(schema["items"])
+        lo, hi = schema.get("minItems"), schema.get("maxItems")
+
+        def check_items(value, loc, out):
+            if not isinstance(value, list):
+                return
+            if lo is not None and len(value) < lo:
+                out.append(f"`{loc}` has {len(value)} items, fewer than minItems {lo}")
+            if hi is not None and len(value) > hi:
+                out.append(f"`{loc}` has {len(value)} items, more than maxItems {hi}")
+            for i, v in enumerate(value):
+                item(v, f"{loc}[{i}]", out)
+        return check_items
+
+    def _combinator(self, schema: dict, kind: str) -> Check:
+        # Branches next to `properties` only refine the parent's keys, which
+        # the parent checks; bare alternatives are each checked as closed.
+        refining = "properties" in schema
+        branches = [self.compile(b, closed=not refining) for b in schema[kind]]
+        disc = schema.get("discriminator")
+        dispatch = self._dispatch(schema, disc, None) if isinstance(disc, dict) and "propertyName" in disc else None
+
+        def check_branches(value, loc, out):
+            if dispatch is not None and isinstance(value, dict):
+                dispatch(value, loc, out)
+                return
+            results = []
+            for branch in branches:
+                errs: list[str] = []
+                branch(value, loc, errs)
+                results.append(errs)
+            passed = sum(not errs for errs in results)
+            if passed == 1 or (passed and kind == "anyOf"):
+                return
+            if passed:
+                out.append(f"`{loc}` matches {passed} of the oneOf branches, expected exactly one")
+                return
+            i, errs = min(enumerate(results), key=lambda r: len(r[1]))
+            out.append(f"`{loc}` matches none of the {len(branches)} {kind} branches (closest, #{i}: {'; '.join(errs)})")
+        return check_branches
+
+    def _dispatch(self, schema: dict, disc: dict, own: Check | None) -> Check:
+        """Check an object against the subschema its discriminator value maps to.
+
+        Mapping values are schema refs; a value missing from the mapping is
+        taken as a schema name, per the OpenAPI implicit mapping. A base
+        schema may name itself, and is then checked with `own`.
+        """
+        prop = disc["propertyName"]
+        mapping = disc.get("mapping") or {}
+        targets: dict[str, Any] = {}
+
+        def target_for(name: str) -> Any:
+            if name not in targets:
+                ref = mapping.get(name, f"#/components/schemas/{name}")
+                node = spec_model.json_pointer(ref, self.spec.data) if ref.startswith("#") else None
+                targets[name] = self.spec.resolve(node)
+            return targets[name]
+
+        def check_dispatch(value, loc, out):
+            if not isinstance(value, dict):
+                out.append(f"`{loc}` is {json_type(value)}, expected an object with a `{prop}` discriminator")
+                return
+            name = value.get(prop)
+            if name is None:
+                out.append(f"required key `{loc}.{prop}` (discriminator) missing from example")
+                return
+            target = target_for(str(name))
+            if target is schema and own is not None:
+                own(value, loc, out)
+                return
+            if not isinstance(target, dict) or target is schema:
+                out.append(f"`{loc}.{prop}` value {name!r} is not in the discriminator mapping")
+                return
+            self.compile(target)(value, loc, out)
+        return check_dispatch
+
+
+def sse_payloads(text: str):
+    """The JSON payload of each `data:` field in SSE text, None where it isn't JSON.
+
+    Events may be separated by blank lines or, in single-line examples, by
+    plain spaces; scanning resumes after each decoded payload, so a
+    `data:` inside a JSON string is never mistaken for a field.
+    """
+    decoder = json.JSONDecoder()
+    pos = 0
+    while True:
+        m = SSE_DATA_RE.search(text, pos)
+        if m is None:
+            return
+        try:
+            payload, pos = decoder.raw_decode(text, m.end())
+        except ValueError:
+            yield None
+            pos = m.end()
+        else:
+            yield payload
+
+
+_validators: dict[Path, Validator] = {}
+
+
+def for_spec(spec: spec_model.Spec) -> Validator:
+    """The (memoized) Validator for one loaded spec."""
+    if spec.file not in _validators:
+        _validators[spec.file] = Validator(spec)
+    return _validators[spec.file]
@@ -0,0 +1,156 @@
+"""Merkle hashes of a spec's non-translatable structure, and a diff that walks only what differs.
+
+hash_tree() hashes a parsed spec bottom-up. Every dict, list and leaf gets
+a digest of its own content and its children's digests, so two subtrees
+with equal digests are structurally identical and need no further look.
+diff() compares two trees (en and a translation) from the root. It skips
+equal digests in O(1), descends only into branches whose digests differ,
+and yields each divergence with its JSON pointer.
+
+Translated text is left out of the hashes:
+
+- title, summary, description and x-mint sidebarTitle;
+- x-codeSamples labels and operationId (the translations keep their own
+  legacy ids);
+- tag labels: an operation's `tags` items and the top-level tags' `name`.
+  Their count still counts; `wire` aligns them by position.
+- strings inside example values (`example`, `examples/*/value`). Their
+  keys, types and non-string values still count.
+- the `/en/` prefix of route strings such as x-mint href, hashed as `/`.
+
+The order of a `required` list doesn't count either.
+
+These are only skipped as keywords. Under maps of names (properties,
+schemas, paths, responses, ...) a key like `description` is a field
+name and is hashed like any other.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from typing import Any, Iterator, NamedTuple
+
+TRANSLATABLE_KEYS = {"title", "summary", "description", "sidebarTitle", "label", "operationId"}
+# Keywords whose value maps names (not keywords) to subtrees.
+NAME_MAPS = {
+    "paths", "properties", "patternProperties", "schemas", "responses", "content", "examples",
+    "headers", "parameters", "requestBodies", "securitySchemes", "mapping", "variables",
+    "links", "callbacks", "encoding",
+}
+LANG_ROUTE_RE = re.compile(r"^/(?:en|zh|ja)/")
+
+# Hashing modes: how a node's keys and leaves are read.
+SPEC, NAMES, DATA, TAGS = "spec", "names", "data", "tags"
+
+
+class Node(NamedTuple):
+    """One hashed subtree: its digest and its hashed children (None for a leaf)."""
+
+    digest: bytes
+    children: dict[str, Node] | list[Node] | None
+
+
+class Divergence(NamedTuple):
+    pointer: str  # JSON pointer into both specs (en's indexes for lists)
+    kind: str  # missing | extra | value | type | length
+    en: Any  # en's value (a summary for containers); None for `extra`
+    other: Any  # the translation's; None for `missing`
+
+
+def _child_mode(mode: str, key: str, value: Any) -> str:
+    if mode in (DATA, TAGS):
+        return mode
+    if mode == NAMES:
+        return SPEC
+    if key in ("example", "value"):
+        return DATA
+    if key == "tags":
+        return TAGS
+    if key in NAME_MAPS and isinstance(value, dict):
+        return NAMES
+    return SPEC
+
+
+def _skipped(mode: str, key: str) -> bool:
+    return mode in (SPEC, TAGS) and key in TRANSLATABLE_KEYS
+
+
+def _leaf(value: Any, mode: str, key: str | None) -> bytes:
+    if isinstance(value, str):
+        if mode == DATA or (mode == TAGS and key in (None, "name")):
+            return b"s"  # translated text: only its type counts
+        value = LANG_ROUTE_RE.sub("/", value)
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def hash_tree(node: Any, mode: str = SPEC, key: str | None = None) -> Node:
+    """The Merkle tree of `node` (a parsed spec, or any subtree of one)."""
+    h = hashlib.sha1()
+    if isinstance(node, dict):
+        children = {}
+        h.update(b"{")
+        for k in sorted(node):
+            if _skipped(mode, k):
+                continue
+            child = children[k] = hash_tree(node[k], _child_mode(mode, k, node[k]), k)
+            h.update(k.encode("utf-8"))
+            h.update(b"\0")
+            h.update(child.digest)
+        return Node(h.digest(), children)
+    if isinstance(node, list):
+        items = [hash_tree(v, mode, None) for v in node]
+        h.update(b"[")
+        # `required` is a set: its order doesn't count
+        for digest in sorted(i.digest for i in items) if key == "required" and mode == SPEC else (i.digest for i in items):
+            h.update(digest)
+        return Node(h.digest(), items)
+    h.update(_leaf(node, mode, key))
+    return Node(h.digest(), None)
+
+
+def escape(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _summary(value: Any) -> Any:
+    """A value for a report line: leaves as they are, containers by size."""
+    if isinstance(value, dict):
+        return f"{{{len(value)} keys}}"
+    if isinstance(value, list):
+        return value if all(not isinstance(v, (dict, list)) for v in value) else f"[{len(value)} items]"
+    return value
+
+
+def diff(a: Node, b: Node, a_value: Any, b_value: Any, pointer: str = "") -> Iterator[Divergence]:
+    """Divergences between two hashed trees, walking only subtrees whose digests differ.
+
+    a_value/b_value are the parsed nodes the trees were hashed from; they
+    are only read where something differs, for the report.
+    """
+    if a.digest == b.digest:
+        return
+    if isinstance(a.children, dict) and isinstance(b.children, dict):
+        for k, child in a.children.items():
+            if k not in b.children:
+                yield Divergence(f"{pointer}/{escape(k)}", "missing", _summary(a_value[k]), None)
+            else:
+                yield from diff(child, b.children[k], a_value[k], b_value[k], f"{pointer}/{escape(k)}")
+        for k in b.children:
+            if k not in a.children:
+                yield Divergence(f"{pointer}/{escape(k)}", "extra", None, _summary(b_value[k]))
+    elif isinstance(a.children, list) and isinstance(b.children, list):
+        if len(a.children) != len(b.children):
+            yield Divergence(pointer or "/", "length", _summary(a_value), _summary(b_value))
+            return
+        if all(n.children is None for n in a.children + b.children):
+            # enum, required and the like: one report for the whole list
+            yield Divergence(pointer or "/", "value", a_value, b_value)
+            return
+        for i, (x, y) in enumerate(zip(a.children, b.children)):
+            yield from diff(x, y, a_value[i], b_value[i], f"{pointer}/{i}")
+    elif (a.children is None) != (b.children is None) or type(a_value) is not type(b_value):
+        yield Divergence(pointer or "/", "type", _summary(a_value), _summary(b_value))
+    else:
+        yield Divergence(pointer or "/", "value", _summary(a_value), _summary(b_value))
@@ -0,0 +1,279 @@
+"""Shared, cached model of the Service API specs for the pipeline scripts.
+
+Each {lang}/api-reference/openapi_service.json is loaded at most once per
+process and indexed up front:
+
+  ops          every operation, in document order
+  by_key       (path, method) -> Operation
+  by_blank     (path with {params} blanked, method) -> [Operation]
+  by_tag       tag -> [Operation]
+  by_href      x-mint.href -> Operation
+  refs         every `$ref` string in the spec -> the node it points at
+  ref_targets  every `$ref` -> the node at the end of its $ref chain (see
+               compile_refs; resolve() looks schemas up here)
+  enums        (JSON pointer, values) for every `enum` list
+  examples     request/response media examples with their schemas
+               (also by (path, method) in examples_by_key)
+
+The parsed spec and its indexes are snapshotted with pickle to
+.cache/spec-model/ (one file per resolved spec path), keyed by the spec
+file's mtime and size and, when
+those changed, its SHA-256, so a rerun skips both the JSON parse and the
+indexing.
+
+Usage:
+  import spec_model
+  spec = spec_model.load("en")
+  op = spec.by_key[("/chat-messages", "post")]
+
+Env:
+  DOCS  docs repo root (default: two levels above this file)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import re
+from pathlib import Path
+from typing import Any, NamedTuple
+
+REPO = Path(os.environ.get("DOCS", Path(__file__).resolve().parents[2]))
+LANGS = ("en", "zh", "ja")
+HTTP_METHODS = {"get", "post", "put", "patch", "delete", "head", "options", "trace"}
+SNAPSHOT_DIR = REPO / ".cache" / "spec-model"
+# Bump when Spec's fields or indexes change, so old snapshots are rebuilt.
+SNAPSHOT_VERSION = 3
+
+
+def blank(path: str) -> str:
+    """`/apps/{app_id}/x` -> `/apps/{}/x`, to match paths that differ only in param names."""
+    return re.sub(r"\{[^}]+\}", "{}", path)
+
+
+def spec_path(lang: str, root: Path = REPO) -> Path:
+    return root / lang / "api-reference" / "openapi_service.json"
+
+
+class Operation(NamedTuple):
+    path: str
+    method: str
+    op: dict
+
+    @property
+    def key(self) -> str:
+        """`POST /chat-messages`, as docs.json and memberships.json spell it."""
+        return f"{self.method.upper()} {self.path}"
+
+    @property
+    def href(self) -> str | None:
+        return (self.op.get("x-mint") or {}).get("href")
+
+
+class Example(NamedTuple):
+    """One media example: where is e.g. `req[(example)]` or `resp200[streaming]`."""
+
+    path: str
+    method: str
+    where: str
+    value: Any
+    schema: dict
+    media: str  # content type, e.g. application/json or text/event-stream
+
+
+def iter_examples(media: dict):
+    """Yield (name, value) for a media object's `example` and `examples`."""
+    if "example" in media:
+        yield "(example)", media["example"]
+    for name, ex in media.get("examples", {}).items():
+        if isinstance(ex, dict) and "value" in ex:
+            yield name, ex["value"]
+
+
+def json_pointer(ref: str, data: dict) -> Any:
+    """The node a local `#/a/b` reference points at, or None if it doesn't exist."""
+    node = data
+    for part in ref.lstrip("#/").split("/"):
+        part = part.replace("~1", "/").replace("~0", "~")
+        if isinstance(node, dict) and part in node:
+            node = node[part]
+        elif isinstance(node, list) and part.isdigit() and int(part) < len(node):
+            node = node[int(part)]
+        else:
+            return None
+    return node
+
+
+def compile_refs(refs: dict[str, Any]) -> tuple[dict[str, Any], list[list[str]]]:
+    """Follow every $ref chain to its final, non-$ref node, once.
+
+    `refs` maps each $ref to the node it points at directly, which may be
+    another `{"$ref": ...}`. Returns (targets, cycles): targets maps each
+    $ref to its final node (None if the chain dangles or loops), and each
+    cycle is listed once as the refs around it, first repeated at the end.
+    Every chain is walked a single time; later refs stop at the first
+    already-compiled link.
+    """
+    targets: dict[str, Any] = {}
+    cycles: list[list[str]] = []
+    for ref in refs:
+        chain: list[str] = []
+        on_chain: set[str] = set()
+        current = ref
+        while True:
+            if current in targets:
+                final = targets[current]
+                break
+            if current in on_chain:
+                cycles.append(chain[chain.index(current):] + [current])
+                final = None
+                break
+            chain.append(current)
+            on_chain.add(current)
+            node = refs.get(current)
+            if isinstance(node, dict) and isinstance(node.get("$ref"), str):
+                current = node["$ref"]
+                continue
+            final = node
+            break
+        for link in chain:
+            targets[link] = final
+    return targets, cycles
+
+
+class Spec:
+    """One language's spec (`data`, the parsed JSON) and its indexes."""
+
+    def __init__(self, file: Path, data: dict):
+        self.file = file
+        self.data = data
+        self.ops: list[Operation] = [
+            Operation(path, method, op)
+            for path, item in data.get("paths", {}).items()
+            for method, op in item.items()
+            if method in HTTP_METHODS and isinstance(op, dict)
+        ]
+        self.by_key = {(o.path, o.method): o for o in self.ops}
+        self.by_blank: dict[tuple[str, str], list[Operation]] = {}
+        self.by_tag: dict[str, list[Operation]] = {}
+        self.by_href: dict[str, Operation] = {}
+        self.examples_by_key: dict[tuple[str, str], list[Example]] = {}
+        for o in self.ops:
+            self.by_blank.setdefault((blank(o.path), o.method), []).append(o)
+            for tag in o.op.get("tags", []):
+                self.by_tag.setdefault(tag, []).append(o)
+            if o.href:
+                self.by_href[o.href] = o
+            self.examples_by_key[o.path, o.method] = self._op_examples(o)
+        self.examples = [e for found in self.examples_by_key.values() for e in found]
+
+        self.refs: dict[str, Any] = {}
+        self.enums: list[tuple[str, list]] = []
+        self._walk(data, "")
+        self.ref_targets, self.ref_cycles = compile_refs(self.refs)
+
+    @property
+    def lang(self) -> str:
+        return self.file.parent.parent.name
+
+    def resolve(self, schema: Any) -> Any:
+        """`schema` itself, or if it is a $ref, the node its chain ends at.
+
+        None for a dangling or cyclic $ref (see ref_cycles). A table
+        lookup: chains were followed once, in compile_refs.
+        """
+        if isinstance(schema, dict) and "$ref" in schema:
+            return self.ref_targets.get(schema["$ref"])
+        return schema
+
+    @staticmethod
+    def _op_examples(o: Operation) -> list[Example]:
+        found = []
+        for ctype, media in ((o.op.get("requestBody") or {}).get("content") or {}).items():
+            for name, value in iter_examples(media):
+                found.append(Example(o.path, o.method, f"req[{name}]", value, media.get("schema", {}), ctype))
+        for code, resp in (o.op.get("responses") or {}).items():
+            for ctype, media in (resp.get("content") or {}).items():
+                for name, value in iter_examples(media):
+                    found.append(Example(o.path, o.method, f"resp{code}[{name}]", value, media.get("schema", {}), ctype))
+        return found
+
+    def _walk(self, node: Any, pointer: str):
+        """Fill refs and enums in one pass over the whole document."""
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str) and ref.startswith("#") and ref not in self.refs:
+                self.refs[ref] = json_pointer(ref, self.data)
+            if isinstance(node.get("enum"), list):
+                self.enums.append((pointer, node["enum"]))
+            for k, v in node.items():
+                if isinstance(v, (dict, list)):
+                    self._walk(v, f"{pointer}/{k.replace('~', '~0').replace('/', '~1')}")
+        elif isinstance(node, list):
+            for i, v in enumerate(node):
+                if isinstance(v, (dict, list)):
+                    self._walk(v, f"{pointer}/{i}")
+
+
+_loaded: dict[Path, Spec] = {}
+
+
+def load_spec(file: Path, snapshot: bool = True) -> Spec:
+    """The Spec for `file`: memoized, else from its snapshot, else parsed and indexed.
+
+    Raises OSError if the file is missing and ValueError if it isn't JSON.
+    """
+    file = Path(file)
+    if file in _loaded:
+        return _loaded[file]
+    st = file.stat()
+    stat = (st.st_mtime_ns, st.st_size)
+    snap_file = snapshot_file(file)
+    snap = _read_snapshot(snap_file) if snapshot else None
+    spec = None
+    if snap is not None and snap["stat"] == stat:
+        spec = snap["spec"]
+    else:
+        raw = file.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        if snap is not None and snap["sha256"] == digest:
+            spec = snap["spec"]  # touched, not changed
+        else:
+            spec = Spec(file, json.loads(raw))
+        if snapshot:
+            _write_snapshot(snap_file, {"version": SNAPSHOT_VERSION, "stat": stat, "sha256": digest, "spec": spec})
+    spec.file = file
+    _loaded[file] = spec
+    return spec
+
+
+def snapshot_file(file: Path) -> Path:
+    """`{lang}-{stem}-{hash of the resolved path}.pickle`: specs in other trees
+    (fixtures, worktrees) with the same language and name keep their own snapshot."""
+    key = hashlib.sha256(str(file.resolve()).encode("utf-8")).hexdigest()[:12]
+    return SNAPSHOT_DIR / f"{file.parent.parent.name}-{file.stem}-{key}.pickle"
+
+
+def load(lang: str, root: Path = REPO) -> Spec:
+    return load_spec(spec_path(lang, root))
+
+
+def _read_snapshot(path: Path) -> dict | None:
+    try:
+        with open(path, "rb") as f:
+            snap = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError):
+        return None
+    if not isinstance(snap, dict) or snap.get("version") != SNAPSHOT_VERSION:
+        return None
+    return snap
+
+
+def _write_snapshot(path: Path, snap: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")  # workers may snapshot the same spec at once
+    with open(tmp, "wb") as f:
+        pickle.dump(snap, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
@@ -6,18 +6,16 @@ decorators are themselves hand-maintained.
 
 import json
 import os
-import re
 import urllib.request
-from collections import defaultdict
+from pathlib import Path
+
+import spec_model
+from spec_model import blank
 
 DOCS = os.environ["DOCS"]
 SWAGGER_URL = os.environ.get("SWAGGER_URL", "http://localhost:15001/v1/swagger.json")
 
 
-def blank(p):
-    return re.sub(r"\{[^}]+\}", "{}", p)
-
-
 with urllib.request.urlopen(SWAGGER_URL, timeout=20) as _fh:
     swagger = json.load(_fh)
 print(f"swagger version: {swagger.get('swagger') or swagger.get('openapi')}, paths: {len(swagger['paths'])}")
@@ -39,23 +37,22 @@ for p, ms in swagger["paths"].items():
         }
 
 spec_ops = {}
-for f in [f"{DOCS}/en/api-reference/openapi_service.json"]:
-    with open(f, encoding='utf-8') as _fh:
-        spec = json.load(_fh)
-    name = f.split("/")[-1]
-    for p, ms in spec["paths"].items():
-        for m, op in ms.items():
-            if m not in ("get", "post", "put", "patch", "delete"):
-                continue
-            params = {}
-            for prm in op.get("parameters", []) or []:
-                if prm.get("in") in ("query", "path"):
-                    params[(prm["name"], prm["in"])] = bool(prm.get("required"))
-            key = (blank(p), m)
-            e = spec_ops.setdefault(key, {"path": p, "params": {}, "responses": set(), "specs": []})
-            e["params"].update(params)
-            e["responses"] |= set((op.get("responses") or {}).keys())
-            e["specs"].append(name)
+for f in [spec_model.spec_path("en", Path(DOCS))]:
+    spec = spec_model.load_spec(f)
+    name = f.name
+    for o in spec.ops:
+        p, m, op = o.path, o.method, o.op
+        if m not in ("get", "post", "put", "patch", "delete"):
+            continue
+        params = {}
+        for prm in op.get("parameters", []) or []:
+            if prm.get("in") in ("query", "path"):
+                params[(prm["name"], prm["in"])] = bool(prm.get("required"))
+        key = (blank(p), m)
+        e = spec_ops.setdefault(key, {"path": p, "params": {}, "responses": set(), "specs": []})
+        e["params"].update(params)
+        e["responses"] |= set((op.get("responses") or {}).keys())
+        e["specs"].append(name)
 
 shared = sorted(set(code_ops) & set(spec_ops))
 print(f"shared operations: {len(shared)}\n")
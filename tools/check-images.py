@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Index local image assets and report unused, missing and duplicate images.
+
+Usage:
+    python3 tools/check-images.py                 # Full report
+    python3 tools/check-images.py --jobs 8        # Hash images in 8 worker processes
+    python3 tools/check-images.py --format json   # Machine-readable report
+
+References are the links in every doc page's record in the shared docs
+index, tools/docs_index.py (markdown images, `[text](url)`, `src=`/`href=`,
+including `<Frame>` and `<img>` bodies), plus `/images/...` strings in
+docs.json and the site's CSS/JS. Every file under IMAGE_DIRS is then
+matched against them:
+
+- unused: no reference anywhere (candidates for deletion);
+- missing: a reference to a local image that doesn't exist (exit 1);
+- duplicates: byte-identical files (same SHA-256), hashed in parallel.
+
+Near-duplicates (re-exported or slightly recompressed screenshots) are
+found with a 64-bit difference hash when Pillow is installed
+(`pip install Pillow`); without it that section is skipped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import sys
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+try:
+    from PIL import Image
+except ImportError:  # near-duplicate detection is optional
+    Image = None
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+IMAGE_DIRS = ["images", "logo"]
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".avif", ".ico"}
+# Non-page files that can reference images by absolute path.
+ASSET_SOURCES = ["docs.json", "style.css", "contributing-footer.js"]
+ASSET_PATH_RE = re.compile(r"""(?<![\w.])/(?:%s)/[^\s"'()<>]+""" % "|".join(map(re.escape, IMAGE_DIRS)))
+# Max differing bits between two difference hashes to call images near-duplicates.
+NEAR_DUPLICATE_BITS = 4
+
+_spec = importlib.util.spec_from_file_location("check_links", Path(__file__).with_name("check-links.py"))
+check_links = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(check_links)
+
+
+class ImageRef(NamedTuple):
+    """One reference to a local image: where it is and the path it resolves to."""
+
+    file: str
+    line: int
+    url: str
+    path: str  # repo-relative, e.g. images/use-dify/foo.png
+
+
+class Fingerprint(NamedTuple):
+    size: int
+    sha256: str
+    dhash: int | None  # None without Pillow, or if the image can't be decoded
+
+
+def image_path(url: str, source_file: Path) -> str | None:
+    """Repo-relative path of a local image link, or None for anything else."""
+    if check_links.classify_link(url) != "internal":
+        return None
+    rel = urllib.parse.unquote(check_links.link_path_key(url, source_file))
+    if rel.split("/", 1)[0] in IMAGE_DIRS or Path(rel).suffix.lower() in IMAGE_EXTS:
+        return rel
+    return None
+
+
+def collect_references(jobs: int, cache) -> tuple[list[ImageRef], int]:
+    """Every local image reference in the repo, plus the number of external image URLs."""
+    refs: list[ImageRef] = []
+    external = 0
+    pages = check_links.find_mdx_files()
+    scans = check_links.scan_files(pages, jobs, cache)
+    for f in pages:
+        rel = f.relative_to(REPO_ROOT).as_posix()
+        for line, kind, url, _ in scans[f].links:
+            path = image_path(url, f)
+            if path is not None:
+                refs.append(ImageRef(rel, line, url, path))
+            elif kind in ("image", "src") and check_links.classify_link(url) == "external":
+                external += 1
+
+    for name in ASSET_SOURCES:
+        source = REPO_ROOT / name
+        if not source.is_file():
+            continue
+        text = source.read_text(encoding="utf-8")
+        for m in ASSET_PATH_RE.finditer(text):
+            line = text.count("\n", 0, m.start()) + 1
+            refs.append(ImageRef(name, line, m.group(0), urllib.parse.unquote(m.group(0).lstrip("/"))))
+    return refs, external
+
+
+def find_images() -> list[Path]:
+    """All image files under IMAGE_DIRS."""
+    return sorted(
+        p for d in IMAGE_DIRS if (REPO_ROOT / d).is_dir()
+        for p in (REPO_ROOT / d).rglob("*")
+        if p.is_file() and p.suffix.lower() in IMAGE_EXTS
+    )
+
+
+def difference_hash(path: Path) -> int | None:
+    """64-bit dHash: sign of horizontal gradients on a 9x8 grayscale thumbnail."""
+    if Image is None or path.suffix.lower() == ".svg":
+        return None
+    try:
+        with Image.open(path) as img:
+            pixels = list(img.convert("L").resize((9, 8)).getdata())
+    except (OSError, ValueError):
+        return None
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return bits
+
+
+def fingerprint(path: Path) -> Fingerprint:
+    """Size, SHA-256 and difference hash of one image. Runs in pool workers."""
+    data = path.read_bytes()
+    return Fingerprint(len(data), hashlib.sha256(data).hexdigest(), difference_hash(path))
+
+
+def fingerprint_all(images: list[Path], jobs: int) -> dict[Path, Fingerprint]:
+    """Fingerprint images serially or across a process pool (jobs <= 0: one per CPU)."""
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs == 1 or len(images) < 2:
+        return {p: fingerprint(p) for p in images}
+    chunksize = max(1, len(images) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return dict(zip(images, pool.map(fingerprint, images, chunksize=chunksize)))
+
+
+def near_duplicate_groups(prints: dict[str, Fingerprint], exact: set[str], max_bits: int) -> list[list[str]]:
+    """Groups of images whose difference hashes differ in at most max_bits bits.
+
+    Images already reported as byte-identical copies (other than the first
+    of each set) are left out, so a group never restates an exact match.
+    """
+    hashed = [(rel, fp.dhash) for rel, fp in prints.items() if fp.dhash is not None and rel not in exact]
+    parent = {rel: rel for rel, _ in hashed}
+
+    def root(rel: str) -> str:
+        while parent[rel] != rel:
+            parent[rel] = parent[parent[rel]]
+            rel = parent[rel]
+        return rel
+
+    for i, (a, ha) in enumerate(hashed):
+        for b, hb in hashed[i + 1:]:
+            if (ha ^ hb).bit_count() <= max_bits:
+                parent[root(b)] = root(a)
+    groups: dict[str, list[str]] = {}
+    for rel, _ in hashed:
+        groups.setdefault(root(rel), []).append(rel)
+    return [sorted(g) for g in groups.values() if len(g) > 1]
+
+
+def human_size(n: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n < 1024 or unit == "MB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report unused, missing and duplicate images")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=0, metavar="N",
+        help="Scan pages and hash images in N worker processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Don't read or write the docs index cache (.cache/docs-index.json)",
+    )
+    parser.add_argument(
+        "--near-bits", type=int, default=NEAR_DUPLICATE_BITS, metavar="N",
+        help=f"Near-duplicate threshold in differing hash bits (default: {NEAR_DUPLICATE_BITS}; needs Pillow)",
+    )
+    parser.add_argument("--format", choices=("text", "json"), default="text", help="Output format")
+    args = parser.parse_args()
+
+    cache = check_links.DocsIndex(None if args.no_cache else check_links.CACHE_FILE)
+    refs, external = collect_references(args.jobs, cache)
+    images = find_images()
+    prints = {p.relative_to(REPO_ROOT).as_posix(): fp for p, fp in fingerprint_all(images, args.jobs).items()}
+
+    refs_by_path: dict[str, list[ImageRef]] = {}
+    for ref in refs:
+        refs_by_path.setdefault(ref.path, []).append(ref)
+    unused = [rel for rel in prints if rel not in refs_by_path]
+    missing = [ref for ref in refs if ref.path not in prints]
+
+    by_digest: dict[str, list[str]] = {}
+    for rel, fp in prints.items():
+        by_digest.setdefault(fp.sha256, []).append(rel)
+    # Keep the most-referenced copy of each set; the rest are redundant.
+    duplicates = [
+        sorted(group, key=lambda rel: (-len(refs_by_path.get(rel, [])), rel))
+        for group in by_digest.values() if len(group) > 1
+    ]
+    redundant = {rel for group in duplicates for rel in group[1:]}
+    near = near_duplicate_groups(prints, redundant, args.near_bits) if Image is not None else None
+
+    unused_bytes = sum(prints[rel].size for rel in unused)
+    redundant_bytes = sum(prints[rel].size for rel in redundant)
+
+    if args.format == "json":
+        json.dump({
+            "images": len(prints),
+            "bytes": sum(fp.size for fp in prints.values()),
+            "references": len(refs),
+            "external_references": external,
+            "unused": [{"path": rel, "bytes": prints[rel].size} for rel in unused],
+            "missing": [ref._asdict() for ref in missing],
+            "duplicates": [
+                {"keep": group[0], "redundant": group[1:], "bytes": prints[group[0]].size}
+                for group in duplicates
+            ],
+            "near_duplicates": near,
+        }, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        sys.exit(1 if missing else 0)
+
+    print(f"\n=== Image Asset Check ===")
+    print(f"Images indexed: {len(prints)} ({human_size(sum(fp.size for fp in prints.values()))})")
+    print(check_links.cache_summary(cache))
+    print(f"Local image references: {len(refs)}")
+    print(f"External image references (not checked): {external}")
+    print(f"Unused images: {len(unused)} ({human_size(unused_bytes)})")
+    print(f"Missing images: {len(missing)}")
+    print(f"Byte-identical duplicates: {len(redundant)} redundant copies ({human_size(redundant_bytes)})")
+    if near is None:
+        print("Near-duplicates: skipped (Pillow not installed)")
+    else:
+        print(f"Near-duplicate groups: {len(near)}")
+
+    if missing:
+        print(f"\n--- Missing Images ---\n")
+        for ref in missing:
+            print(f"  {ref.file}:L{ref.line}: {ref.url}")
+
+    if unused:
+        print(f"\n--- Unused Images ---\n")
+        for rel in unused:
+            print(f"  {rel} ({human_size(prints[rel].size)})")
+
+    if duplicates:
+        print(f"\n--- Byte-Identical Duplicates (first is kept) ---\n")
+        for group in duplicates:
+            print(f"  {human_size(prints[group[0]].size)}:")
+            for rel in group:
+                print(f"    {rel} ({len(refs_by_path.get(rel, []))} references)")
+
+    if near:
+        print(f"\n--- Near-Duplicates (review manually) ---\n")
+        for group in near:
+            print("  " + ", ".join(group))
+
+    sys.exit(1 if missing else 0)
+
+
+if __name__ == "__main__":
+    main()
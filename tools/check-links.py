@@ -4,38 +4,90 @@
 Usage:
     python3 tools/check-links.py --internal     # Check internal links (fast, no network)
     python3 tools/check-links.py --external     # Check external links (slow, network requests)
+    python3 tools/check-links.py --external --fragments   # ...and their #fragments
     python3 tools/check-links.py --all          # Check both
+    python3 tools/check-links.py --orphans      # Report pages nothing links to
+    python3 tools/check-links.py --parity       # Check en/zh/ja pages mirror each other
+    python3 tools/check-links.py --staged       # Pre-commit: staged pages and pages linking to them
+    python3 tools/check-links.py --watch        # Recheck pages as they are saved
+    python3 tools/check-links.py --internal --jobs 8   # Scan files in 8 worker processes
+    python3 tools/check-links.py --internal --format sarif > links.sarif
+    python3 tools/check-links.py --all --timings       # Per-phase wall time and counts
+    python3 tools/check-links.py --internal --fix      # Apply high-confidence suggestions
+
+Pages are parsed through the shared docs index (tools/docs_index.py),
+persisted in .cache/docs-index.json and keyed by content hash, so reruns
+only reparse changed files. Pass --no-cache to
+bypass the cache or --rebuild-cache to discard it. External results are
+kept in .cache/check-links-external.sqlite and reused until they expire
+(--ttl-ok / --ttl-fail), after which they are revalidated with
+conditional requests.
+
+    python3 tools/check-links.py --internal --changed-since origin/main
+
+checks only the links in pages changed since the merge base with the
+given ref, plus every page that links into a changed or deleted page.
+--staged does the same for the changes staged for commit; it is what
+.githooks/pre-commit runs.
 """
 
 from __future__ import annotations
 
 import argparse
+import contextlib
+import ctypes
+import ctypes.util
+import email.utils
+import functools
+import html
+import heapq
+import http.client
 import json
+import os
+import posixpath
 import re
+import select
+import sqlite3
+import ssl
+import struct
+import subprocess
 import sys
+import threading
+import time
 import urllib.error
 import urllib.parse
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import NamedTuple
+
+from docs_index import (
+    CACHE_FILE, DOC_DIRS, STRUCTURE_KEYS, DocsIndex, PageRecord,
+    anchors_from_text, find_pages, parse_source, tokenize_links,
+)
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
-DOC_DIRS = ["en", "zh", "ja"]
 DOCS_JSON = REPO_ROOT / "docs.json"
-
-# Regex patterns
-MD_LINK_RE = re.compile(r"\[([^\]]*)\]\(([^)]+)\)")
-HTML_HREF_RE = re.compile(r'href="([^"]+)"')
-HTML_SRC_RE = re.compile(r'src="([^"]+)"')
-HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*$", re.MULTILINE)
-CUSTOM_ID_RE = re.compile(r"\{#([\w-]+)\}")
-HTML_ID_RE = re.compile(r"""<a\s+[^>]*\bid=["']([\w-]+)["']""", re.IGNORECASE)
-CODE_FENCE_RE = re.compile(r"```.*?```", re.DOTALL)
-# Mintlify components whose `title=` attribute generates an anchor (e.g.,
-# `<Tab title="Workflow Tool">` → `#workflow-tool`).
-TAB_TITLE_RE = re.compile(
-    r"""<(?:Tab|Accordion)\b[^>]*\btitle=["']([^"']+)["']""",
-    re.IGNORECASE,
-)
+EXTERNAL_CACHE_FILE = REPO_ROOT / ".cache" / "check-links-external.sqlite"
+
+USER_AGENT = "Mozilla/5.0 (Dify-Docs-LinkChecker/1.0)"
+HTTP_TIMEOUT = 10
+MAX_REDIRECTS = 5
+# Attempts per request when a host answers 429/503; Retry-After is honored
+# up to MAX_RETRY_AFTER seconds, else we back off exponentially.
+MAX_ATTEMPTS = 3
+MAX_RETRY_AFTER = 60
+REDIRECT_CODES = {301, 302, 303, 307, 308}
+# External fragment checks (--fragments) stream at most this many bytes of
+# a page, in chunks, and stop as soon as every wanted anchor has been seen.
+FRAGMENT_BUDGET = 2 * 1024 * 1024
+FRAGMENT_CHUNK = 64 * 1024
+ANCHOR_ATTR_RE = re.compile(rb"""(?<![\w-])(?:id|name)\s*=\s*["']?([^"'\s>]+)""", re.IGNORECASE)
+# Fragments no static HTML can confirm: GitHub line ranges (#L10-L20),
+# client-side routes (#/path, #!path) and text fragments (#:~:text=).
+UNCHECKABLE_FRAGMENT_RE = re.compile(r"^(?:L\d+(?:C\d+)?(?:-L\d+(?:C\d+)?)?|[/!].*|:~:.*)$")
+# Domains that reliably block automated requests or are geo-restricted
+SKIP_DOMAINS = {"assets-docs.dify.ai", "volcengine.com", "twitter.com", "x.com"}
 
 # Per-file anchor cache: file path -> set of valid anchor slugs
 _anchor_cache: dict[Path, set[str]] = {}
@@ -43,43 +95,15 @@ _anchor_cache: dict[Path, set[str]] = {}
 
 def find_mdx_files() -> list[Path]:
     """Find all .md and .mdx files in doc directories."""
-    files = []
-    for d in DOC_DIRS:
-        doc_dir = REPO_ROOT / d
-        if doc_dir.exists():
-            files.extend(doc_dir.rglob("*.md"))
-            files.extend(doc_dir.rglob("*.mdx"))
-    return sorted(files)
-
-
-def extract_links(file_path: Path) -> list[tuple[int, str, str]]:
-    """Extract all links from a file. Returns [(line_num, link_text, url)]."""
-    links = []
-    try:
-        content = file_path.read_text(encoding="utf-8")
-    except (UnicodeDecodeError, OSError):
-        return links
-
-    for i, line in enumerate(content.splitlines(), 1):
-        # Markdown links [text](url)
-        for match in MD_LINK_RE.finditer(line):
-            text, url = match.group(1), match.group(2)
-            links.append((i, text, url))
-        # HTML href="url"
-        for match in HTML_HREF_RE.finditer(line):
-            url = match.group(1)
-            if url not in [m.group(2) for m in MD_LINK_RE.finditer(line)]:
-                links.append((i, "(html href)", url))
-        # HTML src="url" (images)
-        for match in HTML_SRC_RE.finditer(line):
-            url = match.group(1)
-            links.append((i, "(html src)", url))
-
-    return links
+    return find_pages(REPO_ROOT)
 
 
+@functools.lru_cache(maxsize=8192)
 def classify_link(url: str) -> str:
-    """Classify a link as internal, external, anchor, or skip."""
+    """Classify a link as internal, external, anchor, or skip.
+
+    Memoized: the same URLs recur across pages and all three languages.
+    """
     if url.startswith(("http://", "https://")):
         # Skip localhost/loopback URLs
         try:
@@ -104,12 +128,65 @@ def classify_link(url: str) -> str:
     return "skip"
 
 
+# Every file and directory under the repo, as repo-relative POSIX paths
+# ("" is the root). Built once per run by build_path_index().
+_repo_paths: set[str] = set()
+# Link key -> resolved path. A key is a normalized repo-relative path as a
+# link would spell it: exact, extensionless (`foo` -> foo.mdx), or a
+# directory standing for its index page (`foo` -> foo/index.mdx).
+_link_index: dict[str, Path] = {}
+
+# Resolution priority per link form, mirroring the probing order links have
+# always used: exact path, then .mdx/.md/.json, then index.mdx/index.md.
+_EXT_PRIORITY = {".mdx": 1, ".md": 2, ".json": 3}
+_INDEX_PRIORITY = {"index.mdx": 4, "index.md": 5}
+_SKIP_DIRS = {".git", ".cache", "node_modules", "__pycache__"}
+
+
+def build_path_index():
+    """Walk the repo once and index every path a link can resolve to."""
+    global _page_suggester
+    _repo_paths.clear()
+    _link_index.clear()
+    _page_suggester = None
+    best: dict[str, int] = {}
+
+    def offer(key: str, rel: str, priority: int):
+        if priority < best.get(key, 99):
+            best[key] = priority
+            _link_index[key] = REPO_ROOT / rel if rel else REPO_ROOT
+
+    for dirpath, dirnames, filenames in os.walk(REPO_ROOT):
+        dirnames[:] = [d for d in dirnames if d not in _SKIP_DIRS]
+        rel_dir = Path(dirpath).relative_to(REPO_ROOT).as_posix()
+        rel_dir = "" if rel_dir == "." else rel_dir
+        _repo_paths.add(rel_dir)
+        offer(rel_dir, rel_dir, 0)
+        for name in filenames:
+            rel = f"{rel_dir}/{name}" if rel_dir else name
+            _repo_paths.add(rel)
+            offer(rel, rel, 0)
+            stem, ext = posixpath.splitext(rel)
+            if ext in _EXT_PRIORITY:
+                offer(stem, rel, _EXT_PRIORITY[ext])
+            if name in _INDEX_PRIORITY:
+                offer(rel_dir, rel, _INDEX_PRIORITY[name])
+
+
+def path_exists(rel: str) -> bool:
+    """Whether a repo-relative path exists, answered from the path index."""
+    if not _repo_paths:
+        build_path_index()
+    return rel in _repo_paths
+
+
 def resolve_internal_link(url: str, source_file: Path) -> Path | None:
     """Resolve an internal link to a file path. Returns None if unresolved.
 
     Absolute links (`/foo/bar`) resolve against the repo root.
     Relative links (`./foo`, `../bar`) resolve against source_file's
-    parent directory.
+    parent directory. Resolution is a single lookup in the prebuilt path
+    index (see build_path_index), not filesystem probing.
 
     Returns REPO_ROOT for the bare root URL "/" (treated as valid but
     has no associated file for anchor lookup).
@@ -120,64 +197,149 @@ def resolve_internal_link(url: str, source_file: Path) -> Path | None:
     if not url or url == "/":
         return REPO_ROOT
 
+    if not _link_index:
+        build_path_index()
+    return _link_index.get(link_path_key(url, source_file))
+
+
+def link_path_key(url: str, source_file: Path) -> str:
+    """Normalize a link's path part to a repo-relative path (no leading "/")."""
+    url = url.split("#")[0].split("?")[0]
     if url.startswith("./") or url.startswith("../"):
-        base = source_file.parent
-        clean = url
+        base = source_file.parent.relative_to(REPO_ROOT).as_posix()
+        key = posixpath.normpath(posixpath.join(base, url))
     else:
-        base = REPO_ROOT
-        clean = url.lstrip("/")
-
-    # Try exact path
-    candidate = (base / clean).resolve()
-    if candidate.exists():
-        return candidate
-
-    # Try with common extensions
-    for ext in [".mdx", ".md", ".json"]:
-        candidate = (base / (clean + ext)).resolve()
-        if candidate.exists():
-            return candidate
-
-    # Try as directory with index
-    for ext in [".mdx", ".md"]:
-        candidate = (base / clean / ("index" + ext)).resolve()
-        if candidate.exists():
-            return candidate
-
-    return None
-
-
-def slugify(text: str) -> str:
-    """Convert heading text to a Mintlify-style anchor slug.
-
-    Lowercase, strip ASCII punctuation and markdown markers, turn
-    whitespace into hyphens, collapse and trim. Non-ASCII characters (CJK
-    text and full-width punctuation like "：") are kept, matching Mintlify,
-    so an English heading's ASCII ":" is dropped while a zh/ja heading's
-    "：" is preserved.
-    """
-    s = text.lower().strip()
-    # Strip JSX/HTML tags but keep their inner text. Mintlify renders a
-    # heading's components and includes their text in the anchor, e.g.
-    # `## Switch Your Workspace <Badge color="blue">Cloud</Badge>` ->
-    # `#switch-your-workspace-cloud`. Dropping the tag markup (not the
-    # "Cloud" text) avoids mangling the attributes into the slug.
-    s = re.sub(r"<[^>]+>", "", s)
-    # Strip inline markdown formatting markers (backticks and asterisks).
-    # Underscores are preserved — they appear in identifier headings like
-    # `retrieval_setting` and Mintlify keeps them in the slug.
-    s = re.sub(r"[`*]", "", s)
-    # Strip Pandoc/kramdown custom-id syntax if embedded in heading text
-    s = CUSTOM_ID_RE.sub("", s)
-    # Strip ASCII punctuation only; the negated class keeps every non-ASCII
-    # char (CJK text and full-width punctuation like "："), which Mintlify
-    # preserves in the slug.
-    s = re.sub(r"[^\w\s\u0080-\U0010ffff-]", "", s, flags=re.UNICODE)
-    # Whitespace → hyphen
-    s = re.sub(r"\s+", "-", s)
-    # Collapse hyphens, trim
-    s = re.sub(r"-+", "-", s).strip("-")
-    return s
+        key = posixpath.normpath(url.lstrip("/"))
+    return "" if key == "." else key
+
+
+def _trigrams(text: str) -> set[str]:
+    text = f"\x02{text}\x03"
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _dice(a: set[str], b: set[str]) -> float:
+    return 2 * len(a & b) / (len(a) + len(b)) if a or b else 0.0
+
+
+class TrigramIndex:
+    """Fuzzy lookup of strings by trigram overlap (Dice coefficient).
+
+    Postings lists map each trigram to the items containing it, so a
+    query only touches items sharing at least one trigram with it. The
+    few best by shared count are then rescored exactly.
+    """
+
+    RESCORE = 8
+
+    def __init__(self, items):
+        self.items = list(items)
+        self.grams = [_trigrams(item) for item in self.items]
+        self.postings: dict[str, list[int]] = {}
+        for i, grams in enumerate(self.grams):
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(i)
+
+    def search(self, query: str, limit: int = 2) -> list[tuple[float, str]]:
+        """The `limit` best (score, item) pairs, best first."""
+        q = _trigrams(query)
+        shared: dict[int, int] = {}
+        for gram in q:
+            for i in self.postings.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        top = heapq.nlargest(self.RESCORE, shared, key=shared.__getitem__)
+        scored = [(_dice(q, self.grams[i]), self.items[i]) for i in top]
+        return heapq.nlargest(limit, scored)
+
+
+class PageSuggester:
+    """"Did you mean" index over every page's link path, per language.
+
+    A page path is scored on the whole path and on its last segment, so a
+    page that moved directories (en/cloud/... -> en/self-host/...) still
+    matches on its unchanged slug.
+    """
+
+    def __init__(self, pages: list[str]):
+        by_lang: dict[str, list[str]] = {}
+        for page in pages:
+            by_lang.setdefault(page.split("/", 1)[0], []).append(page)
+        self.paths = {lang: TrigramIndex(items) for lang, items in by_lang.items()}
+        self.slugs = {
+            lang: TrigramIndex({posixpath.basename(p) for p in items})
+            for lang, items in by_lang.items()
+        }
+        self.by_slug: dict[tuple[str, str], list[str]] = {}
+        for page in pages:
+            lang = page.split("/", 1)[0]
+            self.by_slug.setdefault((lang, posixpath.basename(page)), []).append(page)
+
+    def search(self, key: str, limit: int = 2) -> list[tuple[float, str]]:
+        lang = key.split("/", 1)[0]
+        if lang not in self.paths:
+            return []
+        grams, slug = _trigrams(key), posixpath.basename(key)
+        candidates = {page for _, page in self.paths[lang].search(key, TrigramIndex.RESCORE)}
+        for _, found in self.slugs[lang].search(slug, 3):
+            candidates.update(self.by_slug[lang, found])
+        scored = [
+            ((_dice(grams, _trigrams(page)) + _dice(_trigrams(slug), _trigrams(posixpath.basename(page)))) / 2,
+             page)
+            for page in candidates
+        ]
+        return heapq.nlargest(limit, scored)
+
+
+_page_suggester: PageSuggester | None = None
+
+# A suggestion is offered from SUGGEST_MIN_SCORE; --fix only applies it
+# from FIX_MIN_SCORE and when it beats the runner-up by FIX_MIN_MARGIN.
+SUGGEST_MIN_SCORE = 0.5
+FIX_MIN_SCORE = 0.8
+FIX_MIN_MARGIN = 0.1
+
+
+def _best_suggestion(ranked: list[tuple[float, str]]) -> tuple[str, float] | None:
+    """The top candidate and its confidence, or None below SUGGEST_MIN_SCORE.
+
+    Confidence is the score, capped just under FIX_MIN_SCORE when the
+    runner-up is too close to call.
+    """
+    if not ranked or ranked[0][0] < SUGGEST_MIN_SCORE:
+        return None
+    score, best = ranked[0]
+    if len(ranked) > 1 and score - ranked[1][0] < FIX_MIN_MARGIN:
+        score = min(score, FIX_MIN_SCORE - 0.01)
+    return best, round(score, 2)
+
+
+def _replace_path(url: str, path: str) -> str:
+    """`url` with its path swapped for `path`, keeping any #anchor or ?query."""
+    cut = min((i for i in (url.find("#"), url.find("?")) if i >= 0), default=len(url))
+    return path + url[cut:]
+
+
+def suggest_page(url: str, source_file: Path) -> tuple[str, float] | None:
+    """Best existing page for a broken internal link, as (fixed url, confidence)."""
+    global _page_suggester
+    if not _link_index:
+        build_path_index()
+    if _page_suggester is None:
+        _page_suggester = PageSuggester([
+            key for key, path in _link_index.items()
+            if path.suffix in (".mdx", ".md") and not posixpath.splitext(key)[1]
+            and key.split("/", 1)[0] in DOC_DIRS
+        ])
+    found = _best_suggestion(_page_suggester.search(link_path_key(url, source_file)))
+    return (_replace_path(url, "/" + found[0]), found[1]) if found else None
+
+
+def suggest_anchor(url: str, anchors: set[str]) -> tuple[str, float] | None:
+    """Best anchor of the target page for a broken anchor, as (fixed url, confidence)."""
+    base, _, anchor = url.partition("#")
+    anchor, query = anchor.split("?")[0], anchor[len(anchor.split("?")[0]):]
+    found = _best_suggestion(TrigramIndex(anchors).search(anchor)) if anchors else None
+    return (f"{base}#{found[0]}{query}", found[1]) if found else None
 
 
 def extract_anchors(file_path: Path) -> set[str]:
@@ -186,48 +348,48 @@ def extract_anchors(file_path: Path) -> set[str]:
         return _anchor_cache[file_path]
 
     anchors: set[str] = set()
-    if not file_path.is_file():
-        _anchor_cache[file_path] = anchors
-        return anchors
+    if file_path.is_file():
+        try:
+            anchors, _ = anchors_from_text(file_path.read_text(encoding="utf-8"))
+        except (UnicodeDecodeError, OSError):
+            pass
 
-    try:
-        content = file_path.read_text(encoding="utf-8")
-    except (UnicodeDecodeError, OSError):
-        _anchor_cache[file_path] = anchors
-        return anchors
-
-    # Strip fenced code blocks so `# comment` lines aren't picked up as headings
-    content = CODE_FENCE_RE.sub("", content)
-
-    counts: dict[str, int] = {}
-    for match in HEADING_RE.finditer(content):
-        text = match.group(2)
-        custom = CUSTOM_ID_RE.search(text)
-        if custom:
-            anchors.add(custom.group(1))
-            continue
-        slug = slugify(text)
-        if not slug:
-            continue
-        if slug not in counts:
-            counts[slug] = 1
-            anchors.add(slug)
-        else:
-            anchors.add(f"{slug}-{counts[slug]}")
-            counts[slug] += 1
+    _anchor_cache[file_path] = anchors
+    return anchors
 
-    # Standalone <a id="..."> anchors
-    for match in HTML_ID_RE.finditer(content):
-        anchors.add(match.group(1))
 
-    # Mintlify Tab/Accordion titles also produce anchors
-    for match in TAB_TITLE_RE.finditer(content):
-        slug = slugify(match.group(1))
-        if slug:
-            anchors.add(slug)
+def scan_files(
+    files: list[Path], jobs: int = 1, cache: DocsIndex | None = None
+) -> dict[Path, PageRecord]:
+    """Load files' records from the docs index, parsing misses in parallel.
 
-    _anchor_cache[file_path] = anchors
-    return anchors
+    Files are independent, so workers only extract; the caller resolves
+    targets afterwards. The returned dict keeps the order of `files`, and
+    the records' anchors are merged into `_anchor_cache` so later lookups
+    for in-corpus targets never reparse a file. jobs <= 0 means one worker
+    per CPU.
+    """
+    if cache is None:
+        cache = DocsIndex(None)
+    scans = cache.load(files, jobs)
+    for f, scan in scans.items():
+        _anchor_cache[f] = scan.anchors
+    return scans
+
+
+def scan_corpus(jobs: int, cache: DocsIndex) -> tuple[list[Path], dict[Path, PageRecord]]:
+    """Find and scan every doc page, timed as the discovery/extraction phases."""
+    with _timings.phase("discovery", "files"):
+        files = find_mdx_files()
+    _timings.add("discovery", count=len(files), unit="files")
+    with _timings.phase("extraction", "files"):
+        scans = scan_files(files, jobs, cache)
+    _timings.add("extraction", count=len(files), unit="files")
+    return files, scans
+
+
+def cache_summary(cache: DocsIndex) -> str:
+    return cache.summary()
 
 
 def anchor_check_skipped(url: str, resolved: Path) -> bool:
@@ -245,74 +407,718 @@ def anchor_check_skipped(url: str, resolved: Path) -> bool:
     return False
 
 
-def check_docs_json() -> list[tuple[str, str]]:
-    """Check that docs.json entries point to real files."""
+class Finding(NamedTuple):
+    """One reported problem, in the shape --format json/sarif emits.
+
+    kind is the link kind (md, image, href, src) or what the entry is in
+    docs.json (nav, redirect); rule is the check that failed (see RULES).
+    line is 0 when the problem has no single line. confidence (0-1) rates
+    a suggested fix; --fix applies those at or above FIX_MIN_SCORE.
+    """
+
+    file: str
+    line: int
+    url: str
+    kind: str
+    rule: str
+    reason: str
+    fix: str | None = None
+    level: str = "error"
+    confidence: float | None = None
+
+
+RULES = {
+    "broken-link": "Internal link target does not exist",
+    "broken-anchor": "Link anchor not found in the target page",
+    "via-redirect": "Internal link only resolves through a docs.json redirect",
+    "docs-json": "docs.json navigation entry does not resolve",
+    "redirect": "docs.json redirect loops or has a missing destination",
+    "redirect-chain": "docs.json redirect points at another redirect",
+    "broken-external": "External link returned an error",
+    "broken-fragment": "External link's #fragment not found on the page",
+    "missing-counterpart": "Page has no counterpart in another language",
+    "structure-mismatch": "Translated page's structure differs from the English page",
+    "wrong-language-link": "Link points into another language's tree",
+}
+
+
+def docs_json_line(value: str, key: str | None = None) -> int:
+    """Line of the first `"value"` string in docs.json (optionally as `"key": "value"`), or 0."""
+    try:
+        text = DOCS_JSON.read_text(encoding="utf-8")
+    except OSError:
+        return 0
+    prefix = rf'"{re.escape(key)}"\s*:\s*' if key else ""
+    m = re.search(prefix + re.escape(json.dumps(value)), text)
+    return text.count("\n", 0, m.start()) + 1 if m else 0
+
+
+class PhaseTimings:
+    """Wall time and item counts per check phase, reported by --timings.
+
+    Phases accumulate, so a phase that runs twice (e.g. discovery under
+    --all) reports the total.
+    """
+
+    PHASES = ("discovery", "extraction", "anchors", "resolution", "docs.json", "external", "fragments")
+
+    def __init__(self):
+        self.phases: dict[str, list] = {}  # name -> [seconds, count, unit]
+
+    def add(self, name: str, seconds: float = 0.0, count: int = 0, unit: str = "items"):
+        entry = self.phases.setdefault(name, [0.0, 0, unit])
+        entry[0] += seconds
+        entry[1] += count
+
+    @contextlib.contextmanager
+    def phase(self, name: str, unit: str = "items"):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, unit=unit)
+
+    def as_dict(self) -> dict[str, dict]:
+        return {
+            name: {"ms": round(self.phases[name][0] * 1000, 1),
+                   "count": self.phases[name][1], "unit": self.phases[name][2]}
+            for name in self.PHASES if name in self.phases
+        }
+
+    def print(self):
+        print(f"\n--- Timings ---\n")
+        for name, t in self.as_dict().items():
+            print(f"  {name:<12} {t['ms']:>9.1f} ms  {t['count']:>6} {t['unit']}")
+
+
+_timings = PhaseTimings()
+
+
+# Mintlify navigation divisions: container key -> label key of its items.
+# Any division may nest any other, e.g. languages[].products[].tabs[].menu[]
+# .groups[] (what merge_specs.py wire writes) or the older
+# languages[].versions[].dropdowns[].
+NAV_DIVISIONS = {
+    "languages": "language",
+    "versions": "version",
+    "products": "product",
+    "tabs": "tab",
+    "anchors": "anchor",
+    "dropdowns": "dropdown",
+    "menu": "item",
+    "groups": "group",
+}
+HTTP_METHOD_RE = re.compile(r"^(GET|POST|PUT|PATCH|DELETE|HEAD|OPTIONS|TRACE)\s+(\S+)$", re.IGNORECASE)
+
+
+class NavEntry(NamedTuple):
+    """One page reference in docs.json navigation.
+
+    page is an MDX path (`en/home`) or, under an `openapi` group, an
+    operation (`POST /chat-messages`); trail is the breadcrumb of division
+    and group labels leading to it; openapi is the governing spec path.
+    """
+
+    page: str
+    trail: tuple[str, ...]
+    openapi: str | None
+
+
+def _openapi_source(node: dict) -> str | None:
+    spec = node.get("openapi")
+    if isinstance(spec, dict):
+        spec = spec.get("source")
+    return spec if isinstance(spec, str) else None
+
+
+def walk_navigation(node, trail: tuple[str, ...] = (), openapi: str | None = None) -> list[NavEntry]:
+    """Flatten a navigation tree into NavEntry records, in document order."""
+    entries: list[NavEntry] = []
+    if isinstance(node, str):
+        entries.append(NavEntry(node, trail, openapi))
+        return entries
+    if isinstance(node, list):
+        for item in node:
+            entries.extend(walk_navigation(item, trail, openapi))
+        return entries
+    if not isinstance(node, dict):
+        return entries
+
+    openapi = _openapi_source(node) or openapi
+    for label_key in NAV_DIVISIONS.values():
+        if label_key in node and isinstance(node[label_key], str):
+            trail = trail + (node[label_key],)
+            break
+    if isinstance(node.get("root"), str):
+        entries.append(NavEntry(node["root"], trail, openapi))
+    for container in (*NAV_DIVISIONS, "pages"):
+        if container in node:
+            entries.extend(walk_navigation(node[container], trail, openapi))
+    return entries
+
+
+def navigation_entries(data: dict) -> list[NavEntry]:
+    """Every page reference in docs.json, current or legacy (top-level tabs) layout."""
+    if "navigation" in data:
+        return walk_navigation(data["navigation"])
+    return walk_navigation({"tabs": data.get("tabs", [])})
+
+
+_spec_ops: dict[str, set[tuple[str, str]] | None] = {}
+
+
+def openapi_operations(spec_path: str) -> set[tuple[str, str]] | None:
+    """(METHOD, path) pairs defined by an OpenAPI spec, or None if unreadable."""
+    if spec_path not in _spec_ops:
+        ops = None
+        try:
+            spec = json.loads((REPO_ROOT / spec_path.lstrip("/")).read_text(encoding="utf-8"))
+            ops = {
+                (method.upper(), path)
+                for path, item in spec.get("paths", {}).items()
+                for method in item
+                if HTTP_METHOD_RE.match(f"{method} {path}")
+            }
+        except (OSError, ValueError, AttributeError):
+            pass
+        _spec_ops[spec_path] = ops
+    return _spec_ops[spec_path]
+
+
+def check_docs_json() -> list[Finding]:
+    """Check that every docs.json navigation entry points at something real.
+
+    Pages must exist as files (exact, .mdx or .md); operation entries under
+    an `openapi` group must exist in that spec. All lookups hit the path
+    index or a per-spec operation set, so this is one pass over the tree.
+    """
     issues = []
     if not DOCS_JSON.exists():
-        return [("docs.json", "File not found")]
+        return [Finding("docs.json", 0, "", "nav", "docs-json", "File not found")]
 
     try:
         data = json.loads(DOCS_JSON.read_text(encoding="utf-8"))
     except (json.JSONDecodeError, OSError) as e:
-        return [("docs.json", f"Parse error: {e}")]
+        line = getattr(e, "lineno", 0)
+        return [Finding("docs.json", line, "", "nav", "docs-json", f"Parse error: {e}")]
+
+    entries = navigation_entries(data)
+    for entry in entries:
+        context = f"[{' > '.join(entry.trail)}] " if entry.trail else ""
+        op = HTTP_METHOD_RE.match(entry.page)
+        if op and entry.openapi:
+            ops = openapi_operations(entry.openapi)
+            if ops is None:
+                issues.append((entry.openapi, f"{context}OpenAPI spec '{entry.openapi}' — not found or unreadable"))
+            elif (op.group(1).upper(), op.group(2)) not in ops:
+                issues.append((entry.page, f"{context}Entry '{entry.page}' — operation not in {entry.openapi}"))
+            continue
+        if not any(path_exists(entry.page + ext) for ext in ("", ".mdx", ".md")):
+            issues.append((entry.page, f"{context}Entry '{entry.page}' — file not found"))
+    _timings.add("docs.json", count=len(entries), unit="entries")
 
-    def check_pages(pages: list, context: str = ""):
-        if not isinstance(pages, list):
-            return
-        for item in pages:
-            if isinstance(item, str):
-                # Direct page reference
-                path = item
-                found = False
-                for ext in ["", ".mdx", ".md"]:
-                    if (REPO_ROOT / (path + ext)).exists():
-                        found = True
-                        break
-                if not found:
-                    issues.append(("docs.json", f"{context}Entry '{path}' — file not found"))
-            elif isinstance(item, dict):
-                # Group with pages
-                group_name = item.get("group", "(unnamed)")
-                sub_pages = item.get("pages", [])
-                check_pages(sub_pages, f"{context}{group_name} > ")
-
-    # Traverse the docs.json structure
-    # Supports: navigation.languages[].versions[].dropdowns[].pages (Mintlify v2)
-    # Also supports: tabs[].pages (legacy)
-    nav = data.get("navigation", {})
-    languages = nav.get("languages", [])
-    if languages:
-        for lang in languages:
-            lang_code = lang.get("language", "?")
-            for version in lang.get("versions", []):
-                ver_name = version.get("version", "?")
-                for dropdown in version.get("dropdowns", []):
-                    dd_name = dropdown.get("dropdown", "(unnamed)")
-                    check_pages(
-                        dropdown.get("pages", []),
-                        f"[{lang_code}/{ver_name}/{dd_name}] ",
-                    )
-    elif "tabs" in data:
-        # Legacy flat structure
-        for tab in data["tabs"]:
-            tab_name = tab.get("tab", "(unnamed tab)")
-            check_pages(tab.get("pages", []), f"[{tab_name}] ")
-
-    return issues
-
-
-def check_internal_links():
-    """Check all internal links, anchors, and docs.json entries."""
+    # An unreadable spec is reported once, not for each of its operations.
+    return [
+        Finding("docs.json", docs_json_line(value), value, "nav", "docs-json", message)
+        for value, message in dict.fromkeys(issues)
+    ]
+
+
+class RedirectRule(NamedTuple):
+    index: int
+    source: str
+    destination: str
+
+
+class _TrieNode:
+    __slots__ = ("literal", "param", "wildcard", "rules")
+
+    def __init__(self):
+        self.literal: dict[str, _TrieNode] = {}
+        self.param: dict[str, _TrieNode] = {}  # `:name` -> child
+        self.wildcard: list[tuple[str, int]] = []  # (`:name*`, rule index)
+        self.rules: list[int] = []  # rules whose source ends here
+
+
+class RedirectTable:
+    """docs.json `redirects` compiled into a segment trie.
+
+    Sources are split on "/" into literal segments, `:name` (one segment)
+    and a trailing `:name*` (zero or more segments). A lookup walks the
+    trie once per path segment, following at most a literal, the `:name`
+    children and any wildcard at each node, so it costs O(path length)
+    rather than a scan of every rule. Like Mintlify, the first matching
+    rule in docs.json order wins.
+    """
+
+    MAX_HOPS = 10
+
+    def __init__(self, redirects: list[dict]):
+        self.rules: list[RedirectRule] = []
+        self.root = _TrieNode()
+        for item in redirects:
+            source, dest = item.get("source"), item.get("destination")
+            if not isinstance(source, str) or not isinstance(dest, str):
+                continue
+            rule = RedirectRule(len(self.rules), source, dest)
+            self.rules.append(rule)
+            node = self.root
+            for seg in self._segments(source):
+                if seg.startswith(":") and seg.endswith("*"):
+                    node.wildcard.append((seg[1:-1], rule.index))
+                    break
+                if seg.startswith(":"):
+                    node = node.param.setdefault(seg[1:], _TrieNode())
+                else:
+                    node = node.literal.setdefault(seg, _TrieNode())
+            else:
+                node.rules.append(rule.index)
+
+    @staticmethod
+    def _segments(path: str) -> list[str]:
+        return [seg for seg in path.split("?")[0].split("#")[0].split("/") if seg]
+
+    def match(self, path: str) -> tuple[RedirectRule, str] | None:
+        """The first rule whose source matches `path`, and the destination it yields."""
+        segs = self._segments(path)
+        best: tuple[int, dict[str, str]] | None = None
+
+        def visit(node: _TrieNode, i: int, params: dict[str, str]):
+            nonlocal best
+            for name, index in node.wildcard:
+                if best is None or index < best[0]:
+                    best = (index, {**params, name: "/".join(segs[i:])})
+            if i == len(segs):
+                for index in node.rules:
+                    if best is None or index < best[0]:
+                        best = (index, params)
+                return
+            child = node.literal.get(segs[i])
+            if child is not None:
+                visit(child, i + 1, params)
+            for name, child in node.param.items():
+                visit(child, i + 1, {**params, name: segs[i]})
+
+        visit(self.root, 0, {})
+        if best is None:
+            return None
+        rule = self.rules[best[0]]
+        return rule, self._substitute(rule.destination, best[1])
+
+    @staticmethod
+    def _substitute(destination: str, params: dict[str, str]) -> str:
+        out = []
+        for seg in destination.split("/"):
+            name = seg[1:].rstrip("*") if seg.startswith(":") else None
+            out.append(params.get(name, seg) if name is not None else seg)
+        dest = "/".join(out)
+        return dest.rstrip("/") if dest != "/" else dest
+
+    def follow(self, path: str) -> tuple[list[str], bool]:
+        """Follow redirects from `path`.
+
+        Returns (hops, looped): hops lists every path visited, starting with
+        `path`; looped is True when a path repeats or MAX_HOPS is exceeded.
+        """
+        hops = [path]
+        while True:
+            found = self.match(hops[-1])
+            if found is None:
+                return hops, False
+            dest = found[1]
+            if dest in hops or len(hops) > self.MAX_HOPS:
+                return hops + [dest], True
+            hops.append(dest)
+            if dest.startswith(("http://", "https://")):
+                return hops, False
+
+
+_redirect_table: RedirectTable | None = None
+
+
+def redirect_table() -> RedirectTable:
+    """The compiled docs.json redirects (empty if docs.json is unreadable)."""
+    global _redirect_table
+    if _redirect_table is None:
+        try:
+            data = json.loads(DOCS_JSON.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = {}
+        _redirect_table = RedirectTable(data.get("redirects", []) if isinstance(data, dict) else [])
+    return _redirect_table
+
+
+def resolve_redirect_target(path: str) -> Path | None:
+    """Resolve a redirect destination path to a file, like a link would."""
+    if path.startswith(("http://", "https://")):
+        return REPO_ROOT
+    return resolve_internal_link(path, REPO_ROOT / "docs.json")
+
+
+# Placeholder segment used to instantiate `:param` destinations when
+# checking rules statically; it can only match `:param`/wildcard sources.
+_PROBE_SEGMENT = "\0probe"
+
+
+def check_redirects() -> tuple[list[Finding], list[Finding]]:
+    """Check the redirect table for loops, chains and dead destinations.
+
+    Returns (errors, warnings). A destination with parameters can't be
+    resolved as-is, so it's instantiated with a placeholder segment: that
+    still finds chains and loops through other parameterized rules, and
+    the static prefix before the first parameter must exist as a directory.
+    Destinations under /api-reference/ are Mintlify-generated pages with no
+    file, and are accepted as long as they don't loop.
+    """
+    table = redirect_table()
+    errors: list[Finding] = []
+    warnings: list[Finding] = []
+    _timings.add("docs.json", count=len(table.rules), unit="entries")
+    for rule in table.rules:
+        label = f"redirect #{rule.index + 1} {rule.source} → {rule.destination}"
+        dest = rule.destination
+        if dest.startswith(("http://", "https://")):
+            continue
+
+        def finding(rule_id: str, message: str, fix: str | None = None, level: str = "error"):
+            line = docs_json_line(rule.source, "source")
+            return Finding("docs.json", line, rule.source, "redirect", rule_id, message, fix, level)
+
+        probe = "/".join(_PROBE_SEGMENT if seg.startswith(":") else seg for seg in dest.split("/"))
+        hops, looped = table.follow(probe)
+        shown = " → ".join(hop.replace(_PROBE_SEGMENT, "…") for hop in [rule.source] + hops)
+        if looped:
+            errors.append(finding("redirect", f"redirect #{rule.index + 1}: loop {shown}"))
+            continue
+        final = hops[-1]
+        if len(hops) > 1:
+            fix = None if _PROBE_SEGMENT in final else final
+            warnings.append(finding(
+                "redirect-chain", f"redirect #{rule.index + 1}: chain {shown}", fix, "warning"
+            ))
+        if final.startswith(("http://", "https://")) or "/api-reference/" in final:
+            continue
+        if _PROBE_SEGMENT in final:
+            prefix = final.split(_PROBE_SEGMENT)[0].strip("/")
+            if not path_exists(prefix):
+                errors.append(finding("redirect", f"{label}: destination prefix '/{prefix}' not found"))
+        elif resolve_redirect_target(final) is None:
+            errors.append(finding("redirect", f"{label}: destination '{final}' not found"))
+    return errors, warnings
+
+
+def _git(*args: str, text: bool = True) -> str | bytes:
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=REPO_ROOT, check=True, capture_output=True, text=text,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        sys.exit(f"git {' '.join(args)} failed: {getattr(e, 'stderr', '') or e}")
+
+
+def _name_status(diff: str) -> tuple[set[str], set[str]]:
+    """(changed, deleted) paths from `git diff --name-status -M` output.
+
+    A rename counts as deleting the old path and adding the new one.
+    """
+    changed: set[str] = set()
+    deleted: set[str] = set()
+    for line in diff.splitlines():
+        status, *paths = line.split("\t")
+        if status.startswith("D"):
+            deleted.add(paths[0])
+        elif status.startswith("R"):
+            deleted.add(paths[0])
+            changed.add(paths[1])
+        else:
+            changed.add(paths[-1])
+    return changed, deleted
+
+
+def git_changes(ref: str) -> tuple[set[str], set[str]]:
+    """Doc files changed or deleted since the merge base of `ref` and HEAD.
+
+    Compares against the working tree, so uncommitted edits and untracked
+    pages count as changes. Returns (changed, deleted) repo-relative paths.
+    """
+    base = _git("merge-base", ref, "HEAD").strip()
+    changed, deleted = _name_status(_git("diff", "--name-status", "-M", base, "--"))
+    changed.update(_git("ls-files", "--others", "--exclude-standard").splitlines())
+    return changed, deleted
+
+
+def git_staged_changes() -> tuple[set[str], set[str], set[str]]:
+    """Files changed or deleted in the git index, i.e. by the next commit.
+
+    Returns (changed, deleted, partial), where partial holds the changed
+    files whose working copy also has unstaged edits; their staged blob is
+    what should be checked (see staged_blob).
+    """
+    changed, deleted = _name_status(_git("diff", "--cached", "--name-status", "-M", "--"))
+    partial = changed & set(_git("diff", "--name-only", "--").splitlines())
+    return changed, deleted, partial
+
+
+def staged_blob(rel: str) -> bytes:
+    return _git("show", f":{rel}", text=False)
+
+
+def page_key(rel: str) -> str:
+    """Normalize a repo-relative path to the form links use to reach it.
+
+    `en/foo/bar.mdx` and `en/foo/bar/index.mdx` both become `en/foo/bar`.
+    """
+    stem, ext = posixpath.splitext(rel)
+    if ext in (".mdx", ".md"):
+        rel = stem
+    if rel.endswith("/index"):
+        rel = rel[: -len("/index")]
+    return rel
+
+
+def link_target_key(url: str, source_rel: str) -> str:
+    """The page_key() an internal link points at, computed without I/O."""
+    path = url.split("#")[0].split("?")[0]
+    if path.startswith(("./", "../")):
+        path = posixpath.normpath(posixpath.join(posixpath.dirname(source_rel), path))
+    return page_key(path.strip("/"))
+
+
+def build_reverse_index(
+    scans: dict[Path, PageRecord], targets: set[str] | None = None
+) -> dict[str, list[tuple[str, int]]]:
+    """Map each link target's page_key() to the (file, line) pairs linking to it.
+
+    With `targets`, only links to those keys are indexed. An absolute link
+    can only reach a key if its URL contains the key's last segment, so
+    links without any are skipped before their key is computed.
+    """
+    index: dict[str, list[tuple[str, int]]] = {}
+    names = None if targets is None else {posixpath.basename(key) for key in targets}
+    for f, scan in scans.items():
+        rel = None
+        for line_num, _, url, _ in scan.links:
+            if names is not None and not url.startswith(".") and not any(name in url for name in names):
+                continue
+            if classify_link(url) != "internal":
+                continue
+            if rel is None:
+                rel = f.relative_to(REPO_ROOT).as_posix()
+            key = link_target_key(url, rel)
+            if targets is None or key in targets:
+                index.setdefault(key, []).append((rel, line_num))
+    return index
+
+
+def files_to_recheck(
+    changed: set[str], deleted: set[str], scans: dict[Path, PageRecord]
+) -> tuple[set[Path], int]:
+    """Scanned files affected by a change set.
+
+    That is every changed file, plus every file whose links reach a changed
+    or deleted page: an edit may have renamed a heading another page links
+    to, and a deletion breaks every inbound link. Returns (files, number of
+    referring files pulled in by the reverse index).
+    """
+    targets = {page_key(rel) for rel in changed | deleted}
+    reverse = build_reverse_index(scans, targets)
+    referrers = {src for key in targets for src, _ in reverse.get(key, [])}
+    direct = {REPO_ROOT / rel for rel in changed} & scans.keys()
+    extra = {REPO_ROOT / rel for rel in referrers} - direct
+    return direct | extra, len(extra)
+
+
+class LinkGraph(NamedTuple):
+    """Directed link graph over doc pages plus the docs.json navigation.
+
+    Nodes are page keys (see page_key). edges holds (source, target, line,
+    via_redirect) for every internal link between two pages; nav holds the
+    pages docs.json lists; redirected holds pages that some redirect lands on.
+    """
+
+    pages: list[str]
+    edges: list[tuple[str, str, int, bool]]
+    nav: set[str]
+    redirected: set[str]
+
+
+def build_link_graph(scans: dict[Path, PageRecord]) -> LinkGraph:
+    """Build the global link graph from scanned files in one pass over their links."""
+    page_of = {f: page_key(f.relative_to(REPO_ROOT).as_posix()) for f in scans}
+    pages = list(dict.fromkeys(page_of.values()))
+
+    def page_for(target: Path | None) -> str | None:
+        if target is None or target == REPO_ROOT:
+            return None
+        if target in page_of:
+            return page_of[target]
+        rel = target.relative_to(REPO_ROOT).as_posix()
+        return page_key(rel) if page_key(rel) in known else None
+
+    known = set(pages)
+    edges: list[tuple[str, str, int, bool]] = []
+    for f, scan in scans.items():
+        for line_num, _, url, _ in scan.links:
+            if classify_link(url) != "internal" or "/api-reference/" in url:
+                continue
+            target = page_for(resolve_internal_link(url, f))
+            via_redirect = False
+            if target is None:
+                hops, looped = redirect_table().follow("/" + link_path_key(url, f))
+                if len(hops) > 1 and not looped:
+                    target = page_for(resolve_redirect_target(hops[-1]))
+                    via_redirect = True
+            if target is not None and target != page_of[f]:
+                edges.append((page_of[f], target, line_num, via_redirect))
+
+    nav: set[str] = set()
+    redirected: set[str] = set()
+    try:
+        data = json.loads(DOCS_JSON.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        data = {}
+    for entry in navigation_entries(data):
+        if not HTTP_METHOD_RE.match(entry.page):
+            nav.add(page_key(entry.page.strip("/")))
+    table = redirect_table()
+    for rule in table.rules:
+        if ":" not in rule.destination:
+            target = page_for(resolve_redirect_target(table.follow(rule.destination)[0][-1]))
+            if target is not None:
+                redirected.add(target)
+    return LinkGraph(pages, edges, nav, redirected)
+
+
+def export_link_graph(graph: LinkGraph, path: Path):
+    """Write the graph as JSON: page nodes, a docs.json node, and link edges."""
+    inbound: dict[str, set[str]] = {}
+    for source, target, _, _ in graph.edges:
+        inbound.setdefault(target, set()).add(source)
+    nodes = [{"id": "docs.json", "kind": "nav"}] + [
+        {
+            "id": page,
+            "kind": "page",
+            "in_nav": page in graph.nav,
+            "redirect_target": page in graph.redirected,
+            "inbound": len(inbound.get(page, ())),
+        }
+        for page in graph.pages
+    ]
+    edges = [{"source": "docs.json", "target": page, "kind": "nav"} for page in sorted(graph.nav)]
+    edges += [
+        {"source": src, "target": dst, "kind": "redirect" if via else "link", "line": line}
+        for src, dst, line, via in graph.edges
+    ]
+    path.write_text(
+        json.dumps({"nodes": nodes, "edges": edges}, ensure_ascii=False, indent=2) + "\n",
+        encoding="utf-8",
+    )
+
+
+def report_orphans(jobs: int = 1, cache: DocsIndex | None = None, top: int = 20,
+                   graph_out: Path | None = None) -> int:
+    """Report orphaned, unreachable and redirect-only pages, plus link hubs.
+
+    - orphaned: not in docs.json navigation and no page links to it
+    - unreachable: linked only from pages that navigation can't reach
+    - redirect-only: reached only through redirects (a redirect lands on
+      it, or its inbound links all go through one)
+
+    Hubs are ranked by the number of distinct pages linking in.
+
+    Informational: always returns 0.
+    """
     files = find_mdx_files()
-    broken: list[tuple[str, int, str]] = []
-    broken_anchors: list[tuple[str, int, str]] = []
-    skipped_anchors = 0
-    total = 0
-    anchor_total = 0
+    cache = cache or DocsIndex(None)
+    graph = build_link_graph(scan_files(files, jobs, cache))
+    known = set(graph.pages)
+
+    direct_in: dict[str, set[str]] = {}
+    redirect_in: dict[str, set[str]] = {}
+    out: dict[str, set[str]] = {}
+    for src, dst, _, via in graph.edges:
+        (redirect_in if via else direct_in).setdefault(dst, set()).add(src)
+        out.setdefault(src, set()).add(dst)
+
+    reachable = {p for p in graph.nav if p in known}
+    frontier = list(reachable)
+    while frontier:
+        for dst in out.get(frontier.pop(), ()):
+            if dst not in reachable:
+                reachable.add(dst)
+                frontier.append(dst)
+
+    orphaned, redirect_only, unreachable = [], [], []
+    for page in graph.pages:
+        if page in graph.nav or page in direct_in:
+            if page not in reachable:
+                unreachable.append(page)
+        elif page in redirect_in or page in graph.redirected:
+            redirect_only.append(page)
+        else:
+            orphaned.append(page)
+
+    hubs = sorted(
+        ((len(direct_in.get(p, ())) + len(redirect_in.get(p, ())), p) for p in graph.pages),
+        key=lambda item: (-item[0], item[1]),
+    )[:top]
+
+    print(f"\n=== Orphan Page Report ===")
+    print(f"Pages: {len(graph.pages)}")
+    print(cache_summary(cache))
+    print(f"Link edges: {len(graph.edges)}")
+    print(f"Pages in navigation: {len(graph.nav & known)}")
+    print(f"Orphaned pages: {len(orphaned)}")
+    print(f"Unreachable pages: {len(unreachable)}")
+    print(f"Reachable only through redirects: {len(redirect_only)}")
+
+    for title, pages in (
+        ("Orphaned Pages (not in navigation, no inbound links)", orphaned),
+        ("Unreachable Pages (linked only from pages outside navigation)", unreachable),
+        ("Reachable Only Through Redirects", redirect_only),
+    ):
+        if pages:
+            print(f"\n--- {title} ---\n")
+            for page in pages:
+                print(f"  {page}")
+
+    print(f"\n--- Most Linked Pages (top {len(hubs)}) ---\n")
+    for count, page in hubs:
+        print(f"  {count:5}  {page}")
+
+    if graph_out is not None:
+        export_link_graph(graph, graph_out)
+        print(f"\nWrote link graph to {graph_out}")
+    return 0
+
+
+class LinkReport:
+    """Findings from validating the links of a set of files.
+
+    redirected holds warnings for links that only work through a docs.json
+    redirect, with the final target as the suggested fix.
+    """
+
+    def __init__(self):
+        self.broken: list[Finding] = []
+        self.broken_anchors: list[Finding] = []
+        self.redirected: list[Finding] = []
+        self.total = 0
+        self.anchor_total = 0
+        self.skipped_anchors = 0
 
+
+def validate_links(files: list[Path], scans: dict[Path, PageRecord]) -> LinkReport:
+    """Resolve every internal link and anchor in `files` against the indexes.
+
+    Time spent on anchor lookups is recorded under the "anchors" phase and
+    the rest under "resolution".
+    """
+    report = LinkReport()
+    start = time.perf_counter()
+    anchor_seconds = 0.0
     for f in files:
-        links = extract_links(f)
-        for line_num, text, url in links:
+        for line_num, kind, url, _ in scans[f].links:
             cls = classify_link(url)
 
             # Same-page anchor: validate against the source file's anchors
@@ -320,10 +1126,15 @@ def check_internal_links():
                 anchor = url.lstrip("#").split("?")[0]
                 if not anchor:
                     continue
-                anchor_total += 1
+                report.anchor_total += 1
                 if anchor not in extract_anchors(f):
                     rel_path = str(f.relative_to(REPO_ROOT))
-                    broken_anchors.append((rel_path, line_num, url))
+                    fix, confidence = suggest_anchor(url, extract_anchors(f)) or (None, None)
+                    report.broken_anchors.append(Finding(
+                        rel_path, line_num, url, kind, "broken-anchor",
+                        f"anchor '#{anchor}' not found on this page",
+                        fix, confidence=confidence,
+                    ))
                 continue
 
             if cls != "internal":
@@ -337,156 +1148,1081 @@ def check_internal_links():
             if "/api-reference/" in url:
                 continue
 
-            total += 1
+            report.total += 1
 
             resolved = resolve_internal_link(url, f)
             rel_path = str(f.relative_to(REPO_ROOT))
+            target = url
             if resolved is None:
-                broken.append((rel_path, line_num, url))
-                continue
+                # Not a page: it may still work through a docs.json redirect,
+                # which is worth a warning (the link should point at the
+                # destination) but isn't broken unless the redirect is.
+                hops, looped = redirect_table().follow("/" + link_path_key(url, f))
+                if len(hops) > 1 and not looped:
+                    target = hops[-1]
+                    resolved = resolve_redirect_target(target)
+                    if resolved is None and "/api-reference/" in target:
+                        resolved = REPO_ROOT
+                if resolved is None:
+                    fix, confidence = suggest_page(url, f) or (None, None)
+                    report.broken.append(Finding(
+                        rel_path, line_num, url, kind, "broken-link", "target not found",
+                        fix, confidence=confidence,
+                    ))
+                    continue
+                report.redirected.append(Finding(
+                    rel_path, line_num, url, kind, "via-redirect",
+                    f"resolves only through a redirect to {target}",
+                    _replace_path(url, target), "warning", 1.0,
+                ))
 
             # If the URL has an anchor, validate it against the resolved file
             if "#" in url:
                 anchor = url.split("#", 1)[1].split("?")[0]
                 if not anchor:
                     continue
-                if anchor_check_skipped(url, resolved):
-                    skipped_anchors += 1
+                if anchor_check_skipped(target, resolved):
+                    report.skipped_anchors += 1
                     continue
-                anchor_total += 1
+                report.anchor_total += 1
+                anchor_start = time.perf_counter()
                 if anchor not in extract_anchors(resolved):
-                    broken_anchors.append((rel_path, line_num, url))
+                    fix, confidence = suggest_anchor(url, extract_anchors(resolved)) or (None, None)
+                    report.broken_anchors.append(Finding(
+                        rel_path, line_num, url, kind, "broken-anchor",
+                        f"anchor '#{anchor}' not found in {resolved.relative_to(REPO_ROOT)}",
+                        fix, confidence=confidence,
+                    ))
+                anchor_seconds += time.perf_counter() - anchor_start
+    _timings.add("anchors", anchor_seconds, report.anchor_total, "anchors")
+    _timings.add("resolution", time.perf_counter() - start - anchor_seconds, report.total, "links")
+    return report
+
+
+def link_findings(report: LinkReport) -> list[Finding]:
+    return report.broken + report.broken_anchors + report.redirected
+
+
+FIXABLE_RULES = {"broken-link", "broken-anchor", "via-redirect", "wrong-language-link"}
+
+
+def apply_fixes(findings: list[Finding]) -> list[Finding]:
+    """Rewrite links in place where the suggested fix is high-confidence.
+
+    Each file is retokenized and edited at the URL's byte offset, so only
+    the link itself changes, never other text that happens to match.
+    Returns the findings that were fixed.
+    """
+    wanted: dict[str, dict[tuple[int, str], Finding]] = {}
+    for finding in findings:
+        if (finding.rule in FIXABLE_RULES and finding.fix
+                and (finding.confidence or 0) >= FIX_MIN_SCORE):
+            wanted.setdefault(finding.file, {})[finding.line, finding.url] = finding
+
+    fixed: list[Finding] = []
+    for rel, by_link in sorted(wanted.items()):
+        path = REPO_ROOT / rel
+        raw = path.read_bytes()
+        edits = [
+            (link.offset, link.url.encode("utf-8"), by_link[link.line, link.url])
+            for link in tokenize_links(raw)
+            if (link.line, link.url) in by_link
+        ]
+        for offset, old, finding in sorted(edits, key=lambda e: e[0], reverse=True):
+            raw = raw[:offset] + finding.fix.encode("utf-8") + raw[offset + len(old):]
+        path.write_bytes(raw)
+        fixed.extend(dict.fromkeys(finding for _, _, finding in edits))
+    return fixed
+
+
+def print_link_sections(report: LinkReport):
+    """Print the per-file broken link, broken anchor and redirect sections."""
+    sections = [
+        ("Broken Internal Links", report.broken),
+        ("Broken Anchors", report.broken_anchors),
+        ("Links Through Redirects (warnings)", report.redirected),
+    ]
+    for title, findings in sections:
+        if not findings:
+            continue
+        print(f"\n--- {title} ---\n")
+        # Group by file
+        by_file: dict[str, list[Finding]] = {}
+        for finding in findings:
+            by_file.setdefault(finding.file, []).append(finding)
+
+        for file_path in sorted(by_file):
+            print(f"  {file_path}:")
+            for finding in by_file[file_path]:
+                fix = ""
+                if finding.rule == "via-redirect":
+                    fix = f" → {finding.fix}"
+                elif finding.fix:
+                    fix = f" (did you mean {finding.fix}?)"
+                print(f"    L{finding.line}: {finding.url}{fix}")
+
+
+def check_internal_links(
+    jobs: int = 1, cache: DocsIndex | None = None, changed_since: str | None = None,
+    staged: bool = False,
+):
+    """Check all internal links, anchors, and docs.json entries.
+
+    With `changed_since`, only files affected by the changes since that git
+    ref are checked (see files_to_recheck), and docs.json is checked only
+    when it changed or a page was deleted. `staged` does the same for the
+    changes in the git index (the pre-commit hook), checking the staged
+    version of partially staged pages. Returns every finding, warnings
+    included.
+    """
+    cache = cache or DocsIndex(None)
+    files, scans = scan_corpus(jobs, cache)
+    to_check = files
+    check_docs = True
+    if changed_since or staged:
+        if staged:
+            changed, deleted, partial = git_staged_changes()
+            for rel in partial:
+                path = REPO_ROOT / rel
+                if path in scans:
+                    scans[path] = parse_source(staged_blob(rel))
+                    _anchor_cache[path] = scans[path].anchors
+        else:
+            changed, deleted = git_changes(changed_since)
+        selected, n_referring = files_to_recheck(changed, deleted, scans)
+        to_check = [f for f in files if f in selected]
+        check_docs = "docs.json" in changed or bool(deleted)
+    report = validate_links(to_check, scans)
 
     # Check docs.json
-    docs_json_issues = check_docs_json()
+    with _timings.phase("docs.json", "entries"):
+        docs_json_issues = check_docs_json() if check_docs else []
+        redirect_errors, redirect_warnings = check_redirects() if check_docs else ([], [])
 
     # Report
     print(f"\n=== Internal Link Check ===")
     print(f"Files scanned: {len(files)}")
-    print(f"Internal links checked: {total}")
-    print(f"Anchors checked: {anchor_total}")
-    print(f"Anchors skipped (non-MDX targets): {skipped_anchors}")
-    print(f"Broken links: {len(broken)}")
-    print(f"Broken anchors: {len(broken_anchors)}")
+    print(cache_summary(cache))
+    if changed_since or staged:
+        print(
+            f"Files checked: {len(to_check)} "
+            f"({len(to_check) - n_referring} {'staged' if staged else f'changed since {changed_since}'}, "
+            f"{n_referring} linking into changed/deleted pages)"
+        )
+        if not check_docs:
+            print("docs.json: unchanged and no pages deleted, skipped")
+    print(f"Internal links checked: {report.total}")
+    print(f"Anchors checked: {report.anchor_total}")
+    print(f"Anchors skipped (non-MDX targets): {report.skipped_anchors}")
+    print(f"Broken links: {len(report.broken)}")
+    print(f"Broken anchors: {len(report.broken_anchors)}")
     print(f"docs.json issues: {len(docs_json_issues)}")
+    print(f"Redirect issues: {len(redirect_errors)}")
+    print(f"Links through redirects (warnings): {len(report.redirected)}")
+    print(f"Redirect chains (warnings): {len(redirect_warnings)}")
+
+    print_link_sections(report)
+
+    if docs_json_issues:
+        print(f"\n--- docs.json Issues ---\n")
+        for issue in docs_json_issues:
+            print(f"  {issue.reason}")
+
+    if redirect_errors:
+        print(f"\n--- Redirect Issues ---\n")
+        for issue in redirect_errors:
+            print(f"  {issue.reason}")
+
+    if redirect_warnings:
+        print(f"\n--- Redirect Chains (warnings) ---\n")
+        for warning in redirect_warnings:
+            print(f"  {warning.reason}")
+
+    return link_findings(report) + docs_json_issues + redirect_errors + redirect_warnings
 
-    if broken:
-        print(f"\n--- Broken Internal Links ---\n")
-        # Group by file
-        by_file: dict[str, list] = {}
-        for file_path, line_num, url in broken:
-            by_file.setdefault(file_path, []).append((line_num, url))
 
+def check_parity(jobs: int = 1, cache: DocsIndex | None = None) -> list[Finding]:
+    """Check that en, zh and ja mirror each other page for page.
+
+    From one scan of the three trees: pages missing a counterpart in
+    another language, translations whose heading, <Step>, <Tab> or code
+    fence counts differ from the English page (warnings), and absolute
+    links into another language's tree. A link to the page's own
+    counterpart (the "see the original" note on translated pages) is
+    allowed. Returns every finding.
+    """
+    cache = cache or DocsIndex(None)
+    files, scans = scan_corpus(jobs, cache)
+    source_lang = DOC_DIRS[0]
+
+    # "self-host/foo.mdx" -> {"en": Path, "zh": Path, ...}
+    pages: dict[str, dict[str, Path]] = {}
+    for f in files:
+        lang, rest = f.relative_to(REPO_ROOT).as_posix().split("/", 1)
+        pages.setdefault(rest, {})[lang] = f
+
+    missing: list[Finding] = []
+    mismatched: list[Finding] = []
+    for rest, by_lang in sorted(pages.items()):
+        present = [lang for lang in DOC_DIRS if lang in by_lang]
+        for lang in DOC_DIRS:
+            if lang not in by_lang:
+                missing.append(Finding(
+                    f"{present[0]}/{rest}", 0, f"/{lang}/{page_key(rest)}", "page",
+                    "missing-counterpart", f"no {lang} counterpart",
+                ))
+        if source_lang not in by_lang:
+            continue
+        source = scans[by_lang[source_lang]].structure
+        for lang in present[1:]:
+            counts = scans[by_lang[lang]].structure
+            diffs = [
+                f"{key} {counts[key]} vs {source[key]}"
+                for key in STRUCTURE_KEYS if counts.get(key) != source.get(key)
+            ]
+            if diffs:
+                mismatched.append(Finding(
+                    f"{lang}/{rest}", 0, f"/{source_lang}/{page_key(rest)}", "page",
+                    "structure-mismatch", ", ".join(diffs), level="warning",
+                ))
+
+    wrong_lang: list[Finding] = []
+    for f in files:
+        rel = f.relative_to(REPO_ROOT).as_posix()
+        lang, rest = rel.split("/", 1)
+        for line_num, kind, url, _ in scans[f].links:
+            if not url.startswith("/") or classify_link(url) != "internal":
+                continue
+            key = link_path_key(url, f)
+            target_lang, _, target_rest = key.partition("/")
+            if target_lang not in DOC_DIRS or target_lang == lang:
+                continue
+            if target_rest == page_key(rest):
+                continue
+            fix, confidence = None, None
+            own = resolve_internal_link(f"/{lang}/{target_rest}", f)
+            if own is not None and own != REPO_ROOT:
+                fix, confidence = _replace_path(url, f"/{lang}/{target_rest}"), 1.0
+            wrong_lang.append(Finding(
+                rel, line_num, url, kind, "wrong-language-link",
+                f"links into /{target_lang}/ from the {lang} tree", fix, confidence=confidence,
+            ))
+
+    counts = {lang: sum(1 for by_lang in pages.values() if lang in by_lang) for lang in DOC_DIRS}
+    print(f"\n=== Cross-Language Parity Check ===")
+    print(f"Pages: {', '.join(f'{n} {lang}' for lang, n in counts.items())}")
+    print(cache_summary(cache))
+    print(f"Missing counterparts: {len(missing)}")
+    print(f"Wrong-language links: {len(wrong_lang)}")
+    print(f"Structure mismatches (warnings): {len(mismatched)}")
+
+    if missing:
+        print(f"\n--- Missing Counterparts ---\n")
+        for finding in missing:
+            print(f"  {finding.file}: {finding.reason} ({finding.url})")
+
+    if wrong_lang:
+        print(f"\n--- Wrong-Language Links ---\n")
+        by_file: dict[str, list[Finding]] = {}
+        for finding in wrong_lang:
+            by_file.setdefault(finding.file, []).append(finding)
         for file_path in sorted(by_file):
             print(f"  {file_path}:")
-            for line_num, url in by_file[file_path]:
-                print(f"    L{line_num}: {url}")
+            for finding in by_file[file_path]:
+                fix = f" (did you mean {finding.fix}?)" if finding.fix else ""
+                print(f"    L{finding.line}: {finding.url}{fix}")
 
-    if broken_anchors:
-        print(f"\n--- Broken Anchors ---\n")
-        by_file_a: dict[str, list] = {}
-        for file_path, line_num, url in broken_anchors:
-            by_file_a.setdefault(file_path, []).append((line_num, url))
+    if mismatched:
+        print(f"\n--- Structure Mismatches (warnings; translated vs {source_lang}) ---\n")
+        for finding in mismatched:
+            print(f"  {finding.file}: {finding.reason}")
 
-        for file_path in sorted(by_file_a):
-            print(f"  {file_path}:")
-            for line_num, url in by_file_a[file_path]:
-                print(f"    L{line_num}: {url}")
+    return missing + wrong_lang + mismatched
 
-    if docs_json_issues:
-        print(f"\n--- docs.json Issues ---\n")
-        for source, issue in docs_json_issues:
-            print(f"  {issue}")
 
-    return len(broken) + len(broken_anchors) + len(docs_json_issues)
+class InotifyWatcher:
+    """Recursive inotify watch over the doc trees and docs.json (Linux only).
 
+    Raises OSError (or AttributeError off Linux) when inotify is
+    unavailable; callers fall back to PollingWatcher.
+    """
 
-def check_external_links():
-    """Check all external links for 404s."""
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self, roots: list[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: dict[int, Path] = {}
+        for root in roots:
+            self._watch_tree(root)
+        # Non-recursive, for docs.json (editors often replace it via rename)
+        self._watch(REPO_ROOT)
+
+    def _watch(self, directory: Path):
+        wd = self._add_watch(self.fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self.dirs[wd] = directory
+
+    def _watch_tree(self, root: Path) -> set[Path]:
+        """Watch `root` and its subdirectories; returns the files found."""
+        found: set[Path] = set()
+        for dirpath, _, filenames in os.walk(root):
+            self._watch(Path(dirpath))
+            found.update(Path(dirpath) / name for name in filenames)
+        return found
+
+    def _unwatch_tree(self, root: Path) -> bool:
+        """Stop watching `root` and its subdirectories; returns whether any were watched.
+
+        The kernel drops a deleted directory's watch itself, so removing it
+        again may fail; that is ignored. A moved-away directory keeps its
+        watch until removed here, and would otherwise report under its old path.
+        """
+        stale = [wd for wd, directory in self.dirs.items() if directory.is_relative_to(root)]
+        for wd in stale:
+            del self.dirs[wd]
+            self._rm_watch(self.fd, wd)
+        return bool(stale)
+
+    def wait(self, timeout: float | None = None) -> set[Path]:
+        """Block up to `timeout` seconds (forever if None); return changed paths.
+
+        A watched directory that is deleted or moved away is returned as
+        itself: its files are gone without events of their own.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: set[Path] = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+                offset += self.EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if wd not in self.dirs:
+                    continue
+                path = self.dirs[wd] / os.fsdecode(name)
+                if mask & self.IN_ISDIR:
+                    if mask & (self.IN_MOVED_FROM | self.IN_DELETE):
+                        if self._unwatch_tree(path):
+                            changed.add(path)
+                    elif mask & (self.IN_CREATE | self.IN_MOVED_TO) and self.dirs[wd] != REPO_ROOT:
+                        # A new or moved-in directory brings its files along
+                        changed |= self._watch_tree(path)
+                    continue
+                changed.add(path)
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Portable fallback: diff (mtime, size) snapshots of the watched files."""
+
+    def __init__(self, roots: list[Path], interval: float = 0.5):
+        self.roots = roots
+        self.interval = interval
+        self.snapshot = self._snapshot()
+
+    def _snapshot(self) -> dict[Path, tuple[int, int]]:
+        snap = {}
+        for path in [*find_mdx_files(), DOCS_JSON]:
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            snap[path] = (st.st_mtime_ns, st.st_size)
+        return snap
+
+    def wait(self, timeout: float | None = None) -> set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._snapshot()
+            changed = {
+                p for p in current.keys() | self.snapshot.keys()
+                if current.get(p) != self.snapshot.get(p)
+            }
+            self.snapshot = current
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+            time.sleep(self.interval if deadline is None else
+                       max(0.0, min(self.interval, deadline - time.monotonic())))
+
+    def close(self):
+        pass
+
+
+def _print_watch_batch(
+    label: str, n_files: int, elapsed_ms: float, report: LinkReport,
+    docs_issues: list[Finding] | None, redirect_errors: list[Finding] | None,
+):
+    """One watch-mode result block; docs_issues is None when docs.json wasn't rechecked."""
+    summary = (
+        f"{len(report.broken)} broken links, {len(report.broken_anchors)} broken anchors"
+    )
+    if docs_issues is not None:
+        summary += f", {len(docs_issues)} docs.json issues, {len(redirect_errors)} redirect issues"
+    print(
+        f"\n[{time.strftime('%H:%M:%S')}] {label}: "
+        f"checked {n_files} files in {elapsed_ms:.1f} ms — {summary}"
+    )
+    print_link_sections(report)
+    for issue in (docs_issues or []) + (redirect_errors or []):
+        print(f"  {issue.reason}")
+
+
+def watch_internal_links(jobs: int = 1, cache: DocsIndex | None = None, poll: bool = False):
+    """Keep the link/anchor index in memory and recheck pages as they're saved.
+
+    Each batch of changes rescans only the touched files, then validates
+    them plus every page linking into them (via the reverse index).
+    docs.json and the redirect checks rerun when docs.json changes or a
+    page is added or removed. Runs until interrupted.
+    """
+    global _redirect_table
+    cache = cache or DocsIndex(None)
+    start = time.perf_counter()
     files = find_mdx_files()
-    urls_to_check: dict[str, list[tuple[str, int]]] = {}  # url -> [(file, line)]
+    scans = scan_files(files, jobs, cache)
+    report = validate_links(files, scans)
+    redirect_errors, _ = check_redirects()
+    _print_watch_batch(
+        "initial check", len(files), (time.perf_counter() - start) * 1000,
+        report, check_docs_json(), redirect_errors,
+    )
+
+    roots = [REPO_ROOT / d for d in DOC_DIRS if (REPO_ROOT / d).is_dir()]
+    watcher = None
+    if not poll:
+        try:
+            watcher = InotifyWatcher(roots)
+        except (OSError, AttributeError, TypeError) as e:
+            print(f"inotify unavailable ({e}); polling instead")
+    if watcher is None:
+        watcher = PollingWatcher(roots)
+    print(f"\nWatching {', '.join(DOC_DIRS)} and docs.json "
+          f"({'inotify' if isinstance(watcher, InotifyWatcher) else 'polling'}). Ctrl-C to stop.")
+
+    try:
+        while True:
+            events = watcher.wait(None)
+            # Debounce: editors save in several steps (write, rename, chmod)
+            events |= watcher.wait(0.05)
+            # A directory deleted or moved away takes its scanned pages with it
+            for path in [p for p in events if p not in scans and not p.exists()]:
+                events |= {f for f in scans if f.is_relative_to(path)}
+            changed = {
+                p for p in events
+                if p == DOCS_JSON or (
+                    p.suffix in (".md", ".mdx")
+                    and p.relative_to(REPO_ROOT).parts[0] in DOC_DIRS
+                )
+            }
+            if not changed:
+                continue
+
+            start = time.perf_counter()
+            docs_changed = DOCS_JSON in changed
+            changed.discard(DOCS_JSON)
+            touched, deleted = set(), set()
+            for path in changed:
+                rel = path.relative_to(REPO_ROOT).as_posix()
+                # None if the file is gone, even if it vanished after is_file()
+                record = cache.refresh(path) if path.is_file() else None
+                if record is not None:
+                    if path not in scans:
+                        _link_index.clear()
+                    scans[path] = record
+                    _anchor_cache[path] = record.anchors
+                    touched.add(rel)
+                elif path in scans:
+                    del scans[path]
+                    cache.refresh(path)
+                    _anchor_cache.pop(path, None)
+                    _link_index.clear()
+                    deleted.add(rel)
+            structure_changed = not _link_index
+            if structure_changed:
+                build_path_index()
+                scans = dict(sorted(scans.items()))
+            if docs_changed:
+                _redirect_table = None
+                _spec_ops.clear()
+
+            selected, _ = files_to_recheck(touched, deleted, scans)
+            report = validate_links([f for f in scans if f in selected], scans)
+            docs_issues, redirect_errors = None, None
+            if docs_changed or structure_changed:
+                docs_issues = check_docs_json()
+                redirect_errors, _ = check_redirects()
+            names = sorted(touched | deleted | ({"docs.json"} if docs_changed else set()))
+            _print_watch_batch(
+                ", ".join(names), len(selected), (time.perf_counter() - start) * 1000,
+                report, docs_issues, redirect_errors,
+            )
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        watcher.close()
+        cache.save()
+    return 0
+
+
+class ProbeResult(NamedTuple):
+    """Outcome of probing one URL.
+
+    status is the final HTTP status after redirects, or None when the
+    request failed at the network level (see error). via_get is set when
+    the host rejected HEAD with 405 and the status came from a GET. etag
+    and last_modified are the final response's validators, replayed as a
+    conditional request once a cached result expires.
+    """
+
+    status: int | None
+    final_url: str
+    error: str | None = None
+    via_get: bool = False
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def healthy(self) -> bool:
+        """Reachable, or blocked by a 403 we deliberately don't report."""
+        return self.error is None and self.status is not None and (
+            self.status < 400 or self.status == 403
+        )
+
+
+class AnchorScan(NamedTuple):
+    """Anchors seen while streaming a page for fragment checks.
+
+    complete is True when the whole document was read, so a wanted anchor
+    that wasn't found is really missing; False when the byte budget ran
+    out first or the response wasn't HTML. error is set when the page
+    couldn't be fetched.
+    """
+
+    found: set[str]
+    complete: bool
+    error: str | None = None
+
+
+def scan_html_anchors(resp: http.client.HTTPResponse, wanted: set[str], budget: int) -> AnchorScan:
+    """Stream `resp` looking for `id=`/`name=` anchors, stopping early.
+
+    Reading stops once every anchor in `wanted` has been seen or `budget`
+    bytes have been read. A short tail of each chunk is rescanned with the
+    next one so an attribute split across chunks is still found. GitHub
+    renders README headings as `id="user-content-<slug>"` and resolves
+    `#<slug>` to them, so both spellings count.
+    """
+    if "html" not in resp.headers.get("Content-Type", "html").lower():
+        return AnchorScan(set(), False)
+    found: set[str] = set()
+    tail = b""
+    read = 0
+    while read < budget:
+        chunk = resp.read(min(FRAGMENT_CHUNK, budget - read))
+        if not chunk:
+            return AnchorScan(found, True)
+        read += len(chunk)
+        data = tail + chunk
+        for m in ANCHOR_ATTR_RE.finditer(data):
+            anchor = html.unescape(m.group(1).decode("utf-8", "replace"))
+            found.add(anchor)
+            if anchor.startswith("user-content-"):
+                found.add(anchor[len("user-content-"):])
+        if wanted <= found:
+            return AnchorScan(found, False)
+        tail = data[-256:]
+    return AnchorScan(found, False)
+
+
+def encode_url(url: str) -> str:
+    """Percent-encode non-ASCII characters in a URL path, keeping existing escapes."""
+    try:
+        parsed = urllib.parse.urlparse(url)
+        return urllib.parse.urlunparse(parsed._replace(
+            path=urllib.parse.quote(parsed.path, safe="/:@!$&'()*+,;=-._~%")
+        ))
+    except Exception:
+        return url
+
+
+def retry_after_seconds(value: str | None, attempt: int) -> float:
+    """Delay before retrying a 429/503: the Retry-After header, else exponential."""
+    delay = float(2 ** attempt)
+    if value:
+        value = value.strip()
+        if value.isdigit():
+            delay = float(value)
+        else:
+            try:
+                when = email.utils.parsedate_to_datetime(value)
+                delay = when.timestamp() - time.time()
+            except (TypeError, ValueError):
+                pass
+    return min(max(delay, 0.0), MAX_RETRY_AFTER)
+
+
+class HostPool:
+    """Keep-alive connections and a concurrency cap for one scheme://host:port.
+
+    At most `limit` requests to the host are in flight at once; finished
+    HEAD connections go back to the idle list for reuse. A 429/503 pushes
+    `not_before` forward so every request to the host waits out the
+    Retry-After, not just the one that was throttled.
+    """
+
+    def __init__(self, scheme: str, netloc: str, limit: int, timeout: float):
+        self.scheme = scheme
+        self.netloc = netloc
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(limit)
+        self.lock = threading.Lock()
+        self.idle: list[http.client.HTTPConnection] = []
+        self.not_before = 0.0
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(
+                self.netloc, timeout=self.timeout, context=ssl.create_default_context()
+            )
+        return http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+
+    def _checkout(self) -> tuple[http.client.HTTPConnection, bool]:
+        with self.lock:
+            if self.idle:
+                return self.idle.pop(), True
+        return self._connect(), False
+
+    def back_off(self, delay: float):
+        with self.lock:
+            self.not_before = max(self.not_before, time.monotonic() + delay)
+
+    def request(self, method: str, target: str, headers: dict[str, str], consume=None):
+        """Send one request; returns (status, response headers, consumed).
+
+        `consume`, if given, is called with a successful (2xx) response to
+        read what it needs from the body; consumed is its return value
+        (None otherwise).
+        """
+        with self.slots:
+            wait = self.not_before - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            conn, reused = self._checkout()
+            try:
+                try:
+                    conn.request(method, target, headers=headers)
+                    resp = conn.getresponse()
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    if not reused:
+                        raise
+                    # The server closed an idle keep-alive connection; retry fresh.
+                    conn.close()
+                    conn = self._connect()
+                    conn.request(method, target, headers=headers)
+                    resp = conn.getresponse()
+            except BaseException:
+                conn.close()
+                raise
+            consumed = None
+            try:
+                if consume is not None and 200 <= resp.status < 300:
+                    consumed = consume(resp)
+            except BaseException:
+                conn.close()
+                raise
+            # Only HEAD responses are drained for reuse; a GET body may be
+            # arbitrarily large and we only need its status (or a prefix).
+            if method == "HEAD" and not resp.will_close:
+                resp.read()
+                with self.lock:
+                    self.idle.append(conn)
+            else:
+                conn.close()
+            return resp.status, resp.headers, consumed
+
+    def close(self):
+        with self.lock:
+            for conn in self.idle:
+                conn.close()
+            self.idle.clear()
+
+
+class LinkProber:
+    """Concurrent HEAD/GET prober with per-host connection pools.
+
+    `concurrency` caps requests in flight overall (the thread pool size),
+    `per_host` caps them per scheme://host:port.
+    """
+
+    def __init__(self, concurrency: int = 16, per_host: int = 4, timeout: float = HTTP_TIMEOUT):
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.pools: dict[tuple[str, str], HostPool] = {}
+        self.lock = threading.Lock()
+
+    def pool_for(self, scheme: str, netloc: str) -> HostPool:
+        key = (scheme, netloc)
+        with self.lock:
+            if key not in self.pools:
+                self.pools[key] = HostPool(scheme, netloc, self.per_host, self.timeout)
+            return self.pools[key]
+
+    def fetch(self, method: str, url: str, extra_headers: dict[str, str] | None = None, consume=None):
+        """Request `url`, following redirects and 429/503 backoff.
+
+        Returns (final status, final URL, final response headers, consumed),
+        where consumed is what `consume` read from the final response body
+        (see HostPool.request). Network errors propagate.
+        """
+        headers = {"User-Agent": USER_AGENT, **(extra_headers or {})}
+        for _ in range(MAX_REDIRECTS + 1):
+            parsed = urllib.parse.urlsplit(url)
+            if parsed.scheme not in ("http", "https"):
+                raise urllib.error.URLError(f"unsupported scheme in {url}")
+            pool = self.pool_for(parsed.scheme, parsed.netloc)
+            target = urllib.parse.urlunsplit(("", "", parsed.path or "/", parsed.query, ""))
+            for attempt in range(MAX_ATTEMPTS):
+                status, resp_headers, consumed = pool.request(method, target, headers, consume)
+                if status not in (429, 503) or attempt == MAX_ATTEMPTS - 1:
+                    break
+                pool.back_off(retry_after_seconds(resp_headers.get("Retry-After"), attempt))
+            location = resp_headers.get("Location")
+            if status not in REDIRECT_CODES or not location:
+                return status, url, resp_headers, consumed
+            url = encode_url(urllib.parse.urljoin(url, location))
+        raise urllib.error.URLError(f"more than {MAX_REDIRECTS} redirects")
+
+    def probe(self, url: str, validators: dict[str, str] | None = None) -> ProbeResult:
+        """HEAD a URL, falling back to GET when the host answers 405.
+
+        `validators` are conditional-request headers (If-None-Match /
+        If-Modified-Since); a 304 status means the cached result still holds.
+        """
+        encoded = encode_url(url)
+        try:
+            status, final_url, headers, _ = self.fetch("HEAD", encoded, validators)
+        except (OSError, http.client.HTTPException, urllib.error.URLError) as e:
+            return ProbeResult(None, encoded, f"URL error: {getattr(e, 'reason', e)}")
+        except Exception as e:
+            return ProbeResult(None, encoded, f"Error: {e}")
+        via_get = status == 405
+        if via_get:
+            # Some sites block HEAD, try GET
+            try:
+                status, final_url, headers, _ = self.fetch("GET", encoded, validators)
+            except Exception as e:
+                return ProbeResult(None, encoded, f"GET fallback error: {e}", via_get=True)
+        return ProbeResult(
+            status, final_url, via_get=via_get,
+            etag=headers.get("ETag"), last_modified=headers.get("Last-Modified"),
+        )
+
+    def scan_anchors(self, url: str, wanted: set[str], budget: int = FRAGMENT_BUDGET) -> AnchorScan:
+        """GET a page and stream it for the anchors in `wanted` (see scan_html_anchors)."""
+        def consume(resp):
+            return scan_html_anchors(resp, wanted, budget)
+
+        try:
+            status, _, _, scan = self.fetch("GET", encode_url(url), consume=consume)
+        except (OSError, http.client.HTTPException, urllib.error.URLError) as e:
+            return AnchorScan(set(), False, f"URL error: {getattr(e, 'reason', e)}")
+        except Exception as e:
+            return AnchorScan(set(), False, f"Error: {e}")
+        return scan if scan is not None else AnchorScan(set(), False, f"HTTP {status}")
+
+    def run_all(self, fn, items: list, progress_every: int = 50) -> dict:
+        """Call fn(item) for every item concurrently; returns results keyed by item."""
+        results = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                futures = {pool.submit(fn, item): item for item in items}
+                for i, future in enumerate(as_completed(futures), 1):
+                    results[futures[future]] = future.result()
+                    if progress_every and i % progress_every == 0:
+                        print(f"  Progress: {i}/{len(items)}")
+        finally:
+            for host_pool in self.pools.values():
+                host_pool.close()
+        return results
+
+    def probe_all(
+        self,
+        urls: list[str],
+        validators: dict[str, dict[str, str]] | None = None,
+        progress_every: int = 50,
+    ) -> dict[str, ProbeResult]:
+        """Probe every URL concurrently; returns results keyed by URL."""
+        validators = validators or {}
+        return self.run_all(lambda url: self.probe(url, validators.get(url)), urls, progress_every)
+
+    def scan_anchors_all(
+        self, pages: dict[str, set[str]], budget: int = FRAGMENT_BUDGET, progress_every: int = 50,
+    ) -> dict[str, AnchorScan]:
+        """Fetch each page once for all of its wanted anchors; keyed by page URL."""
+        return self.run_all(
+            lambda url: self.scan_anchors(url, pages[url], budget), list(pages), progress_every
+        )
+
+
+def normalize_url(url: str) -> str:
+    """Cache key for an external URL.
+
+    Lowercases the scheme and host, drops default ports and the fragment,
+    and percent-encodes the path, so spellings of the same resource share
+    one stored result.
+    """
+    parsed = urllib.parse.urlsplit(encode_url(url))
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    try:
+        port = parsed.port
+    except ValueError:
+        port = None
+    if port and port != {"http": 80, "https": 443}.get(scheme):
+        host = f"{host}:{port}"
+    return urllib.parse.urlunsplit((scheme, host, parsed.path or "/", parsed.query, ""))
+
+
+class ExternalResultStore:
+    """SQLite store of external probe results, keyed by normalize_url().
+
+    Healthy results (see ProbeResult.healthy) stay fresh for `ttl_ok`
+    seconds, failures for `ttl_fail`, so a dead link is re-probed soon while
+    a working one isn't hammered weekly. Expired entries keep their
+    ETag/Last-Modified for a conditional re-probe. Fragment checks
+    (--fragments) are stored per (URL, fragment) with the same TTLs. With
+    path None the store is disabled and everything is probed live.
+    """
+
+    def __init__(self, path: Path | None, ttl_ok: float, ttl_fail: float, rebuild: bool = False):
+        self.ttl_ok = ttl_ok
+        self.ttl_fail = ttl_fail
+        self.db = None
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        if rebuild:
+            self.db.execute("DROP TABLE IF EXISTS results")
+            self.db.execute("DROP TABLE IF EXISTS fragments")
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                url TEXT PRIMARY KEY,
+                status INTEGER,
+                final_url TEXT,
+                error TEXT,
+                via_get INTEGER,
+                etag TEXT,
+                last_modified TEXT,
+                checked_at REAL
+            )"""
+        )
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS fragments (
+                url TEXT,
+                fragment TEXT,
+                found INTEGER,
+                checked_at REAL,
+                PRIMARY KEY (url, fragment)
+            )"""
+        )
+
+    def lookup(self, keys: list[str], now: float):
+        """Split keys into fresh results and expired results with validators.
+
+        Returns (fresh, expired): fresh maps key -> ProbeResult to reuse
+        as-is; expired maps key -> (stored ProbeResult, conditional request
+        headers) for keys whose stored result can be revalidated.
+        """
+        fresh: dict[str, ProbeResult] = {}
+        expired: dict[str, tuple[ProbeResult, dict[str, str]]] = {}
+        if self.db is None:
+            return fresh, expired
+        rows = {}
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows.update(
+                (row[0], row[1:]) for row in self.db.execute(
+                    f"SELECT * FROM results WHERE url IN ({','.join('?' * len(chunk))})", chunk
+                )
+            )
+        for key, (status, final_url, error, via_get, etag, last_modified, checked_at) in rows.items():
+            result = ProbeResult(status, final_url, error, bool(via_get), etag, last_modified)
+            ttl = self.ttl_ok if result.healthy else self.ttl_fail
+            if now - checked_at < ttl:
+                fresh[key] = result
+                continue
+            validators = {}
+            if result.healthy and etag:
+                validators["If-None-Match"] = etag
+            if result.healthy and last_modified:
+                validators["If-Modified-Since"] = last_modified
+            if validators:
+                expired[key] = (result, validators)
+        return fresh, expired
+
+    def save(self, results: dict[str, ProbeResult], now: float):
+        if self.db is None:
+            return
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (key, r.status, r.final_url, r.error, int(r.via_get), r.etag, r.last_modified, now)
+                    for key, r in results.items()
+                ],
+            )
+
+    def lookup_fragments(self, pairs: list[tuple[str, str]], now: float) -> dict[tuple[str, str], bool]:
+        """Fresh (key, fragment) -> found outcomes; found ones use ttl_ok, missing ones ttl_fail."""
+        fresh: dict[tuple[str, str], bool] = {}
+        if self.db is None:
+            return fresh
+        wanted = set(pairs)
+        keys = sorted({key for key, _ in pairs})
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            for key, fragment, found, checked_at in self.db.execute(
+                f"SELECT * FROM fragments WHERE url IN ({','.join('?' * len(chunk))})", chunk
+            ):
+                ttl = self.ttl_ok if found else self.ttl_fail
+                if (key, fragment) in wanted and now - checked_at < ttl:
+                    fresh[key, fragment] = bool(found)
+        return fresh
+
+    def save_fragments(self, outcomes: dict[tuple[str, str], bool], now: float):
+        if self.db is None:
+            return
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO fragments VALUES (?, ?, ?, ?)",
+                [(key, fragment, int(found), now) for (key, fragment), found in outcomes.items()],
+            )
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+
+
+def is_skipped_domain(url: str) -> bool:
+    """Whether the URL's host is (a subdomain of) one of SKIP_DOMAINS."""
+    try:
+        host = urllib.parse.urlparse(url).hostname or ""
+    except ValueError:
+        return False
+    return any(host == d or host.endswith("." + d) for d in SKIP_DOMAINS)
+
+
+def check_external_links(
+    jobs: int = 1,
+    cache: DocsIndex | None = None,
+    concurrency: int = 16,
+    per_host: int = 4,
+    store: ExternalResultStore | None = None,
+    fragments: bool = False,
+    fragment_budget: int = FRAGMENT_BUDGET,
+):
+    """Check all external links for 404s.
+
+    Results still fresh in `store` are reused; expired ones are
+    revalidated with a conditional request where the host gave us an ETag
+    or Last-Modified, and everything else is probed live. With
+    `fragments`, #fragments on reachable pages are checked too (see
+    check_external_fragments). Returns one finding per location of each
+    broken URL or fragment.
+    """
+    cache = cache or DocsIndex(None)
+    files, scans = scan_corpus(jobs, cache)
+    urls_to_check: dict[str, list[tuple[str, int, str]]] = {}  # url -> [(file, line, kind)]
     total = 0
 
     for f in files:
-        links = extract_links(f)
-        for line_num, text, url in links:
+        for line_num, kind, url, _ in scans[f].links:
             if classify_link(url) != "external":
                 continue
             total += 1
             rel_path = str(f.relative_to(REPO_ROOT))
-            urls_to_check.setdefault(url, []).append((rel_path, line_num))
+            urls_to_check.setdefault(url, []).append((rel_path, line_num, kind))
 
     unique_urls = list(urls_to_check.keys())
     print(f"\n=== External Link Check ===")
     print(f"Files scanned: {len(files)}")
+    print(cache_summary(cache))
     print(f"External links found: {total}")
     print(f"Unique URLs to check: {len(unique_urls)}")
-    print(f"Checking...")
+    print(f"Checking ({concurrency} concurrent, {per_host} per host)...")
 
     broken = []
     skipped = 0
 
-    # Domains that reliably block automated requests or are geo-restricted
-    skip_domains = {"assets-docs.dify.ai", "volcengine.com", "twitter.com", "x.com"}
-
-    for i, url in enumerate(unique_urls):
-        if (i + 1) % 50 == 0:
-            print(f"  Progress: {i + 1}/{len(unique_urls)}")
-
-        # Skip unreliable domains by checking parsed hostname
-        try:
-            host = urllib.parse.urlparse(url).hostname or ""
-            if any(host == d or host.endswith("." + d) for d in skip_domains):
-                skipped += 1
-                continue
-        except Exception:
-            pass
-
-        # Encode non-ASCII characters in URL path, preserving existing percent-escapes
-        try:
-            parsed = urllib.parse.urlparse(url)
-            encoded_url = urllib.parse.urlunparse(parsed._replace(
-                path=urllib.parse.quote(parsed.path, safe="/:@!$&'()*+,;=-._~%")
-            ))
-        except Exception:
-            encoded_url = url
-
-        try:
-            req = urllib.request.Request(
-                encoded_url,
-                method="HEAD",
-                headers={"User-Agent": "Mozilla/5.0 (Dify-Docs-LinkChecker/1.0)"}
-            )
-            resp = urllib.request.urlopen(req, timeout=10)
-            status = resp.getcode()
-            if status >= 400:
-                broken.append((url, f"HTTP {status}", urls_to_check[url]))
-        except urllib.error.HTTPError as e:
-            # Some sites block HEAD, try GET for 405
-            if e.code == 405:
-                try:
-                    req = urllib.request.Request(
-                        encoded_url,
-                        method="GET",
-                        headers={"User-Agent": "Mozilla/5.0 (Dify-Docs-LinkChecker/1.0)"}
-                    )
-                    resp = urllib.request.urlopen(req, timeout=10)
-                except urllib.error.HTTPError as get_e:
-                    if get_e.code == 403:
-                        skipped += 1
-                    else:
-                        broken.append((url, f"HTTP {get_e.code}", urls_to_check[url]))
-                except Exception as get_e:
-                    broken.append((url, f"GET fallback error: {get_e}", urls_to_check[url]))
-            elif e.code == 403:
-                # Many sites block automated requests — don't report as broken
-                skipped += 1
-            else:
-                broken.append((url, f"HTTP {e.code}", urls_to_check[url]))
-        except urllib.error.URLError as e:
-            broken.append((url, f"URL error: {e.reason}", urls_to_check[url]))
-        except Exception as e:
-            broken.append((url, f"Error: {e}", urls_to_check[url]))
+    to_probe = [url for url in unique_urls if not is_skipped_domain(url)]
+    skipped += len(unique_urls) - len(to_probe)
+
+    # Probe each normalized URL once, on behalf of every spelling of it.
+    by_key: dict[str, list[str]] = {}
+    for url in to_probe:
+        by_key.setdefault(normalize_url(url), []).append(url)
+    store = store or ExternalResultStore(None, 0, 0)
+    now = time.time()
+    phase_start = time.perf_counter()
+    fresh, expired = store.lookup(list(by_key), now)
+    live = [urls[0] for key, urls in by_key.items() if key not in fresh]
+    validators = {by_key[key][0]: headers for key, (_, headers) in expired.items()}
+    prober = LinkProber(concurrency, per_host)
+    probed = prober.probe_all(live, validators)
+    _timings.add("external", time.perf_counter() - phase_start, len(live), "URLs probed")
+
+    revalidated = 0
+    by_key_results = dict(fresh)
+    for url, result in probed.items():
+        key = normalize_url(url)
+        if result.status == 304 and key in expired:
+            result = expired[key][0]
+            revalidated += 1
+        by_key_results[key] = result
+    store.save({key: by_key_results[key] for key in (normalize_url(url) for url in live)}, now)
+    results = {url: by_key_results[normalize_url(url)] for url in to_probe}
+    print(
+        f"Results: {len(fresh)} from cache, {len(live)} probed live "
+        f"({revalidated} revalidated unchanged)"
+    )
+
+    for url in to_probe:
+        result = results[url]
+        if result.error:
+            broken.append((url, result.error, urls_to_check[url]))
+        elif result.status == 403:
+            # Many sites block automated requests — don't report as broken
+            skipped += 1
+        elif result.status >= 400:
+            broken.append((url, f"HTTP {result.status}", urls_to_check[url]))
 
     print(f"\nBroken external links: {len(broken)}")
     print(f"Skipped (CDN/403): {skipped}")
@@ -495,12 +2231,152 @@ def check_external_links():
         print(f"\n--- Broken External Links ---\n")
         for url, error, locations in broken:
             print(f"  {error}: {url}")
-            for file_path, line_num in locations[:3]:
+            for file_path, line_num, _ in locations[:3]:
                 print(f"    - {file_path}:L{line_num}")
             if len(locations) > 3:
                 print(f"    ... and {len(locations) - 3} more")
 
-    return len(broken)
+    findings = [
+        Finding(file_path, line_num, url, kind, "broken-external", error)
+        for url, error, locations in broken
+        for file_path, line_num, kind in locations
+    ]
+    if fragments:
+        healthy = [url for url in to_probe if results[url].healthy and results[url].status != 403]
+        findings += check_external_fragments(healthy, urls_to_check, prober, store, fragment_budget)
+    return findings
+
+
+def check_external_fragments(
+    urls: list[str],
+    locations: dict[str, list[tuple[str, int, str]]],
+    prober: LinkProber,
+    store: ExternalResultStore,
+    budget: int = FRAGMENT_BUDGET,
+) -> list[Finding]:
+    """Check the #fragments of reachable external URLs against the pages' anchors.
+
+    Fragments are grouped per page (normalize_url), so every fragment
+    linked on a page costs one streamed GET, which stops as soon as all of
+    them are found. A fragment is broken only if the whole page was read
+    without seeing it; pages cut off by `budget`, non-HTML responses and
+    fetch errors leave their fragments unverified rather than broken.
+    """
+    wanted: dict[str, dict[str, list[str]]] = {}  # page key -> fragment -> [url]
+    page_url: dict[str, str] = {}
+    uncheckable = 0
+    for url in urls:
+        fragment = urllib.parse.unquote(urllib.parse.urlsplit(url).fragment)
+        if not fragment:
+            continue
+        if UNCHECKABLE_FRAGMENT_RE.match(fragment):
+            uncheckable += 1
+            continue
+        key = normalize_url(url)
+        page_url.setdefault(key, url)
+        wanted.setdefault(key, {}).setdefault(fragment, []).append(url)
+
+    now = time.time()
+    pairs = [(key, fragment) for key, frags in wanted.items() for fragment in frags]
+    outcomes = store.lookup_fragments(pairs, now)
+    pages = {
+        page_url[key]: {fragment for fragment in frags if (key, fragment) not in outcomes}
+        for key, frags in wanted.items()
+    }
+    pages = {url: frags for url, frags in pages.items() if frags}
+    phase_start = time.perf_counter()
+    scans = prober.scan_anchors_all(pages, budget)
+    _timings.add("fragments", time.perf_counter() - phase_start, len(pages), "pages fetched")
+
+    fetched: dict[tuple[str, str], bool] = {}
+    unverified = 0
+    for url, frags in pages.items():
+        scan = scans[url]
+        for fragment in frags:
+            if not scan.error and fragment in scan.found:
+                fetched[normalize_url(url), fragment] = True
+            elif not scan.error and scan.complete:
+                fetched[normalize_url(url), fragment] = False
+            else:
+                unverified += 1
+    store.save_fragments(fetched, now)
+    outcomes.update(fetched)
+
+    broken = [(key, fragment) for key, fragment in pairs if outcomes.get((key, fragment)) is False]
+    print(f"\nFragments checked: {len(pairs)} on {len(wanted)} pages "
+          f"({len(pairs) - sum(len(f) for f in pages.values())} from cache, {len(pages)} pages fetched)")
+    print(f"Broken fragments: {len(broken)}")
+    print(f"Fragments not verified (budget/non-HTML/fetch error): {unverified}")
+    print(f"Fragments skipped (line ranges/client-side routes): {uncheckable}")
+
+    findings = []
+    if broken:
+        print(f"\n--- Broken Fragments ---\n")
+    for key, fragment in broken:
+        for url in wanted[key][fragment]:
+            print(f"  #{fragment}: {url}")
+            for file_path, line_num, kind in locations[url][:3]:
+                print(f"    - {file_path}:L{line_num}")
+            if len(locations[url]) > 3:
+                print(f"    ... and {len(locations[url]) - 3} more")
+            findings += [
+                Finding(file_path, line_num, url, kind, "broken-fragment",
+                        f"anchor '#{fragment}' not found on the page")
+                for file_path, line_num, kind in locations[url]
+            ]
+    return findings
+
+
+def findings_json(findings: list[Finding], timings: PhaseTimings | None) -> dict:
+    """The --format json document: every finding plus error/warning totals."""
+    doc = {
+        "version": 1,
+        "summary": {
+            "errors": sum(f.level == "error" for f in findings),
+            "warnings": sum(f.level == "warning" for f in findings),
+        },
+        "findings": [f._asdict() for f in findings],
+    }
+    if timings is not None:
+        doc["timings"] = timings.as_dict()
+    return doc
+
+
+def findings_sarif(findings: list[Finding], timings: PhaseTimings | None) -> dict:
+    """The --format sarif document (SARIF 2.1.0), for code scanning / PR annotations."""
+    results = []
+    for f in findings:
+        message = f"{f.url}: {f.reason}" if f.url and f.url not in f.reason else f.reason
+        if f.fix:
+            message += f" (suggested fix: {f.fix})"
+        location: dict = {"artifactLocation": {"uri": f.file, "uriBaseId": "%SRCROOT%"}}
+        if f.line:
+            location["region"] = {"startLine": f.line}
+        results.append({
+            "ruleId": f.rule,
+            "level": f.level,
+            "message": {"text": message},
+            "locations": [{"physicalLocation": location}],
+            "properties": {"url": f.url, "kind": f.kind, "suggestedFix": f.fix},
+        })
+    run: dict = {
+        "tool": {"driver": {
+            "name": "check-links",
+            "rules": [
+                {"id": rule, "shortDescription": {"text": text}}
+                for rule, text in RULES.items()
+            ],
+        }},
+        "originalUriBaseIds": {"%SRCROOT%": {"uri": REPO_ROOT.as_uri() + "/"}},
+        "results": results,
+    }
+    if timings is not None:
+        run["properties"] = {"timings": timings.as_dict()}
+    return {
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "version": "2.1.0",
+        "runs": [run],
+    }
 
 
 def main():
@@ -509,17 +2385,152 @@ def main():
     group.add_argument("--internal", action="store_true", help="Check internal links only")
     group.add_argument("--external", action="store_true", help="Check external links only")
     group.add_argument("--all", action="store_true", help="Check both internal and external")
+    group.add_argument(
+        "--staged", action="store_true",
+        help="Pre-commit check: internal links in staged pages and the pages that link into them",
+    )
+    group.add_argument(
+        "--watch", action="store_true",
+        help="Check internal links, then recheck pages as they are saved",
+    )
+    group.add_argument(
+        "--orphans", action="store_true",
+        help="Report pages outside navigation with no inbound links (informational)",
+    )
+    group.add_argument(
+        "--parity", action="store_true",
+        help="Check that en/zh/ja pages mirror each other (counterparts, structure, link languages)",
+    )
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=1, metavar="N",
+        help="Scan files in N worker processes (0 = one per CPU; default: 1)",
+    )
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument(
+        "--no-cache", action="store_true",
+        help="Don't read or write the docs index cache or the external result cache (.cache/)",
+    )
+    cache_group.add_argument(
+        "--rebuild-cache", action="store_true",
+        help="Discard the existing caches and rewrite them from scratch",
+    )
+    parser.add_argument(
+        "--changed-since", metavar="REF",
+        help="Internal check: only check pages changed since the merge base with "
+             "REF, plus the pages that link into them",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=16, metavar="N",
+        help="External check: max requests in flight overall (default: 16)",
+    )
+    parser.add_argument(
+        "--per-host", type=int, default=4, metavar="N",
+        help="External check: max requests in flight per host (default: 4)",
+    )
+    parser.add_argument(
+        "--fragments", action="store_true",
+        help="External check: also verify #fragments against the target page's anchors",
+    )
+    parser.add_argument(
+        "--fragment-budget", type=int, default=FRAGMENT_BUDGET // 1024, metavar="KB",
+        help=f"External check: read at most KB of each page for --fragments "
+             f"(default: {FRAGMENT_BUDGET // 1024})",
+    )
+    parser.add_argument(
+        "--ttl-ok", type=float, default=168, metavar="HOURS",
+        help="External check: reuse cached healthy results this long (default: 168)",
+    )
+    parser.add_argument(
+        "--ttl-fail", type=float, default=12, metavar="HOURS",
+        help="External check: reuse cached failures this long (default: 12)",
+    )
+    parser.add_argument(
+        "--top", type=int, default=20, metavar="N",
+        help="Orphan report: number of most-linked pages to list (default: 20)",
+    )
+    parser.add_argument(
+        "--graph-out", type=Path, metavar="FILE",
+        help="Orphan report: also write the link graph as JSON to FILE",
+    )
+    parser.add_argument(
+        "--poll", action="store_true",
+        help="Watch mode: poll for changes instead of using inotify",
+    )
+    parser.add_argument(
+        "--format", choices=("text", "json", "sarif"), default="text",
+        help="Output format for --internal/--external/--all; with json or sarif "
+             "the document goes to stdout and the text report to stderr (default: text)",
+    )
+    parser.add_argument(
+        "--timings", action="store_true",
+        help="Report wall time and item counts per check phase",
+    )
+    parser.add_argument(
+        "--fix", action="store_true",
+        help=f"Rewrite links whose suggested fix has confidence >= {FIX_MIN_SCORE} "
+             "(--internal, --all, --parity)",
+    )
     args = parser.parse_args()
+    if args.format != "text" and (args.watch or args.orphans):
+        parser.error("--format json/sarif only applies to --internal, --external, --all and --parity")
+    if args.changed_since and args.staged:
+        parser.error("--changed-since and --staged are mutually exclusive")
+    if args.fix and not (args.internal or args.all or args.parity):
+        parser.error("--fix only applies to --internal, --all and --parity")
+
+    cache = DocsIndex(None if args.no_cache else CACHE_FILE, rebuild=args.rebuild_cache)
+
+    if args.watch:
+        sys.exit(watch_internal_links(args.jobs, cache, args.poll))
+
+    if args.orphans:
+        report_orphans(args.jobs, cache, args.top, args.graph_out)
+        sys.exit(0)
+
+    findings: list[Finding] = []
+    text_out = sys.stdout if args.format == "text" else sys.stderr
+    with contextlib.redirect_stdout(text_out):
+        if args.internal or args.all or args.staged:
+            findings += check_internal_links(args.jobs, cache, args.changed_since, args.staged)
+
+        if args.parity:
+            findings += check_parity(args.jobs, cache)
+
+        if args.external or args.all:
+            store = ExternalResultStore(
+                None if args.no_cache else EXTERNAL_CACHE_FILE,
+                args.ttl_ok * 3600, args.ttl_fail * 3600, rebuild=args.rebuild_cache,
+            )
+            try:
+                findings += check_external_links(
+                    args.jobs, cache, args.concurrency, args.per_host, store,
+                    args.fragments, args.fragment_budget * 1024,
+                )
+            finally:
+                store.close()
+
+        if args.fix:
+            fixed = apply_fixes(findings)
+            if fixed:
+                print(f"\n--- Fixed ({len(fixed)} links in {len({f.file for f in fixed})} files) ---\n")
+                for f in fixed:
+                    print(f"  {f.file}:L{f.line}: {f.url} → {f.fix}")
+            else:
+                print("\nNo high-confidence fixes to apply.")
+            findings = [f for f in findings if f not in fixed]
 
-    exit_code = 0
-
-    if args.internal or args.all:
-        exit_code = check_internal_links()
+        if args.timings:
+            _timings.print()
 
-    if args.external or args.all:
-        exit_code += check_external_links()
+    timings = _timings if args.timings else None
+    if args.format == "json":
+        json.dump(findings_json(findings, timings), sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    elif args.format == "sarif":
+        json.dump(findings_sarif(findings, timings), sys.stdout, ensure_ascii=False, indent=2)
+        print()
 
-    sys.exit(1 if exit_code > 0 else 0)
+    sys.exit(1 if any(f.level == "error" for f in findings) else 0)
 
 
 if __name__ == "__main__":
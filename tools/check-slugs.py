@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Golden check for docs_index.slugify(): heading text -> anchor slug.
+
+Usage:
+    python3 tools/check-slugs.py             # Check slugify() against tools/slug-golden.json
+    python3 tools/check-slugs.py --update    # Regenerate the fixture from the current pages
+
+slugify() is table-driven for speed, and every anchor check-links.py
+validates depends on it matching Mintlify. The fixture pins its output:
+each pair was produced by reference_slugify() below, the original
+regex-per-step implementation, over the headings and Tab/Accordion titles
+in en/, zh/ and ja/ that hit a stripping rule (STRIPPED_RE), plus
+EDGE_CASES. Any change to the slug tables must keep this check passing
+(exit 1 lists the pairs that differ); a deliberate change to the slug
+rules also bumps docs_index.CACHE_VERSION and updates reference_slugify()
+before regenerating.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+from docs_index import CUSTOM_ID_RE, HEADING_RE, TAB_TITLE_RE, find_pages, slugify, split_fences
+
+GOLDEN_FILE = Path(__file__).resolve().parent / "slug-golden.json"
+# Text that slugify() does more to than lowercase and hyphenate: ASCII
+# punctuation, tags, markers, custom ids, whitespace other than one space.
+STRIPPED_RE = re.compile(r"[^\w\s\u0080-\U0010ffff-]|\s\s|[^\S ]")
+
+# Inputs the pages may not cover: tags, markers, custom ids, every ASCII
+# punctuation char, full-width punctuation and unusual whitespace.
+EDGE_CASES = [
+    "",
+    "   ",
+    "Overview",
+    "Step 1: Install",
+    "Switch Your Workspace <Badge color=\"blue\">Cloud</Badge>",
+    "`retrieval_setting`",
+    "**Bold** and *italic*",
+    "Custom id {#my-anchor}",
+    "a -- b --- c",
+    "-leading and trailing-",
+    "".join(chr(c) for c in range(33, 127)),
+    "Tabs\tand\nnewlines",
+    "no break　space",
+    "ctrl\x1cseparators\x1f",
+    "知识库：创建",
+    "ナレッジベース（概要）",
+    "Émigré Café",
+    "Über 50% «quoted» — dash",
+    "emoji 🚀 launch",
+    "x < y > z",
+    "<br/>",
+    "snake_case and kebab-case",
+]
+
+
+def reference_slugify(text: str) -> str:
+    """slugify() as first written, one regex per step. The fixture's source of truth."""
+    s = text.lower().strip()
+    s = re.sub(r"<[^>]+>", "", s)
+    s = re.sub(r"[`*]", "", s)
+    s = CUSTOM_ID_RE.sub("", s)
+    s = re.sub(r"[^\w\s\u0080-\U0010ffff-]", "", s, flags=re.UNICODE)
+    s = re.sub(r"\s+", "-", s)
+    s = re.sub(r"-+", "-", s).strip("-")
+    return s
+
+
+def page_texts() -> set[str]:
+    """Every heading and Tab/Accordion title text in the doc pages."""
+    texts = set()
+    for path in find_pages():
+        prose, _ = split_fences(path.read_text(encoding="utf-8"))
+        texts.update(m.group(2) for m in HEADING_RE.finditer(prose))
+        texts.update(m.group(1) for m in TAB_TITLE_RE.finditer(prose))
+    return texts
+
+
+def update() -> None:
+    texts = sorted({text for text in page_texts() if STRIPPED_RE.search(text)} | set(EDGE_CASES))
+    pairs = [[text, reference_slugify(text)] for text in texts]
+    # One pair per line, so a regenerated fixture diffs by heading
+    lines = ",\n".join(json.dumps(pair, ensure_ascii=False) for pair in pairs)
+    GOLDEN_FILE.write_text(f"[\n{lines}\n]\n", encoding="utf-8")
+    print(f"Wrote {len(pairs)} heading/slug pairs -> {GOLDEN_FILE.name}")
+
+
+def check() -> int:
+    pairs = json.loads(GOLDEN_FILE.read_text(encoding="utf-8"))
+    failures = [(text, want, slugify(text)) for text, want in pairs if slugify(text) != want]
+    for text, want, got in failures:
+        print(f"  {text!r}: expected {want!r}, got {got!r}")
+    print(f"{len(pairs) - len(failures)}/{len(pairs)} slugs match {GOLDEN_FILE.name}")
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check docs_index.slugify() against the golden heading/slug pairs")
+    parser.add_argument("--update", action="store_true", help="Regenerate the fixture with reference_slugify()")
+    args = parser.parse_args()
+    if args.update:
+        update()
+        return
+    sys.exit(check())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,567 @@
+"""Parsed index of the documentation pages, shared by the repo's tools.
+
+Each page under en/, zh/ and ja/ is parsed once into a PageRecord:
+frontmatter, headings with their anchors, links with line numbers, code
+fences and component blocks. check-links.py, check-images.py and the
+api-pipeline scripts read pages through a DocsIndex instead of each
+re-reading and re-regexing the files:
+
+    import docs_index
+
+    index = docs_index.DocsIndex.default()
+    record = index.get(index.pages()[0])
+    records = index.load(index.pages(), jobs=8)   # parse misses in parallel
+
+Records are memoized per process and persisted to .cache/docs-index.json,
+keyed by repo-relative path and content hash, so a warm run only reparses
+changed files; files whose mtime and size are unchanged aren't even
+rehashed. The persisted file is read on first use, not on import.
+Bump CACHE_VERSION whenever extraction or slug rules change, so stale
+entries are discarded instead of silently reused.
+
+Scripts outside tools/ put this directory on sys.path first.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DOC_DIRS = ["en", "zh", "ja"]
+CACHE_FILE = REPO_ROOT / ".cache" / "docs-index.json"
+CACHE_VERSION = 4
+
+# Single-pass link tokenizer over a file's raw bytes. Alternatives are tried
+# left to right at each position, so a fenced block is consumed whole (its
+# example links are never reported) and markdown links, `href=` and `src=`
+# attributes come out in document order. Every branch starts with a literal,
+# which lets the regex engine skip ahead to candidate positions instead of
+# trying each branch at every byte. No branch crosses a newline except the
+# fence.
+LINK_TOKEN_RE = re.compile(
+    rb"```.*?```"
+    rb"|!\[(?P<alt>[^\]\n]*)\]\((?P<image>[^)\n]+)\)"
+    rb"|\[(?P<text>[^\]\n]*)\]\((?P<md>[^)\n]+)\)"
+    rb'|href="(?P<href>[^"\n]+)"'
+    rb'|src="(?P<src>[^"\n]+)"',
+    re.DOTALL,
+)
+# HTML attributes nested inside markdown link text, e.g. `[<img src="...">](url)`
+HTML_ATTR_RE = re.compile(rb'(href|src)="([^"\n]+)"')
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*$", re.MULTILINE)
+CUSTOM_ID_RE = re.compile(r"\{#([\w-]+)\}")
+HTML_ID_RE = re.compile(r"""<a\s+[^>]*\bid=["']([\w-]+)["']""", re.IGNORECASE)
+CODE_FENCE_RE = re.compile(r"```.*?```", re.DOTALL)
+FENCE_INFO_RE = re.compile(r"```([^\s`{]*)")
+FRONTMATTER_RE = re.compile(r"\A---[ \t]*\n(.*?)\n---[ \t]*(?:\n|\Z)", re.DOTALL)
+FRONTMATTER_LINE_RE = re.compile(r"""^([\w-]+):[ \t]*(.*?)[ \t]*$""")
+# Mintlify components whose `title=` attribute generates an anchor (e.g.,
+# `<Tab title="Workflow Tool">` → `#workflow-tool`).
+TAB_TITLE_RE = re.compile(
+    r"""<(?:Tab|Accordion)\b[^>]*\btitle=["']([^"']+)["']""",
+    re.IGNORECASE,
+)
+# Opening tags of JSX components (capitalized, unlike HTML elements).
+COMPONENT_RE = re.compile(r"<([A-Z][\w.]*)\b([^>]*)>")
+COMPONENT_TITLE_RE = re.compile(r"""\btitle=["']([^"']+)["']""")
+# Mintlify blocks counted by the parity check (`<Tab` but not `<Tabs`).
+STRUCTURE_TAG_RE = re.compile(r"<(Step|Tab)\b")
+STRUCTURE_KEYS = ("headings", "steps", "tabs", "fences")
+
+
+def find_pages(root: Path = REPO_ROOT) -> list[Path]:
+    """Find all .md and .mdx files in doc directories."""
+    files = []
+    for d in DOC_DIRS:
+        doc_dir = root / d
+        if doc_dir.exists():
+            files.extend(doc_dir.rglob("*.md"))
+            files.extend(doc_dir.rglob("*.mdx"))
+    return sorted(files)
+
+
+class Link(NamedTuple):
+    """One link occurrence: 1-based line, kind, URL, and byte offset of the URL.
+
+    kind is "md" for `[text](url)`, "image" for `![alt](url)`, and "href" /
+    "src" for HTML attributes.
+    """
+
+    line: int
+    kind: str
+    url: str
+    offset: int
+
+
+class Heading(NamedTuple):
+    """A markdown heading and the anchor Mintlify gives it ("" if none)."""
+
+    line: int
+    level: int
+    text: str
+    anchor: str
+
+
+class Fence(NamedTuple):
+    """A fenced code block: first and last line, and its info-string language."""
+
+    line: int
+    end_line: int
+    lang: str
+
+
+class Component(NamedTuple):
+    """An opening JSX component tag outside code fences, e.g. `<Step title="...">`."""
+
+    line: int
+    name: str
+    title: str | None
+
+
+class PageRecord(NamedTuple):
+    """Everything the tools extract from one page.
+
+    anchors holds every anchor the page defines (headings, custom ids,
+    `<a id>`, Tab/Accordion titles); heading_counts maps each heading slug
+    to how many headings produced it; structure holds the counts the
+    parity check compares (see STRUCTURE_KEYS).
+    """
+
+    digest: str
+    frontmatter: dict
+    headings: list[Heading]
+    links: list[Link]
+    fences: list[Fence]
+    components: list[Component]
+    anchors: set[str]
+    heading_counts: dict[str, int]
+    structure: dict[str, int]
+
+
+EMPTY_RECORD = PageRecord("", {}, [], [], [], [], set(), {}, {})
+
+
+def tokenize_links(content: bytes) -> list[Link]:
+    """Extract every link from a file's content in one fence-aware pass.
+
+    An `href` whose URL also appears as a markdown link on the same line is
+    reported once, as the markdown link.
+    """
+    links: list[Link] = []
+    md_urls: set[tuple[int, bytes]] = set()
+    line, pos = 1, 0
+    for m in LINK_TOKEN_RE.finditer(content):
+        kind = m.lastgroup
+        if kind is None:  # fenced code block
+            continue
+        line += content.count(b"\n", pos, m.start())
+        pos = m.start()
+        if kind in ("md", "image"):
+            md_urls.add((line, m.group(kind)))
+            start, end = m.span("alt" if kind == "image" else "text")
+            for attr in HTML_ATTR_RE.finditer(content, start, end):
+                links.append(Link(line, attr.group(1).decode(), attr.group(2), attr.start(2)))
+        links.append(Link(line, kind, m.group(kind), m.start(kind)))
+    return [
+        Link(link.line, link.kind, link.url.decode("utf-8"), link.offset)
+        for link in links
+        if not (link.kind == "href" and (link.line, link.url) in md_urls)
+    ]
+
+
+# slugify() tables. Deleting characters with str.translate replaces the
+# per-heading regex passes for markdown markers and ASCII punctuation.
+# tools/check-slugs.py checks slugify() against golden heading/slug pairs.
+_SLUG_TAG_RE = re.compile(r"<[^>]+>")
+_SLUG_MARKERS = str.maketrans("", "", "`*")
+# Every ASCII char that is not a word char, whitespace or "-": the ASCII half
+# of `[^\w\s\u0080-\U0010ffff-]`. Non-ASCII chars are never stripped.
+_SLUG_ASCII_PUNCT = str.maketrans(
+    "", "", "".join(c for c in map(chr, range(128)) if not re.match(r"[\w\s-]", c))
+)
+_SLUG_HYPHENS_RE = re.compile(r"-{2,}")
+
+
+@functools.lru_cache(maxsize=8192)
+def slugify(text: str) -> str:
+    """Convert heading text to a Mintlify-style anchor slug.
+
+    Lowercase, strip ASCII punctuation and markdown markers, turn
+    whitespace into hyphens, collapse and trim. Non-ASCII characters (CJK
+    text and full-width punctuation like "：") are kept, matching Mintlify,
+    so an English heading's ASCII ":" is dropped while a zh/ja heading's
+    "：" is preserved.
+
+    Memoized: headings like "Overview" or "Step 1" recur across pages and
+    languages.
+    """
+    s = text.lower().strip()
+    # Strip JSX/HTML tags but keep their inner text. Mintlify renders a
+    # heading's components and includes their text in the anchor, e.g.
+    # `## Switch Your Workspace <Badge color="blue">Cloud</Badge>` ->
+    # `#switch-your-workspace-cloud`. Dropping the tag markup (not the
+    # "Cloud" text) avoids mangling the attributes into the slug.
+    if "<" in s:
+        s = _SLUG_TAG_RE.sub("", s)
+    # Strip inline markdown formatting markers (backticks and asterisks).
+    # Underscores are preserved — they appear in identifier headings like
+    # `retrieval_setting` and Mintlify keeps them in the slug.
+    s = s.translate(_SLUG_MARKERS)
+    # Strip Pandoc/kramdown custom-id syntax if embedded in heading text
+    if "{#" in s:
+        s = CUSTOM_ID_RE.sub("", s)
+    # Strip ASCII punctuation only; every non-ASCII char (CJK text and
+    # full-width punctuation like "：") is preserved in the slug.
+    s = s.translate(_SLUG_ASCII_PUNCT)
+    # Whitespace → hyphen (str.split() splits on the same chars as `\s+`)
+    s = "-".join(s.split())
+    # Collapse hyphens, trim
+    s = _SLUG_HYPHENS_RE.sub("-", s).strip("-")
+    return s
+
+
+def parse_frontmatter(content: str) -> dict:
+    """The page's YAML frontmatter as a dict ({} if it has none or it's invalid).
+
+    Without PyYAML only top-level `key: value` pairs are read, as strings.
+    Values that aren't JSON types (e.g. dates) are stringified so records
+    stay persistable.
+    """
+    m = FRONTMATTER_RE.match(content)
+    if not m:
+        return {}
+    try:
+        # Imported here: warm runs never parse a page and skip the import.
+        import yaml
+    except ImportError:
+        yaml = None
+    if yaml is not None:
+        try:
+            data = yaml.safe_load(m.group(1))
+        except yaml.YAMLError:
+            return {}
+        return json.loads(json.dumps(data, default=str)) if isinstance(data, dict) else {}
+    data = {}
+    for line in m.group(1).splitlines():
+        pair = FRONTMATTER_LINE_RE.match(line)
+        if pair and pair.group(2):
+            data[pair.group(1)] = pair.group(2).strip("\"'")
+    return data
+
+
+def split_fences(content: str) -> tuple[str, list[Fence]]:
+    """Blank out fenced code blocks, keeping line numbers; returns (prose, fences).
+
+    Each fence is replaced by its newlines only, so headings and tags in
+    code samples are ignored while the rest of the page keeps its lines.
+    """
+    fences: list[Fence] = []
+    parts: list[str] = []
+    line, pos = 1, 0
+    for m in CODE_FENCE_RE.finditer(content):
+        line += content.count("\n", pos, m.start())
+        parts.append(content[pos:m.start()])
+        newlines = m.group(0).count("\n")
+        parts.append("\n" * newlines)
+        fences.append(Fence(line, line + newlines, FENCE_INFO_RE.match(m.group(0)).group(1)))
+        line += newlines
+        pos = m.end()
+    parts.append(content[pos:])
+    return "".join(parts), fences
+
+
+def _line_starts(text: str) -> list[int]:
+    starts = [0]
+    starts.extend(m.end() for m in re.finditer("\n", text))
+    return starts
+
+
+def _line_at(starts: list[int], offset: int) -> int:
+    lo, hi = 0, len(starts)
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if starts[mid] <= offset:
+            lo = mid
+        else:
+            hi = mid
+    return lo + 1
+
+
+def parse_headings(prose: str, starts: list[int]) -> tuple[list[Heading], dict[str, int]]:
+    """Headings of fence-free text with Mintlify anchors, plus slug counts.
+
+    Duplicate slugs get Mintlify's `-1`, `-2`, ... suffixes; a `{#id}` in
+    the heading text overrides the slug.
+    """
+    headings: list[Heading] = []
+    counts: dict[str, int] = {}
+    for match in HEADING_RE.finditer(prose):
+        line = _line_at(starts, match.start())
+        level, text = len(match.group(1)), match.group(2)
+        custom = CUSTOM_ID_RE.search(text)
+        if custom:
+            headings.append(Heading(line, level, text, custom.group(1)))
+            continue
+        slug = slugify(text)
+        if not slug:
+            anchor = ""
+        elif slug not in counts:
+            counts[slug] = 1
+            anchor = slug
+        else:
+            anchor = f"{slug}-{counts[slug]}"
+            counts[slug] += 1
+        headings.append(Heading(line, level, text, anchor))
+    return headings, counts
+
+
+def anchors_from_text(content: str) -> tuple[set[str], dict[str, int]]:
+    """Compute a file's anchor slugs from its content.
+
+    Returns (anchors, heading_counts), where heading_counts maps each
+    heading slug to the number of headings that produced it.
+    """
+    prose, _ = split_fences(content)
+    headings, counts = parse_headings(prose, _line_starts(prose))
+    return page_anchors(prose, headings), counts
+
+
+def page_anchors(prose: str, headings: list[Heading]) -> set[str]:
+    anchors = {h.anchor for h in headings if h.anchor}
+    # Standalone <a id="..."> anchors
+    for match in HTML_ID_RE.finditer(prose):
+        anchors.add(match.group(1))
+    # Mintlify Tab/Accordion titles also produce anchors
+    for match in TAB_TITLE_RE.finditer(prose):
+        slug = slugify(match.group(1))
+        if slug:
+            anchors.add(slug)
+    return anchors
+
+
+def parse_components(prose: str, starts: list[int]) -> list[Component]:
+    components = []
+    for match in COMPONENT_RE.finditer(prose):
+        title = COMPONENT_TITLE_RE.search(match.group(2))
+        components.append(Component(
+            _line_at(starts, match.start()), match.group(1), title.group(1) if title else None,
+        ))
+    return components
+
+
+def structure_counts(prose: str, headings: list[Heading], fences: list[Fence]) -> dict[str, int]:
+    """Count headings, <Step> and <Tab> blocks, and code fences in a page.
+
+    Headings and tags inside fences don't count.
+    """
+    counts = dict.fromkeys(STRUCTURE_KEYS, 0)
+    counts["fences"] = len(fences)
+    counts["headings"] = len(headings)
+    for match in STRUCTURE_TAG_RE.finditer(prose):
+        counts["steps" if match.group(1) == "Step" else "tabs"] += 1
+    return counts
+
+
+def parse_page(path: Path) -> PageRecord:
+    """Parse one page into a PageRecord. Runs in pool workers."""
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return EMPTY_RECORD
+    return parse_source(raw)
+
+
+def parse_source(raw: bytes) -> PageRecord:
+    """Parse a page's raw bytes, e.g. a staged blob that differs from the file."""
+    digest = hashlib.sha256(raw).hexdigest()
+    try:
+        content = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return EMPTY_RECORD._replace(digest=digest)
+    prose, fences = split_fences(content)
+    starts = _line_starts(prose)
+    headings, counts = parse_headings(prose, starts)
+    return PageRecord(
+        digest,
+        parse_frontmatter(content),
+        headings,
+        tokenize_links(raw),
+        fences,
+        parse_components(prose, starts),
+        page_anchors(prose, headings),
+        counts,
+        structure_counts(prose, headings, fences),
+    )
+
+
+def _stat_key(path: Path) -> list[int]:
+    st = path.stat()
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _record_to_json(record: PageRecord) -> dict:
+    return {**record._asdict(), "anchors": sorted(record.anchors)}
+
+
+def _record_from_json(entry: dict) -> PageRecord:
+    return PageRecord(
+        entry["digest"],
+        entry["frontmatter"],
+        [Heading(*h) for h in entry["headings"]],
+        [Link(*link) for link in entry["links"]],
+        [Fence(*f) for f in entry["fences"]],
+        [Component(*c) for c in entry["components"]],
+        set(entry["anchors"]),
+        entry["heading_counts"],
+        entry["structure"],
+    )
+
+
+class DocsIndex:
+    """Page records, memoized in memory and persisted by content hash.
+
+    path is the JSON file to persist to (None keeps the index in memory
+    only); rebuild ignores what was persisted. hits and misses count
+    persisted-entry lookups, for the tools' summaries.
+    """
+
+    def __init__(self, path: Path | None = None, root: Path = REPO_ROOT, rebuild: bool = False):
+        self.path = path
+        self.root = root
+        self.rebuild = rebuild
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, dict] | None = None
+        self._records: dict[Path, PageRecord] = {}
+        self._pages: list[Path] | None = None
+        self._stats: dict[Path, list[int]] = {}
+        self._dirty = False
+
+    @classmethod
+    def default(cls, root: Path = REPO_ROOT, enabled: bool = True, rebuild: bool = False) -> DocsIndex:
+        """An index persisted to <root>/.cache/docs-index.json (unless disabled)."""
+        return cls(root / ".cache" / "docs-index.json" if enabled else None, root, rebuild)
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def _persisted(self) -> dict[str, dict]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path is not None and not self.rebuild:
+                try:
+                    data = json.loads(self.path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    data = {}
+                if data.get("version") == CACHE_VERSION:
+                    self._entries = data.get("files", {})
+        return self._entries
+
+    def pages(self) -> list[Path]:
+        """Every doc page, found once per index."""
+        if self._pages is None:
+            self._pages = find_pages(self.root)
+        return self._pages
+
+    def get(self, path: Path) -> PageRecord:
+        """One page's record. Not written back until save() or the next load()."""
+        return self.load([path], persist=False)[path]
+
+    def load(self, files: list[Path], jobs: int = 1, persist: bool = True) -> dict[Path, PageRecord]:
+        """Records for `files`, in order, parsing only what isn't memoized or persisted.
+
+        With persistence, a file whose mtime and size match its persisted
+        entry is taken as is; any other file is hashed and matched against
+        the entry's digest. The misses are parsed serially or across a
+        process pool (jobs <= 0: one worker per CPU) and, with `persist`,
+        written back.
+        """
+        records: dict[Path, PageRecord | None] = {f: self._records.get(f) for f in files}
+        if self.enabled:
+            entries = self._persisted()
+            for f, record in records.items():
+                if record is not None:
+                    continue
+                entry = entries.get(self._key(f))
+                try:
+                    # Stat before reading, so a write in between is caught next time.
+                    stat = self._stats[f] = _stat_key(f)
+                    if entry is not None and entry.get("stat") == stat:
+                        self.hits += 1
+                        records[f] = _record_from_json(entry)
+                        continue
+                    digest = hashlib.sha256(f.read_bytes()).hexdigest()
+                except OSError:
+                    continue
+                if entry is None or entry["digest"] != digest:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    records[f] = _record_from_json(entry)
+                    self._dirty = True  # remember the new stat
+        todo = [f for f, record in records.items() if record is None]
+
+        if jobs <= 0:
+            jobs = os.cpu_count() or 1
+        if jobs == 1 or len(todo) < 2:
+            results = [parse_page(f) for f in todo]
+        else:
+            chunksize = max(1, len(todo) // (jobs * 4))
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(parse_page, todo, chunksize=chunksize))
+        records.update(zip(todo, results))
+
+        self._records.update(records)
+        if todo:
+            self._dirty = True
+        if persist:
+            self.save()
+        return records
+
+    def refresh(self, path: Path) -> PageRecord | None:
+        """Reparse `path` after it changed on disk; None (and forgotten) if it's gone."""
+        self._records.pop(path, None)
+        try:
+            self._stats[path] = _stat_key(path)
+        except OSError:
+            return None
+        record = self._records[path] = parse_page(path)
+        self._dirty = True
+        return record
+
+    def save(self):
+        """Persist the memoized records, dropping entries for files that no longer exist."""
+        if self.path is None or not self._dirty:
+            return
+        files = {
+            rel: entry for rel, entry in self._persisted().items()
+            if (self.root / rel).is_file()
+        }
+        for path, record in self._records.items():
+            if path.is_file():
+                files[self._key(path)] = {**_record_to_json(record), "stat": self._stats.get(path)}
+        self._entries = files
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"version": CACHE_VERSION, "files": files}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "Docs index cache: disabled"
+        return f"Docs index cache: {self.hits} hits, {self.misses} misses"
+
+    def _key(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
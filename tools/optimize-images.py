@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""Losslessly recompress local images, and gate new images on a size budget.
+
+Usage:
+    python3 tools/optimize-images.py                    # Report possible savings (no writes)
+    python3 tools/optimize-images.py --write            # Rewrite images in place when smaller
+    python3 tools/optimize-images.py --to webp          # Write .webp copies next to the originals
+    python3 tools/optimize-images.py --check --since origin/main --budget 500
+
+PNGs are recompressed without touching pixels: the image data is
+re-deflated at zlib level 9 and text/time metadata is dropped; color
+profile chunks are kept. JPEGs go through
+`jpegtran -optimize -copy none` when it is on PATH. --to webp/avif
+converts instead, which needs Pillow built with that codec
+(`pip install Pillow`); without the codec each image is reported as
+skipped. Page references are not rewritten. Paths given on the command
+line must be inside the repo.
+
+Work runs in a process pool. Results are cached in
+.cache/optimize-images.json, keyed by the input's SHA-256 and the encoder
+settings, so a rerun skips every image it has already seen, and an image
+rewritten by --write is recorded as already optimal.
+
+--check fails (exit 1) when an image added or changed since the merge
+base with --since is larger than --budget KB, and says whether
+optimizing it would bring it under.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+try:
+    from PIL import Image
+except ImportError:  # only needed for --to webp/avif
+    Image = None
+
+_spec = importlib.util.spec_from_file_location("check_images", Path(__file__).with_name("check-images.py"))
+check_images = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(check_images)
+
+REPO_ROOT = check_images.REPO_ROOT
+CACHE_FILE = REPO_ROOT / ".cache" / "optimize-images.json"
+CACHE_VERSION = 1
+DEFAULT_BUDGET_KB = 500
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Chunks dropped when recompressing: text and timestamps, plus Apple's
+# iDOT, which holds byte offsets into the IDAT stream we rewrite. Color
+# chunks (gAMA, cHRM, sRGB, iCCP, ...) are kept: the pixels don't change.
+PNG_STRIP_CHUNKS = {b"tEXt", b"zTXt", b"iTXt", b"tIME", b"iDOT"}
+# Animated PNGs carry frame data outside IDAT; leave them alone.
+PNG_ANIMATION_CHUNKS = {b"acTL", b"fcTL", b"fdAT"}
+
+
+class Job(NamedTuple):
+    path: Path
+    settings: str  # encoder and its options, part of the cache key
+    write: bool
+
+
+class Outcome(NamedTuple):
+    """Result of optimizing one image; out_digest is set when a file was written.
+
+    skipped is set (and nothing encoded) when Pillow lacks the target codec.
+    """
+
+    rel: str
+    digest: str
+    bytes_in: int
+    bytes_out: int
+    out_digest: str | None = None
+    error: str | None = None
+    skipped: str | None = None
+
+
+def png_chunks(data: bytes):
+    """Yield (type, body) for each chunk of a PNG; raises ValueError if malformed."""
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("not a PNG")
+    pos = len(PNG_SIGNATURE)
+    while pos < len(data):
+        if pos + 8 > len(data):
+            raise ValueError("truncated chunk header")
+        length, ctype = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        if len(body) != length:
+            raise ValueError("truncated chunk")
+        yield ctype, body
+        pos += 12 + length
+        if ctype == b"IEND":
+            return
+
+
+def png_chunk(ctype: bytes, body: bytes) -> bytes:
+    return struct.pack(">I4s", len(body), ctype) + body + struct.pack(">I", zlib.crc32(ctype + body))
+
+
+def recompress_png(data: bytes, level: int = 9) -> bytes:
+    """Re-deflate a PNG's image data into one IDAT and strip metadata chunks.
+
+    Pixels, filters and color information are unchanged. Returns `data`
+    itself for animated PNGs.
+    """
+    chunks = list(png_chunks(data))
+    if any(ctype in PNG_ANIMATION_CHUNKS for ctype, _ in chunks):
+        return data
+    raw = zlib.decompress(b"".join(body for ctype, body in chunks if ctype == b"IDAT"))
+    deflate = zlib.compressobj(level, zlib.DEFLATED, 15, 9)
+    idat = deflate.compress(raw) + deflate.flush()
+
+    out = [PNG_SIGNATURE]
+    for ctype, body in chunks:
+        if ctype == b"IDAT":
+            if idat is not None:
+                out.append(png_chunk(b"IDAT", idat))
+                idat = None
+            continue
+        if ctype not in PNG_STRIP_CHUNKS:
+            out.append(png_chunk(ctype, body))
+    return b"".join(out)
+
+
+def jpegtran(data: bytes) -> bytes:
+    """Optimize a JPEG's Huffman tables and drop metadata (lossless)."""
+    with tempfile.NamedTemporaryFile(suffix=".jpg") as src:
+        src.write(data)
+        src.flush()
+        result = subprocess.run(
+            ["jpegtran", "-optimize", "-copy", "none", src.name],
+            check=True, capture_output=True,
+        )
+    return result.stdout
+
+
+def convert(data: bytes, fmt: str, quality: int | None) -> bytes:
+    """Re-encode as WebP or AVIF with Pillow; lossless WebP when quality is None.
+
+    Raises KeyError when this Pillow build has no encoder for `fmt`.
+    """
+    buf = io.BytesIO()
+    with Image.open(io.BytesIO(data)) as img:
+        if fmt == "webp" and quality is None:
+            img.save(buf, "WEBP", lossless=True, method=6)
+        else:
+            img.save(buf, fmt.upper(), quality=quality or 80)
+    return buf.getvalue()
+
+
+def encoder_settings(path: Path, to: str | None, level: int, quality: int | None) -> str | None:
+    """Cache-key settings for the encoder used on `path`, or None if it has none."""
+    ext = path.suffix.lower()
+    if to:
+        return f"{to}-q{quality}" if quality is not None else f"{to}-lossless"
+    if ext == ".png":
+        return f"png-zlib{level}"
+    if ext in (".jpg", ".jpeg") and shutil.which("jpegtran"):
+        return "jpegtran-optimize"
+    return None
+
+
+def output_path(path: Path, settings: str) -> Path:
+    fmt = settings.split("-", 1)[0]
+    return path.with_suffix(f".{fmt}") if fmt in ("webp", "avif") else path
+
+
+def optimize(job: Job) -> Outcome:
+    """Encode one image per `job.settings`; write it only if smaller. Runs in pool workers."""
+    rel = job.path.relative_to(REPO_ROOT).as_posix()
+    data = job.path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    encoder, _, option = job.settings.partition("-")
+    try:
+        if encoder == "png":
+            out = recompress_png(data, int(option.removeprefix("zlib")))
+        elif encoder == "jpegtran":
+            out = jpegtran(data)
+        else:
+            out = convert(data, encoder, None if option == "lossless" else int(option[1:]))
+    except KeyError:
+        return Outcome(rel, digest, len(data), len(data), skipped=f"this Pillow build has no {encoder.upper()} encoder")
+    except (OSError, ValueError, zlib.error, subprocess.CalledProcessError) as e:
+        return Outcome(rel, digest, len(data), len(data), error=str(e))
+    if len(out) >= len(data):
+        return Outcome(rel, digest, len(data), len(data))
+    out_digest = None
+    if job.write:
+        target = output_path(job.path, job.settings)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_bytes(out)
+        os.replace(tmp, target)
+        out_digest = hashlib.sha256(out).hexdigest()
+    return Outcome(rel, digest, len(data), len(out), out_digest)
+
+
+def load_cache(path: Path | None) -> dict[str, list[int]]:
+    """settings:sha256 -> [bytes in, bytes out]."""
+    if path is None:
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data.get("results", {}) if data.get("version") == CACHE_VERSION else {}
+
+
+def save_cache(path: Path | None, results: dict[str, list[int]]):
+    if path is None:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": CACHE_VERSION, "results": results}), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def optimize_all(
+    images: list[Path], settings: dict[Path, str], write: bool, jobs: int, cache: dict[str, list[int]],
+) -> tuple[list[Outcome], int]:
+    """Optimize every image not already settled by the cache.
+
+    Returns (outcomes, cache hits). A cached result is reused unless it
+    promises savings and --write needs the actual bytes; a converted copy
+    is only skipped if it already exists.
+    """
+    outcomes: list[Outcome] = []
+    todo: list[Job] = []
+    hits = 0
+    for path in images:
+        rel = path.relative_to(REPO_ROOT).as_posix()
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        cached = cache.get(f"{settings[path]}:{digest}")
+        target = output_path(path, settings[path])
+        written = target != path and target.exists()
+        if cached and (not write or cached[1] >= cached[0] or written):
+            outcomes.append(Outcome(rel, digest, *cached))
+            hits += 1
+        else:
+            todo.append(Job(path, settings[path], write))
+
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs == 1 or len(todo) < 2:
+        fresh = [optimize(job) for job in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            fresh = list(pool.map(optimize, todo))
+
+    for job, outcome in zip(todo, fresh):
+        if outcome.error or outcome.skipped:
+            continue
+        cache[f"{job.settings}:{outcome.digest}"] = [outcome.bytes_in, outcome.bytes_out]
+        if outcome.out_digest and output_path(job.path, job.settings) == job.path:
+            # The rewritten file is its own optimal result.
+            cache[f"{job.settings}:{outcome.out_digest}"] = [outcome.bytes_out, outcome.bytes_out]
+    return outcomes + fresh, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Losslessly recompress images and check size budgets")
+    parser.add_argument("paths", nargs="*", type=Path, help="Images to process (default: all under images/ and logo/)")
+    parser.add_argument("--write", action="store_true", help="Write optimized images (in place, or next to them with --to)")
+    parser.add_argument("--to", choices=("webp", "avif"), help="Convert instead of recompressing (needs Pillow)")
+    parser.add_argument("--quality", type=int, metavar="Q", help="Lossy quality for --to (default: lossless WebP; AVIF 80)")
+    parser.add_argument("--level", type=int, default=9, choices=range(1, 10), metavar="1-9", help="zlib level for PNGs (default: 9)")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=0, metavar="N",
+        help="Encode in N worker processes (default: one per CPU)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write .cache/optimize-images.json")
+    parser.add_argument(
+        "--check", action="store_true",
+        help="Fail if an image added or changed since --since is over --budget",
+    )
+    parser.add_argument("--since", default="origin/main", metavar="REF", help="--check: git ref to diff against (default: origin/main)")
+    parser.add_argument(
+        "--budget", type=int, default=DEFAULT_BUDGET_KB, metavar="KB",
+        help=f"--check: maximum size per new image (default: {DEFAULT_BUDGET_KB})",
+    )
+    args = parser.parse_args()
+    if args.to and Image is None:
+        parser.error(f"--to {args.to} needs Pillow (pip install Pillow)")
+
+    if args.paths:
+        images = [p.resolve() for p in args.paths]
+        for path in images:
+            if not path.is_relative_to(REPO_ROOT):
+                parser.error(f"{path}: not inside the docs repo ({REPO_ROOT})")
+            if not path.is_file():
+                parser.error(f"{path}: no such file")
+    else:
+        images = check_images.find_images()
+    if args.check:
+        try:
+            changed, _ = check_images.check_links.git_changes(args.since)
+        except SystemExit as e:  # check-links exits on any git failure, e.g. an unknown ref
+            parser.error(f"--check: can't diff against --since {args.since}: {str(e.code).strip()}")
+        images = [p for p in images if p.relative_to(REPO_ROOT).as_posix() in changed]
+
+    settings = {p: s for p in images if (s := encoder_settings(p, args.to, args.level, args.quality))}
+    skipped = len(images) - len(settings)
+    cache_path = None if args.no_cache else CACHE_FILE
+    cache = load_cache(cache_path)
+    outcomes, hits = optimize_all(list(settings), settings, args.write and not args.check, args.jobs, cache)
+    save_cache(cache_path, cache)
+
+    human = check_images.human_size
+    errors = [o for o in outcomes if o.error]
+    unsupported = [o for o in outcomes if o.skipped]
+    saving = sorted((o for o in outcomes if o.bytes_out < o.bytes_in), key=lambda o: o.bytes_out - o.bytes_in)
+    total_in = sum(o.bytes_in for o in outcomes)
+    total_saved = sum(o.bytes_in - o.bytes_out for o in outcomes)
+
+    print(f"\n=== Image Optimization{' (check)' if args.check else ''} ===")
+    print(f"Images: {len(images)} ({skipped} without an available encoder)")
+    print(f"Cache: {hits} hits, {len(outcomes) - hits} encoded")
+    print(f"Total: {human(total_in)} → {human(total_in - total_saved)} "
+          f"(saves {human(total_saved)}, {total_saved / total_in:.1%})" if total_in else "Total: nothing to do")
+    if args.write and not args.check:
+        written = sum(1 for o in saving if o.out_digest)
+        print(f"Written: {written} files")
+
+    if saving:
+        print(f"\n--- Savings ---\n")
+        for o in saving:
+            print(f"  {o.rel}: {human(o.bytes_in)} → {human(o.bytes_out)} "
+                  f"(-{(o.bytes_in - o.bytes_out) / o.bytes_in:.1%})")
+
+    if unsupported:
+        print(f"\n--- Skipped ---\n")
+        for o in unsupported:
+            print(f"  {o.rel}: {o.skipped}")
+
+    if errors:
+        print(f"\n--- Errors ---\n")
+        for o in errors:
+            print(f"  {o.rel}: {o.error}")
+
+    over = []
+    if args.check:
+        budget = args.budget * 1024
+        by_rel = {o.rel: o for o in outcomes}
+        for path in images:
+            rel = path.relative_to(REPO_ROOT).as_posix()
+            size = path.stat().st_size
+            if size > budget:
+                optimized = by_rel[rel].bytes_out if rel in by_rel else size
+                over.append((rel, size, optimized))
+        print(f"\nImages over the {args.budget} KB budget: {len(over)}")
+        for rel, size, optimized in over:
+            hint = " (fits after --write)" if optimized <= budget else f" (still {human(optimized)} after --write)"
+            print(f"  {rel}: {human(size)}{hint}")
+
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()